@@ -0,0 +1,85 @@
+"""Credit decrement contention benchmark.
+
+Runs ``--processes`` worker processes with ``--threads`` threads each, all
+decrementing credits of the same users in a throwaway SQLite database, then
+checks that exactly the available credits were consumed.
+
+    python -m benchmarks.credit_contention --processes 4 --threads 8
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from better_call.backend.repositories.user_repository import UserRepository
+from better_call.database.migrations import migrate
+
+
+def _worker(db_path: str, emails: list, threads: int, attempts: int, results) -> None:
+    repository = UserRepository(db_path)
+    successes = [0] * threads
+
+    def run(index: int) -> None:
+        for i in range(attempts):
+            if repository.decrement_credit(emails[(index + i) % len(emails)]):
+                successes[index] += 1
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put(sum(successes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--credits", type=int, default=500, help="starting credits per user")
+    parser.add_argument("--attempts", type=int, default=200, help="decrements per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        migrate(db_path)
+        repository = UserRepository(db_path)
+        emails = [f"user{i}@example.com" for i in range(args.users)]
+        with repository.db.write() as conn:
+            conn.executemany(
+                "INSERT INTO users (email, password_hash, credits) VALUES (?, '', ?)",
+                [(email, args.credits) for email in emails],
+            )
+
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(target=_worker, args=(db_path, emails, args.threads, args.attempts, results))
+            for _ in range(args.processes)
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        succeeded = sum(results.get() for _ in processes)
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        remaining = sum(repository.get_credits(email) for email in emails)
+        total_attempts = args.processes * args.threads * args.attempts
+        expected = min(total_attempts, args.users * args.credits)
+
+        print(f"processes={args.processes} threads={args.threads} attempts={total_attempts}")
+        print(f"elapsed={elapsed:.2f}s throughput={total_attempts / elapsed:.0f} decrements/s")
+        print(f"succeeded={succeeded} expected={expected} remaining_credits={remaining}")
+        ok = succeeded == expected and remaining == args.users * args.credits - succeeded
+        print("consistent" if ok else "INCONSISTENT")
+        if not ok:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Local enrichment fast path: how many requests it takes, and how fast.
+
+Routes a corpus of sample requests (formulaic and free-form, English and
+Portuguese) through the local template engine the way ``ENRICHMENT_ROUTE=auto``
+does, and reports which intent each one matched, the share handled locally
+and the local render latency.
+
+    python -m benchmarks.enrichment_routing --iterations 20000
+"""
+import argparse
+import statistics
+import time
+from collections import Counter
+
+SAMPLES = [
+    ("Ana", "Call my friend Maria and wish her a happy birthday"),
+    ("Ana", "call my mom and tell her I love her and miss her"),
+    ("Bruno", "Call Pedro and scream at him for missing my party"),
+    ("Bruno", "Tell Julia I'm sorry about yesterday"),
+    ("Carla", "call my brother and congratulate him on his promotion"),
+    ("Carla", "Call Marcos and give him a pep talk before his exam, motivate him"),
+    ("Davi", "call grandma and thank her for the cookies"),
+    ("Davi", "liga pra Ana e deseja feliz aniversário"),
+    ("Elisa", "liga para o meu namorado e diz que eu te amo"),
+    ("Fábio", "liga para a minha mãe e pede desculpas por ontem"),
+    ("Fábio", "liga pra Carol e parabeniza pela formatura"),
+    ("Gabi", "liga pro Lucas e agradece pela ajuda na mudança"),
+    # Free-form, ambiguous or negated: left to the LLM
+    ("Hugo", "Call Rafa, explain the plot of the last three seasons of our favourite show, then ask about the dog"),
+    ("Hugo", "Llama a Sofía y dile que la quiero"),
+    ("Iris", "Call Leo"),
+    ("Iris", "ring my sister and tell her sorry and happy birthday"),
+    ("Iris", "liga pro Pedro e grita com ele porque ele esqueceu meu niver"),
+    ("Jonas", "tell her I am not angry anymore"),
+    ("Jonas", "I would love to move our meeting to Friday"),
+]
+
+
+def _percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10000, help="renders timed per local sample")
+    args = parser.parse_args()
+
+    from better_call.backend.services.local_enrichment import LocalEnrichmentEngine
+
+    engine = LocalEnrichmentEngine()
+    routes = Counter()
+    for name, prompt in SAMPLES:
+        match = engine.match(prompt)
+        routes["local" if match else "llm"] += 1
+        label = f"{match.intent}/{match.language} -> {match.target}" if match else "llm"
+        print(f"{label:>36}  {prompt}")
+
+    latencies = []
+    for name, prompt in SAMPLES:
+        if engine.match(prompt) is None:
+            continue
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            engine.enrich(name, prompt)
+        latencies.append((time.perf_counter() - started) / args.iterations)
+
+    total = sum(routes.values())
+    print(f"\nlocal share: {routes['local']}/{total} ({routes['local'] / total:.0%})")
+    print(
+        f"local enrich (match + render): mean={statistics.mean(latencies) * 1e6:.1f}us "
+        f"p95={_percentile(latencies, 0.95) * 1e6:.1f}us over {args.iterations} renders per sample"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Frontend form-submit latency: in-process backend calls vs HTTP.
+
+Submits the call form (``POST /call``: login, then ``/api/call``) ``--requests``
+times per mode against the in-process app and reports latency percentiles:
+
+- ``inprocess``: the frontend calls the backend route functions directly
+- ``http``: one pooled keep-alive client to a backend served by uvicorn in a
+  separate process, as when the frontend is deployed on its own
+- ``http-unpooled``: a new client per backend call, as the frontend used to do
+
+    python -m benchmarks.frontend_latency --requests 300 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_up(base_url: str) -> None:
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(200):
+            try:
+                if (await client.get("/api/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.05)
+    raise RuntimeError("Backend server did not start")
+
+
+async def _run(args: argparse.Namespace, backend_url: str) -> None:
+    import httpx
+
+    from better_call.frontend.backend_client import BackendClient, HttpBackendClient, InProcessBackendClient
+    from better_call.main import app
+
+    class UnpooledBackendClient(BackendClient):
+        """A fresh connection for every backend call."""
+
+        mode = "http-unpooled"
+
+        def __init__(self, base_url: str):
+            self.base_url = base_url
+
+        async def _once(self, operation: str, *call_args):
+            client = HttpBackendClient(self.base_url)
+            try:
+                return await getattr(client, operation)(*call_args)
+            finally:
+                await client.aclose()
+
+        async def login(self, email, password):
+            return await self._once("login", email, password)
+
+        async def register(self, email, password):
+            return await self._once("register", email, password)
+
+        async def session(self, email, password):
+            return await self._once("session", email, password)
+
+        async def create_call(self, payload, token):
+            return await self._once("create_call", payload, token)
+
+        async def dispatch_call(self, call_request_id, token):
+            return await self._once("dispatch_call", call_request_id, token)
+
+        async def payment_status(self, payment_id):
+            return await self._once("payment_status", payment_id)
+
+        async def last_call_request(self, token):
+            return await self._once("last_call_request", token)
+
+    await _wait_until_up(backend_url)
+    results = {}
+    async with app.router.lifespan_context(app):
+        services = app.state.services
+        form = {
+            "name": "Bench",
+            "email": "bench@example.com",
+            "password": "bench-password",
+            "destination": "+15551234567",
+            "prompt": "hello",
+        }
+        # First submit registers the account; then give it enough credits for every run
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            await client.post("/call", data=form)
+        services.user_repository.increment_credit(form["email"], args.requests * 3 + 10)
+
+        modes = {
+            "inprocess": InProcessBackendClient(app),
+            "http": HttpBackendClient(backend_url),
+            "http-unpooled": UnpooledBackendClient(backend_url),
+        }
+        for name, backend in modes.items():
+            app.state.backend_client = backend
+            latencies: list = []
+            statuses: dict = {}
+            remaining = list(range(args.requests))
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                await client.post("/call", data=form)  # warm-up
+
+                async def submit_loop() -> None:
+                    while remaining:
+                        remaining.pop()
+                        started = time.perf_counter()
+                        response = await client.post("/call", data=form)
+                        latencies.append(time.perf_counter() - started)
+                        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+                started = time.perf_counter()
+                await asyncio.gather(*(submit_loop() for _ in range(args.concurrency)))
+                elapsed = time.perf_counter() - started
+            await backend.aclose()
+            results[name] = (latencies, statuses, elapsed)
+
+    print(f"requests={args.requests} concurrency={args.concurrency} rounds={os.getenv('BCRYPT_ROUNDS')}")
+    for name, (latencies, statuses, elapsed) in results.items():
+        print(
+            f"{name:>14}: p50={statistics.median(latencies) * 1000:.1f}ms "
+            f"p99={_percentile(latencies, 0.99) * 1000:.1f}ms "
+            f"submits/s={len(latencies) / elapsed:.0f} statuses={statuses}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings are read at import time, so point them at a scratch database first.
+        # Cheap hashes keep bcrypt from hiding the transport cost; no workers means
+        # queued calls are never dialed.
+        os.environ["DB_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ.setdefault("BCRYPT_ROUNDS", "4")
+        os.environ["CALL_JOB_WORKERS"] = "0"
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "better_call.main:app", "--port", str(port), "--log-level", "warning"],
+            env=os.environ.copy(),
+        )
+        try:
+            asyncio.run(_run(args, f"http://127.0.0.1:{port}"))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Login throughput benchmark.
+
+Drives ``--concurrency`` concurrent login loops against the in-process app for
+``--duration`` seconds while probing ``/api/health``, and reports logins per
+second, how many were shed with 503 and how responsive other endpoints stayed.
+
+    BCRYPT_ROUNDS=10 python -m benchmarks.login_throughput --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def _percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def _run(args: argparse.Namespace) -> None:
+    import httpx
+
+    from better_call.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            credentials = {"email": "bench@example.com", "password": "bench-password"}
+            response = await client.post("/api/auth/register", json=credentials)
+            response.raise_for_status()
+
+            statuses: dict = {}
+            login_latencies: list = []
+            health_latencies: list = []
+            deadline = time.perf_counter() + args.duration
+
+            async def login_loop() -> None:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    response = await client.post("/api/auth/login", json=credentials)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                    if response.status_code == 200:
+                        login_latencies.append(time.perf_counter() - started)
+                    elif response.status_code == 503:
+                        await asyncio.sleep(0.05)
+
+            async def health_loop() -> None:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    await client.get("/api/health")
+                    health_latencies.append(time.perf_counter() - started)
+                    await asyncio.sleep(0.01)
+
+            started = time.perf_counter()
+            await asyncio.gather(health_loop(), *(login_loop() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+    ok = statuses.get(200, 0)
+    print(f"concurrency={args.concurrency} rounds={os.getenv('BCRYPT_ROUNDS', '12')} elapsed={elapsed:.1f}s")
+    print(f"logins/s={ok / elapsed:.1f} statuses={dict(sorted(statuses.items()))}")
+    if login_latencies:
+        print(
+            f"login latency p50={statistics.median(login_latencies) * 1000:.0f}ms "
+            f"p99={_percentile(login_latencies, 0.99) * 1000:.0f}ms"
+        )
+    print(
+        f"health latency p50={statistics.median(health_latencies) * 1000:.1f}ms "
+        f"p99={_percentile(health_latencies, 0.99) * 1000:.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings are read at import time, so point them at a scratch database first
+        os.environ["DB_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
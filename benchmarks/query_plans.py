@@ -0,0 +1,201 @@
+"""EXPLAIN QUERY PLAN regression check for the hot lookups.
+
+Seeds a scratch database (``--rows`` call requests and payments, a tenth as
+many users and call jobs), then asserts that every hot query is answered by an
+index seek: no full-table scan and no temp B-tree for ORDER BY. Also checks
+that every index declared in ``database.migrations.INDEXES`` exists and
+reports the median latency of each query. Exits non-zero on a regression.
+
+    python -m benchmarks.query_plans --rows 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, NamedTuple, Tuple
+
+from better_call.database.connection import get_connection_manager
+from better_call.database.migrations import INDEXES, migrate
+
+
+class HotQuery(NamedTuple):
+    name: str
+    sql: str
+    params: Tuple
+    # "SCAN <table>" details accepted for this query (a rowid walk stopped by LIMIT)
+    allowed_scans: Tuple[str, ...] = ()
+
+
+def _hot_queries(users: int, jobs: int) -> List[HotQuery]:
+    email = f"user{users // 2}@example.com"
+    now = time.time()
+    # Same SQL text as the repositories; keep in sync when a query changes
+    return [
+        HotQuery("UserRepository.get_user_by_email", "SELECT * FROM users WHERE email = ?", (email,)),
+        HotQuery(
+            "CallRepository.get_last_call_request_by_email",
+            "SELECT * FROM call_requests WHERE email = ? ORDER BY id DESC LIMIT 1",
+            (email,),
+        ),
+        HotQuery(
+            "CallRepository.get_call_requests (keyset page)",
+            "SELECT * FROM call_requests WHERE email = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (email, jobs * 5, 50),
+        ),
+        HotQuery(
+            "CallRepository.get_call_request_by_id",
+            "SELECT * FROM call_requests WHERE id = ?",
+            (jobs,),
+        ),
+        HotQuery(
+            "PromptDB.get_last_prompt",
+            "SELECT prompt FROM call_requests ORDER BY id DESC LIMIT 1",
+            (),
+            allowed_scans=("SCAN call_requests",),
+        ),
+        HotQuery(
+            "PaymentRepository.get_payments_by_user_id",
+            "SELECT * FROM payments WHERE user_id = ? ORDER BY created_at DESC",
+            (users // 2,),
+        ),
+        HotQuery(
+            "PaymentRepository.get_payment_by_stripe_id",
+            "SELECT * FROM payments WHERE stripe_payment_link_id = ?",
+            ("pl_seed_42",),
+        ),
+        HotQuery(
+            "CallJobRepository.claim_next (expired leases)",
+            "SELECT id FROM call_jobs WHERE status = 'running' AND locked_at < ? ORDER BY locked_at LIMIT 1",
+            (now - 60,),
+        ),
+        HotQuery(
+            "CallJobRepository.claim_next (due jobs)",
+            "SELECT id FROM call_jobs WHERE status = 'queued' AND next_attempt_at <= ? ORDER BY next_attempt_at, id LIMIT 1",
+            (now,),
+        ),
+        HotQuery(
+            "CallCampaignRepository.get_campaign_jobs",
+            """SELECT id, destination, status, stage, attempts, call_sid, call_request_id, last_error
+               FROM call_jobs WHERE campaign_id = ? ORDER BY id""",
+            (jobs // 200 + 1,),
+        ),
+        HotQuery(
+            "StripeEventRepository.pending",
+            """SELECT event_id, event_type, payload FROM stripe_events
+               WHERE status = 'pending' ORDER BY received_at LIMIT ?""",
+            (100,),
+        ),
+        HotQuery(
+            "CallRouteRepository.resolve_prompt",
+            """SELECT r.prompt FROM call_routes cr
+               JOIN call_requests r ON r.id = cr.call_request_id
+               WHERE cr.call_sid = ?""",
+            ("CA00000000000000000000000000000042",),
+        ),
+    ]
+
+
+def _seed(db_path: str, rows: int) -> Tuple[int, int]:
+    users = max(1, rows // 10)
+    jobs = max(1, rows // 10)
+    rng = random.Random(7)
+    now = time.time()
+    db = get_connection_manager(db_path)
+    with db.write() as conn:
+        conn.executemany(
+            "INSERT INTO users (email, password_hash, credits) VALUES (?, '', ?)",
+            ((f"user{i}@example.com", rng.randint(0, 5)) for i in range(users)),
+        )
+        conn.executemany(
+            "INSERT INTO call_requests (email, phone_to, prompt, user_id) VALUES (?, '+15550000000', ?, ?)",
+            (
+                (f"user{u}@example.com", f"prompt {i}", u)
+                for i, u in ((i, rng.randrange(users)) for i in range(rows))
+            ),
+        )
+        conn.executemany(
+            """INSERT INTO payments (user_id, stripe_payment_link_id, amount, status, created_at)
+               VALUES (?, ?, 2.0, ?, datetime('now', ?))""",
+            (
+                (rng.randrange(users) + 1, f"pl_seed_{i}", rng.choice(("pending", "paid")), f"-{i} seconds")
+                for i in range(rows)
+            ),
+        )
+        conn.executemany(
+            """INSERT INTO call_jobs (account_email, email, name, destination, status, stage,
+                                      next_attempt_at, locked_at, campaign_id, created_at, updated_at)
+               VALUES (?, ?, 'Seed', '+15550000000', ?, 'done', ?, ?, ?, ?, ?)""",
+            (
+                (f"user{i % users}@example.com", f"user{i % users}@example.com",
+                 status, now - i, now - i if status == "running" else None,
+                 i // 100 + 1 if i % 2 else None, now - i, now - i)
+                for i, status in ((i, rng.choice(("completed", "completed", "failed", "queued", "running")))
+                                  for i in range(jobs))
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO call_routes (call_sid, call_request_id, created_at) VALUES (?, ?, ?)",
+            ((f"CA{i:032d}", i + 1, now) for i in range(jobs)),
+        )
+    return users, jobs
+
+
+def _plan(conn, query: HotQuery) -> List[str]:
+    return [row["detail"] for row in conn.execute("EXPLAIN QUERY PLAN " + query.sql, query.params)]
+
+
+def _median_ms(conn, query: HotQuery, runs: int = 50) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        conn.execute(query.sql, query.params).fetchall()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "plans.db")
+        migrate(db_path)
+        started = time.perf_counter()
+        users, jobs = _seed(db_path, args.rows)
+        print(f"seeded {args.rows} call requests/payments, {users} users, {jobs} jobs "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        with get_connection_manager(db_path).read() as conn:
+            existing = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            for name in INDEXES:
+                if name not in existing:
+                    failures.append(f"declared index {name} is missing")
+
+            for query in _hot_queries(users, jobs):
+                plan = _plan(conn, query)
+                problems = [
+                    detail for detail in plan
+                    if "TEMP B-TREE" in detail
+                    or (detail.startswith("SCAN ") and detail not in query.allowed_scans)
+                ]
+                status = "FAIL" if problems else "ok"
+                print(f"[{status}] {query.name}: {_median_ms(conn, query):.3f}ms")
+                for detail in plan:
+                    print(f"         {detail}")
+                failures.extend(f"{query.name}: {detail}" for detail in problems)
+
+    if failures:
+        print("\nquery plan regressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nall hot queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
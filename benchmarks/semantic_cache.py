@@ -0,0 +1,95 @@
+"""Semantic enrichment cache: lookup latency at scale, and what it reuses.
+
+Fills the cache with ``--entries`` synthetic requests (random wording, so
+every row is distinct), adds a few realistic ones, then times lookups: one
+matrix-vector pass over every row per lookup. Also prints how near-duplicate
+requests are answered: names swapped in, or rejected when the cached prompt
+repeats a detail the new request doesn't have.
+
+    python -m benchmarks.semantic_cache --entries 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+VOCABULARY = (
+    "call tell ask say wish remind scream whisper sing thank invite warn congratulate forgive "
+    "my friend mom dad sister brother boss neighbour grandma cousin teacher coach roommate "
+    "about the party dinner exam trip wedding debt dog cat car rent promotion breakup gift "
+    "that i love miss hate owe need want will am sorry happy proud late early tomorrow tonight"
+).split()
+NAMES = ("Maria", "Pedro", "Julia", "Lucas", "Sofia", "Rafael", "Carol", "Bruno", "Ana", "Leo")
+
+SEEDED = [
+    ("Ana", "Call Pedro and scream at him for missing my party on Saturday"),
+    ("Bruno", "call my grandma and thank her for the cookies she sent"),
+    ("Carla", "Call Marcos and remind him he owes me 50 dollars since March"),
+]
+QUERIES = [
+    ("Davi", "Call Lucas and scream at him for missing my party on Friday"),
+    ("Elisa", "call my grandma and thank her for the cookies she sent"),
+    ("Fábio", "call my grandpa and thank him for the cookies he sent"),
+    ("Gabi", "Call Rafael and remind him he owes me 80 dollars since June"),
+    ("Hugo", "Call Julia and tell her a joke about penguins"),
+]
+
+
+def _fake_enrichment(name: str, prompt: str) -> str:
+    # Stands in for the LLM output: quotes the request and addresses the caller
+    return (
+        f"# Role & Objective\n\n* Persona: messenger for {name}.\n* Goal: {prompt}.\n\n"
+        f"# Context\n\n* {name} asked: \"{prompt}\"\n\n# Sample Openers\n\n* Hi, {name} sent me!"
+    )
+
+
+def _percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100000, help="cached requests")
+    parser.add_argument("--dimensions", type=int, default=512, help="hashed feature dimensions")
+    parser.add_argument("--threshold", type=float, default=0.9, help="cosine similarity threshold")
+    parser.add_argument("--lookups", type=int, default=2000, help="lookups timed")
+    args = parser.parse_args()
+
+    from better_call.backend.services.semantic_cache import SemanticEnrichmentCache
+
+    rng = random.Random(7)
+    cache = SemanticEnrichmentCache(max_entries=args.entries, dimensions=args.dimensions, threshold=args.threshold)
+    started = time.perf_counter()
+    for _ in range(args.entries - len(SEEDED)):
+        prompt = f"{rng.choice(VOCABULARY)} {rng.choice(NAMES)} " + " ".join(rng.choices(VOCABULARY, k=rng.randint(5, 14)))
+        cache.store("User", prompt, _fake_enrichment("User", prompt))
+    for name, prompt in SEEDED:
+        cache.store(name, prompt, _fake_enrichment(name, prompt))
+    fill = time.perf_counter() - started
+    print(f"filled {cache.stats()['entries']} entries x {args.dimensions} dims "
+          f"({args.entries * args.dimensions * 4 / 2**20:.0f} MiB) in {fill:.1f}s\n")
+
+    for name, prompt in QUERIES:
+        result = cache.lookup(name, prompt)
+        print(f"{'hit' if result else 'miss':>5}  {name}: {prompt}")
+        if result:
+            print(f"       -> {result.splitlines()[3]}")
+
+    latencies = []
+    for index in range(args.lookups):
+        name, prompt = QUERIES[index % len(QUERIES)]
+        started = time.perf_counter()
+        cache.lookup(name, prompt)
+        latencies.append(time.perf_counter() - started)
+
+    stats = cache.stats()
+    print(f"\nlookup over {stats['entries']} entries: mean={statistics.mean(latencies) * 1000:.2f}ms "
+          f"p50={_percentile(latencies, 0.5) * 1000:.2f}ms p95={_percentile(latencies, 0.95) * 1000:.2f}ms "
+          f"({args.lookups} lookups)")
+    print(f"hits={stats['hits']} misses={stats['misses']} rejected={stats['rejected']} "
+          f"unstorable={stats['unstorable']} evictions={stats['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Stripe webhook replay.
+
+Signs recorded webhook payloads (``--events``, one Stripe event JSON per line)
+or ``--synthetic`` generated checkout events, re-delivers a ``--duplicates``
+fraction of them the way Stripe retries do, and posts them to the in-process
+``/api/payments/webhook``. Reports acknowledgement throughput and latency,
+then how long the background consumer took to apply everything.
+
+    python -m benchmarks.webhook_replay --synthetic 5000 --concurrency 64
+    python -m benchmarks.webhook_replay --events recorded_events.jsonl
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import List
+
+_SECRET = "whsec_replay"
+
+
+def _percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def _sign(payload: str, secret: str) -> str:
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def _synthetic_events(count: int) -> List[str]:
+    return [
+        json.dumps({
+            "id": f"evt_replay_{i}",
+            "type": "checkout.session.completed" if i % 10 else "payment_intent.created",
+            "data": {"object": {"id": f"cs_replay_{i}", "payment_link": f"plink_replay_{i}"}},
+        })
+        for i in range(count)
+    ]
+
+
+def _seed_payments(db_path: str, payloads: List[str]) -> None:
+    from better_call.database.connection import get_connection_manager
+
+    link_ids = set()
+    for payload in payloads:
+        link_id = json.loads(payload).get("data", {}).get("object", {}).get("payment_link")
+        if link_id:
+            link_ids.add(link_id)
+    with get_connection_manager(db_path).write() as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (email, password_hash) VALUES ('replay@example.com', '')"
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO payments (user_id, stripe_payment_link_id, amount) VALUES (?, ?, 2.0)",
+            ((user_id, link_id) for link_id in link_ids),
+        )
+
+
+async def _run(args: argparse.Namespace, payloads: List[str]) -> None:
+    import httpx
+
+    from better_call.backend.core.config import settings
+    from better_call.main import app
+
+    rng = random.Random(7)
+    deliveries = payloads + [rng.choice(payloads) for _ in range(int(len(payloads) * args.duplicates))]
+    rng.shuffle(deliveries)
+
+    async with app.router.lifespan_context(app):
+        _seed_payments(settings.db_path, payloads)
+        consumer = app.state.services.stripe_event_consumer
+        statuses: dict = {}
+        latencies: list = []
+        queue: asyncio.Queue = asyncio.Queue()
+        for payload in deliveries:
+            queue.put_nowait(payload)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def deliver() -> None:
+                while not queue.empty():
+                    payload = queue.get_nowait()
+                    headers = {"stripe-signature": _sign(payload, settings.stripe_webhook_secret)}
+                    started = time.perf_counter()
+                    response = await client.post("/api/payments/webhook", content=payload, headers=headers)
+                    latencies.append(time.perf_counter() - started)
+                    key = response.json().get("status", response.status_code) if response.status_code == 200 else response.status_code
+                    statuses[key] = statuses.get(key, 0) + 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(deliver() for _ in range(args.concurrency)))
+            ack_elapsed = time.perf_counter() - started
+
+        while consumer.stats()["pending"]:
+            await asyncio.sleep(0.01)
+        drain_elapsed = time.perf_counter() - started
+        stats = consumer.stats()
+
+    print(f"deliveries={len(deliveries)} unique={len(payloads)} concurrency={args.concurrency}")
+    print(f"acks/s={len(deliveries) / ack_elapsed:.0f} statuses={statuses}")
+    print(f"ack latency p50={statistics.median(latencies) * 1000:.1f}ms p99={_percentile(latencies, 0.99) * 1000:.1f}ms")
+    print(
+        f"all applied after {drain_elapsed:.2f}s: batches={stats['batches']} processed={stats['processed']} "
+        f"ignored={stats['ignored']} payments_paid={stats['payments_paid']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", help="File of recorded Stripe events, one JSON object per line")
+    parser.add_argument("--synthetic", type=int, default=2000, help="Generated events when --events is not given")
+    parser.add_argument("--duplicates", type=float, default=0.2, help="Fraction of extra re-deliveries")
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    if args.events:
+        with open(args.events, "r", encoding="utf-8") as f:
+            payloads = [line.strip() for line in f if line.strip()]
+    else:
+        payloads = _synthetic_events(args.synthetic)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings are read at import time, so point them at a scratch database first
+        os.environ["DB_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ.setdefault("STRIPE_WEBHOOK_SECRET", _SECRET)
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        asyncio.run(_run(args, payloads))
+
+
+if __name__ == "__main__":
+    main()
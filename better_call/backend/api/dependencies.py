@@ -1,30 +1,85 @@
-from fastapi import Depends, Request, Header
+from fastapi import Depends, HTTPException, Request, Header
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 
 from ..repositories.call_repository import CallRepository
 from ..repositories.user_repository import UserRepository
+from ..repositories.job_repository import CallJobRepository
+from ..repositories.campaign_repository import CallCampaignRepository
+from ..services.call_job_worker import CallJobWorker
 from ..services.call_service import CallService
+from ..services.event_bus import EventBus
 from ..services.mock_payments_service import MockPaymentsService
+from ..services.payment_service import PaymentService
+from ..services.speculative_enrichment import SpeculativeEnricher
+from ..services.stripe_event_consumer import StripeEventConsumer
+from ..services.registry import ServiceRegistry
+from ..models.user import User
 from ..core.config import settings
 from ..core.security import decode_access_token
 
 
-def get_call_repository(request: Request) -> Optional[CallRepository]:
-    """Dependency to get the call repository from app state."""
-    return getattr(request.app.state, 'call_repository', None)
+def get_services(request: Request) -> Optional[ServiceRegistry]:
+    """Dependency to get the application's service registry."""
+    return getattr(request.app.state, 'services', None)
 
 
-def get_call_service() -> CallService:
-    """Dependency to get the call service."""
-    return CallService()
+def get_call_repository(services: Optional[ServiceRegistry] = Depends(get_services)) -> Optional[CallRepository]:
+    """Dependency to get the call repository from the service registry."""
+    return services.call_repository if services else None
 
 
-def get_user_repository(request: Request) -> Optional[UserRepository]:
-    """Dependency to get the user repository from app state."""
-    return getattr(request.app.state, 'user_repository', None)
+def get_call_service(services: Optional[ServiceRegistry] = Depends(get_services)) -> Optional[CallService]:
+    """Dependency to get the shared call service; it is closed at shutdown, not per request."""
+    return services.get_call_service() if services else None
+
+
+def get_user_repository(services: Optional[ServiceRegistry] = Depends(get_services)) -> Optional[UserRepository]:
+    """Dependency to get the user repository from the service registry."""
+    return services.user_repository if services else None
+
+
+def get_job_repository(services: Optional[ServiceRegistry] = Depends(get_services)) -> Optional[CallJobRepository]:
+    """Dependency to get the call job repository from the service registry."""
+    return services.job_repository if services else None
+
+
+def get_campaign_repository(services: Optional[ServiceRegistry] = Depends(get_services)) -> Optional[CallCampaignRepository]:
+    """Dependency to get the call campaign repository from the service registry."""
+    return services.campaign_repository if services else None
+
+
+def get_speculative_enricher(services: Optional[ServiceRegistry] = Depends(get_services)) -> Optional[SpeculativeEnricher]:
+    """Dependency to get the background enricher for requests waiting for payment."""
+    return services.speculative_enricher if services else None
+
+
+def get_call_job_worker(services: Optional[ServiceRegistry] = Depends(get_services)) -> Optional[CallJobWorker]:
+    """Dependency to get the call job worker pool from the service registry."""
+    return services.call_job_worker if services else None
+
+
+def get_payment_service(services: Optional[ServiceRegistry] = Depends(get_services)) -> Optional[PaymentService]:
+    """Dependency to get the Stripe payment service from the service registry."""
+    return services.payment_service if services else None
+
+
+def get_stripe_event_consumer(services: Optional[ServiceRegistry] = Depends(get_services)) -> Optional[StripeEventConsumer]:
+    """Dependency to get the Stripe webhook event consumer from the service registry."""
+    return services.stripe_event_consumer if services else None
+
+
+def get_event_bus(services: Optional[ServiceRegistry] = Depends(get_services)) -> Optional[EventBus]:
+    """Dependency to get the status event bus from the service registry."""
+    return services.event_bus if services else None
 
 
 def get_current_user_email(authorization: Optional[str] = Header(default=None)) -> Optional[str]:
+    """Email from a valid bearer token, or None.
+
+    Verified tokens are cached until they expire, and FastAPI resolves this
+    dependency once per request however many dependencies share it.
+    """
     if not authorization or not authorization.lower().startswith("bearer "):
         return None
     token = authorization.split(" ", 1)[1]
@@ -32,6 +87,39 @@ def get_current_user_email(authorization: Optional[str] = Header(default=None))
     return payload.get("sub") if payload else None
 
 
-def get_payments_service() -> MockPaymentsService:
+def get_stream_user_email(
+    request: Request,
+    authorization: Optional[str] = Header(default=None),
+) -> Optional[str]:
+    """Like :func:`get_current_user_email`, also accepting the session cookie.
+
+    Only for read-only event streams: a browser ``EventSource`` cannot send headers.
+    """
+    email = get_current_user_email(authorization)
+    access_token = request.cookies.get(settings.session_cookie_name)
+    if email is None and access_token:
+        payload = decode_access_token(access_token)
+        email = payload.get("sub") if payload else None
+    return email
+
+
+async def get_current_user(
+    user_repo: Optional[UserRepository] = Depends(get_user_repository),
+    email: Optional[str] = Depends(get_current_user_email),
+) -> User:
+    """Get the current authenticated user, or fail with 401."""
+    if not user_repo:
+        raise HTTPException(status_code=500, detail="User repository unavailable")
+    if not email:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    user_dict = await run_in_threadpool(user_repo.get_user_by_email, email)
+    if not user_dict:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    return User(**user_dict)
+
+
+def get_payments_service(services: Optional[ServiceRegistry] = Depends(get_services)) -> Optional[MockPaymentsService]:
     """Dependency provider for the mocked payments service."""
-    return MockPaymentsService()
+    return services.payments_service if services else None
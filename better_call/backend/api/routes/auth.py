@@ -1,33 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi import APIRouter, Depends, HTTPException, Response
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 
-from ...models.requests import RegisterRequest, LoginRequest
-from ...models.responses import TokenResponse, CreditsResponse
+from ...models.requests import RegisterRequest, LoginRequest, SessionRequest
+from ...models.responses import TokenResponse, CreditsResponse, SessionResponse
 from ...repositories.user_repository import UserRepository
-from ...core.security import create_access_token, decode_access_token
-from ..dependencies import get_user_repository
+from ...core.exceptions import DatabaseError, PasswordHasherBusyError
+from ...core.passwords import get_password_hasher
+from ...core.security import create_access_token, set_session_cookie
+from ..dependencies import get_current_user_email, get_user_repository
 
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
-def get_current_user_email(
-    authorization: Optional[str] = Header(default=None)
-) -> Optional[str]:
-    if not authorization or not authorization.lower().startswith("bearer "):
-        return None
-    token = authorization.split(" ", 1)[1]
-    payload = decode_access_token(token)
-    return payload.get("sub") if payload else None
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
 
 
 @router.post("/register", response_model=TokenResponse)
-def register(request: RegisterRequest, user_repo: UserRepository = Depends(get_user_repository)):
+async def register(request: RegisterRequest, user_repo: UserRepository = Depends(get_user_repository)):
     if user_repo is None:
         raise HTTPException(status_code=500, detail="User repository unavailable")
     try:
+        # Skip the expensive hash when the insert is bound to fail
+        if await run_in_threadpool(user_repo.get_user_by_email, request.email):
+            raise HTTPException(status_code=400, detail="User already exists")
+        password_hash = await get_password_hasher().hash_async(request.password)
         # Always create with zero credits; ignore any client-supplied credits
-        user_repo.create_user(request.email, request.password)
+        await run_in_threadpool(user_repo.insert_user, request.email, password_hash)
+    except HTTPException:
+        raise
+    except PasswordHasherBusyError:
+        raise _hashing_busy()
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     token = create_access_token(request.email)
@@ -35,15 +44,59 @@ def register(request: RegisterRequest, user_repo: UserRepository = Depends(get_u
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(request: LoginRequest, user_repo: UserRepository = Depends(get_user_repository)):
+async def login(request: LoginRequest, user_repo: UserRepository = Depends(get_user_repository)):
     if user_repo is None:
         raise HTTPException(status_code=500, detail="User repository unavailable")
-    if not user_repo.verify_user(request.email, request.password):
+    user = await run_in_threadpool(user_repo.get_user_by_email, request.email)
+    try:
+        verified = bool(user) and await get_password_hasher().verify_async(
+            request.password, user["password_hash"]
+        )
+    except PasswordHasherBusyError:
+        raise _hashing_busy()
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     token = create_access_token(request.email)
     return TokenResponse(access_token=token)
 
 
+@router.post("/session", response_model=SessionResponse)
+async def session(
+    request: SessionRequest,
+    response: Response,
+    user_repo: UserRepository = Depends(get_user_repository),
+):
+    """
+    Log in, or register if the email is new, in one bcrypt operation.
+
+    The token is returned and also set as an HttpOnly session cookie, so a
+    browser can make later requests without sending the password again.
+    """
+    if user_repo is None:
+        raise HTTPException(status_code=500, detail="User repository unavailable")
+    hasher = get_password_hasher()
+    created = False
+    try:
+        user = await run_in_threadpool(user_repo.get_user_by_email, request.email)
+        if user is None:
+            password_hash = await hasher.hash_async(request.password)
+            try:
+                await run_in_threadpool(user_repo.insert_user, request.email, password_hash)
+                created = True
+            except DatabaseError:
+                # Registered concurrently by another request; log in against that row
+                user = await run_in_threadpool(user_repo.get_user_by_email, request.email)
+                if user is None:
+                    raise
+        if not created and not await hasher.verify_async(request.password, user["password_hash"]):
+            raise HTTPException(status_code=401, detail="Invalid credentials")
+    except PasswordHasherBusyError:
+        raise _hashing_busy()
+    token = create_access_token(request.email)
+    set_session_cookie(response, token)
+    return SessionResponse(access_token=token, created=created)
+
+
 @router.get("/credits", response_model=CreditsResponse)
 def get_credits(
     user_repo: UserRepository = Depends(get_user_repository),
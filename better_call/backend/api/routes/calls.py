@@ -1,40 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Optional
+import json
+import logging
+import re
+from collections import Counter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Iterator, List, Optional, Tuple
 
-from ...models.requests import CallRequest
-from ...models.responses import CallResponse, PaymentResponse
-from ...services.call_service import CallService
+from ...models.requests import CallBatchRequest, CallRequest
+from ...models.responses import (
+    CallHistoryResponse,
+    CallJobResponse,
+    CampaignDestinationResult,
+    CampaignResponse,
+    PaymentResponse,
+)
 from ...repositories.call_repository import CallRepository
+from ...repositories.job_repository import CallJobRepository
+from ...repositories.campaign_repository import CallCampaignRepository
 from ...core.exceptions import BetterCallException, TwilioConfigurationError
+from ...services.call_job_worker import CallJobWorker
+from ...services.speculative_enrichment import SpeculativeEnricher
 from ..dependencies import (
-    get_call_service,
     get_call_repository,
+    get_call_job_worker,
+    get_campaign_repository,
     get_current_user_email,
+    get_job_repository,
     get_user_repository,
     get_payments_service,
+    get_services,
+    get_speculative_enricher,
 )
+from ...services.registry import ServiceRegistry
 from ...services.mock_payments_service import MockPaymentsService
 from ...repositories.user_repository import UserRepository
 from ...core.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+_DESTINATION_PATTERN = re.compile(r"^\+\d{8,15}$")
+
+
+class _AlreadyDispatched(BetterCallException):
+    """Aborts a credit reservation whose call request was claimed concurrently."""
+
+
+def _job_response(job: dict) -> CallJobResponse:
+    return CallJobResponse(
+        ok=job["status"] != "failed",
+        job_id=job["id"],
+        status=job["status"],
+        stage=job["stage"],
+        attempts=job["attempts"],
+        call_sid=job["call_sid"],
+        to=job["destination"],
+        error=job["last_error"],
+    )
 
-@router.post("/call", response_model=CallResponse)
-def make_call(
+
+@router.post("/call", response_model=CallJobResponse, status_code=202)
+async def make_call(
     request: CallRequest,
-    call_service: CallService = Depends(get_call_service),
     call_repository: Optional[CallRepository] = Depends(get_call_repository),
     user_repo: Optional[UserRepository] = Depends(get_user_repository),
     email: Optional[str] = Depends(get_current_user_email),
-    payments_service: MockPaymentsService = Depends(get_payments_service),
+    payments_service: Optional[MockPaymentsService] = Depends(get_payments_service),
+    job_repository: Optional[CallJobRepository] = Depends(get_job_repository),
+    worker: Optional[CallJobWorker] = Depends(get_call_job_worker),
+    enricher: Optional[SpeculativeEnricher] = Depends(get_speculative_enricher),
 ):
-    """Make a phone call with the provided parameters."""
+    """
+    Reserve a credit and queue a phone call with the provided parameters.
+
+    Returns 202 with a job ID immediately; enrichment and dialing happen in the
+    call job workers. Poll ``GET /api/call/jobs/{job_id}`` for progress.
+
+    Without credits, returns 402 with a payment link and the ``call_request_id``
+    of the saved request; its prompt is enriched while the user pays, and
+    ``POST /api/call/requests/{call_request_id}/dispatch`` queues it afterwards.
+    """
     try:
         # Enforce authentication & credits
         if user_repo is None:
             return JSONResponse(content={"ok": False, "error": "User repository unavailable"}, status_code=500)
+        if job_repository is None:
+            return JSONResponse(content={"ok": False, "error": "Job queue unavailable"}, status_code=500)
+        if payments_service is None:
+            return JSONResponse(content={"ok": False, "error": "Payments service unavailable"}, status_code=500)
 
         if not email:
             return JSONResponse(
@@ -42,12 +97,23 @@ def make_call(
                 status_code=401,
             )
 
-        # Attempt to consume one credit atomically
-        if not user_repo.decrement_credit(email):
+        def enqueue(conn):
+            return job_repository.enqueue_in(
+                conn,
+                account_email=email,
+                email=request.email,
+                name=request.name,
+                destination=request.destination,
+                raw_prompt=request.prompt or "",
+            )
+
+        # Take one credit and queue the call in one transaction: both commit or neither does
+        reserved, job_id = await run_in_threadpool(user_repo.reserve_credits, email, 1, enqueue)
+        if not reserved:
             # Use mocked payments service to generate a payment link for the user
             from ...models import User
 
-            user = user_repo.get_user_by_email(email)
+            user = await run_in_threadpool(user_repo.get_user_by_email, email)
             user_model = User(
                 id=user.get("id") if user else None,
                 email=email,
@@ -56,65 +122,128 @@ def make_call(
                 created_at=None,
             )
 
-            # Save the call request so we can trigger it after payment
+            # Save the call request so it can be dispatched after payment, and
+            # enrich its prompt while the user pays
+            call_request_id = None
             try:
                 if call_repository is not None:
-                    call_repository.insert_call_request(
+                    call_request_id = await run_in_threadpool(
+                        call_repository.insert_deferred_call_request,
                         email=request.email,
                         phone_to=request.destination,
-                        prompt=request.prompt or "",
+                        name=request.name,
+                        raw_prompt=request.prompt or "",
+                        user_id=user_model.id,
                     )
+                    if enricher is not None:
+                        enricher.submit(call_request_id, request.name, request.prompt or "")
             except Exception:
-                pass
+                # Still answer 402; the request just can't be dispatched by ID after payment
+                logger.exception(
+                    "Failed to save deferred call request",
+                    extra={"account_email": email, "call_request_id": call_request_id},
+                )
 
-            payment_resp: PaymentResponse = payments_service.create_payment_link_for_user(user_model)
+            payment_resp: PaymentResponse = await run_in_threadpool(
+                payments_service.create_payment_link_for_user, user_model
+            )
             return JSONResponse(
                 content={
                     "ok": False,
                     "error": "Insufficient credits",
                     "details": {
                         "reason": "insufficient_credits",
-                        "credits": user_repo.get_credits(email),
+                        "credits": user_model.credits,
                         "payment_url": payment_resp.payment_url,
                         "payment_id": payment_resp.payment_id,
+                        "call_request_id": call_request_id,
                     },
                 },
                 status_code=402,
             )
 
-        # Proceed with the call using available credits
-        result = call_service.process_call_request(request, call_repository)
-        if not result.ok:
-            try:
-                user_repo.increment_credit(email, 1)
-            except Exception:
-                pass
-            return JSONResponse(content=result.dict(), status_code=500)
-        return result
+        if worker is not None:
+            worker.notify()
+        return CallJobResponse(ok=True, job_id=job_id, status="queued", stage="enrich", attempts=0, to=request.destination)
 
     except TwilioConfigurationError as e:
-        try:
-            if email and user_repo:
-                user_repo.increment_credit(email, 1)
-        except Exception:
-            pass
         return JSONResponse(content={"ok": False, "error": e.message, "details": e.details}, status_code=500)
     except BetterCallException as e:
-        try:
-            if email and user_repo:
-                user_repo.increment_credit(email, 1)
-        except Exception:
-            pass
         return JSONResponse(content={"ok": False, "error": e.message, "details": e.details}, status_code=400)
     except Exception as e:
-        try:
-            if email and user_repo:
-                user_repo.increment_credit(email, 1)
-        except Exception:
-            pass
         return JSONResponse(content={"ok": False, "error": f"Unexpected error: {str(e)}"}, status_code=500)
 
 
+@router.post("/call/requests/{call_request_id}/dispatch", response_model=CallJobResponse, status_code=202)
+async def dispatch_call_request(
+    call_request_id: int,
+    call_repository: Optional[CallRepository] = Depends(get_call_repository),
+    user_repo: Optional[UserRepository] = Depends(get_user_repository),
+    email: Optional[str] = Depends(get_current_user_email),
+    job_repository: Optional[CallJobRepository] = Depends(get_job_repository),
+    worker: Optional[CallJobWorker] = Depends(get_call_job_worker),
+):
+    """
+    Queue the call for a request saved by ``POST /api/call`` when it returned 402.
+
+    Takes one credit and queues the stored request as is: no new call request
+    row, and no enrichment when the prompt was already enriched while the user
+    was paying. A request is dispatched at most once; later attempts get 409.
+    """
+    if not email:
+        return JSONResponse(content={"ok": False, "error": "Unauthorized"}, status_code=401)
+    if call_repository is None or user_repo is None or job_repository is None:
+        return JSONResponse(content={"ok": False, "error": "Repository unavailable"}, status_code=500)
+
+    try:
+        record = await run_in_threadpool(call_repository.get_call_request_by_id, call_request_id)
+        user = await run_in_threadpool(user_repo.get_user_by_email, email)
+    except BetterCallException as e:
+        return JSONResponse(content={"ok": False, "error": e.message, "details": e.details}, status_code=500)
+    owned = record is not None and user is not None and (
+        record["user_id"] == user["id"] if record["user_id"] is not None else record["email"] == email
+    )
+    if not owned:
+        return JSONResponse(content={"ok": False, "error": "Call request not found"}, status_code=404)
+    if not record.get("awaiting_payment"):
+        return JSONResponse(content={"ok": False, "error": "Call request already dispatched"}, status_code=409)
+
+    def claim_and_enqueue(conn):
+        claimed = call_repository.claim_deferred_call_request(conn, call_request_id)
+        if claimed is None:
+            # Dispatched concurrently since the check above: roll the debit back with it
+            raise _AlreadyDispatched("Call request already dispatched")
+        return claimed, job_repository.enqueue_call_request(conn, email, claimed)
+
+    try:
+        reserved, result = await run_in_threadpool(user_repo.reserve_credits, email, 1, claim_and_enqueue)
+    except _AlreadyDispatched as e:
+        return JSONResponse(content={"ok": False, "error": e.message}, status_code=409)
+    except BetterCallException as e:
+        return JSONResponse(content={"ok": False, "error": e.message, "details": e.details}, status_code=500)
+    if not reserved:
+        credits = await run_in_threadpool(user_repo.get_credits, email)
+        return JSONResponse(
+            content={
+                "ok": False,
+                "error": "Insufficient credits",
+                "details": {"reason": "insufficient_credits", "credits": credits},
+            },
+            status_code=402,
+        )
+    claimed, job_id = result
+    if worker is not None:
+        worker.notify()
+    return CallJobResponse(
+        ok=True,
+        job_id=job_id,
+        status="queued",
+        stage="dial" if claimed["enriched_at"] is not None else "enrich",
+        attempts=0,
+        to=claimed["phone_to"],
+    )
+
+
 @router.get("/call/last")
 def get_last_call_request(
     call_repository: Optional[CallRepository] = Depends(get_call_repository),
@@ -135,3 +264,216 @@ def get_last_call_request(
         return JSONResponse(content={"record": record}, status_code=200)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
+
+
+def _ndjson_lines(rows: Iterator[dict], batch_size: int = 200) -> Iterator[str]:
+    """Encode rows as NDJSON, a batch of lines per chunk to keep threadpool hops rare."""
+    batch = []
+    for row in rows:
+        batch.append(json.dumps(row, default=str))
+        if len(batch) >= batch_size:
+            yield "\n".join(batch) + "\n"
+            batch = []
+    if batch:
+        yield "\n".join(batch) + "\n"
+
+
+@router.get("/calls", response_model=CallHistoryResponse)
+async def list_calls(
+    cursor: Optional[int] = Query(default=None, description="Return calls older than this ID"),
+    limit: int = Query(default=50, ge=1, le=500),
+    format: str = Query(default="json", pattern="^(json|ndjson)$"),
+    call_repository: Optional[CallRepository] = Depends(get_call_repository),
+    email: Optional[str] = Depends(get_current_user_email),
+):
+    """
+    The current user's call history, newest first.
+
+    ``json`` returns one keyset page plus ``next_cursor``; ``ndjson`` streams
+    every remaining call, one JSON object per line, from a server-side cursor.
+    """
+    if not email:
+        return JSONResponse(content={"ok": False, "error": "Unauthorized"}, status_code=401)
+    if call_repository is None:
+        return JSONResponse(content={"ok": False, "error": "Repository unavailable"}, status_code=500)
+
+    if format == "ndjson":
+        rows = call_repository.iter_call_requests(email, before_id=cursor)
+        return StreamingResponse(_ndjson_lines(rows), media_type="application/x-ndjson")
+
+    # One extra row tells whether another page exists
+    items = await run_in_threadpool(call_repository.get_call_requests, email, limit + 1, cursor)
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = items[-1]["id"]
+    return CallHistoryResponse(ok=True, items=items, next_cursor=next_cursor)
+
+
+@router.get("/call/jobs/{job_id}", response_model=CallJobResponse)
+async def get_call_job(
+    job_id: int,
+    job_repository: Optional[CallJobRepository] = Depends(get_job_repository),
+    email: Optional[str] = Depends(get_current_user_email),
+):
+    """Report the progress of a queued call."""
+    if not email:
+        return JSONResponse(content={"ok": False, "error": "Unauthorized"}, status_code=401)
+    if job_repository is None:
+        return JSONResponse(content={"ok": False, "error": "Job queue unavailable"}, status_code=500)
+    job = await run_in_threadpool(job_repository.get_job, job_id)
+    if not job or job["account_email"] != email:
+        return JSONResponse(content={"ok": False, "error": "Job not found"}, status_code=404)
+    return _job_response(job)
+
+
+def _split_destinations(destinations: List[str]) -> Tuple[List[str], List[CampaignDestinationResult]]:
+    """Valid, de-duplicated destinations in submitted order, plus results for the skipped ones."""
+    valid: List[str] = []
+    skipped: List[CampaignDestinationResult] = []
+    seen = set()
+    for raw in destinations:
+        destination = raw.strip()
+        if not _DESTINATION_PATTERN.match(destination):
+            skipped.append(CampaignDestinationResult(destination=raw, status="invalid", error="Not an international phone number"))
+        elif destination in seen:
+            skipped.append(CampaignDestinationResult(destination=raw, status="duplicate", error="Already in this batch"))
+        else:
+            seen.add(destination)
+            valid.append(destination)
+    return valid, skipped
+
+
+@router.post("/calls/batch", response_model=CampaignResponse, status_code=202)
+async def make_batch_call(
+    request: CallBatchRequest,
+    services: Optional[ServiceRegistry] = Depends(get_services),
+    user_repo: Optional[UserRepository] = Depends(get_user_repository),
+    campaign_repository: Optional[CallCampaignRepository] = Depends(get_campaign_repository),
+    worker: Optional[CallJobWorker] = Depends(get_call_job_worker),
+    email: Optional[str] = Depends(get_current_user_email),
+):
+    """
+    Call many destinations with one prompt.
+
+    The prompt is enriched once, then one credit per destination is reserved
+    and every call request and job is written in a single transaction (all or
+    nothing). Dialing is left to the call job workers, paced at
+    ``CAMPAIGN_DIAL_RATE_PER_SECOND``. Poll ``GET /api/calls/batch/{campaign_id}``
+    for progress.
+    """
+    if not email:
+        return JSONResponse(content={"ok": False, "error": "Unauthorized"}, status_code=401)
+    if services is None or user_repo is None or campaign_repository is None:
+        return JSONResponse(content={"ok": False, "error": "Repository unavailable"}, status_code=500)
+
+    if len(request.destinations) > settings.campaign_max_destinations:
+        return JSONResponse(
+            content={
+                "ok": False,
+                "error": "Too many destinations",
+                "details": {"max_destinations": settings.campaign_max_destinations},
+            },
+            status_code=400,
+        )
+    destinations, skipped = _split_destinations(request.destinations)
+    if not destinations:
+        return JSONResponse(
+            content=CampaignResponse(
+                ok=False,
+                error="No valid destinations",
+                counts=dict(Counter(result.status for result in skipped)),
+                results=skipped,
+            ).model_dump(),
+            status_code=400,
+        )
+
+    # Enrich before taking any credits: a failure here costs the caller nothing
+    try:
+        prompt = await services.get_call_service().enrich_async(request.name, request.prompt or "")
+    except BetterCallException as e:
+        return JSONResponse(content={"ok": False, "error": e.message, "details": e.details}, status_code=500)
+
+    rate = settings.campaign_dial_rate_per_second
+    interval = 1.0 / rate if rate > 0 else 0.0
+
+    def insert_campaign(conn):
+        return campaign_repository.insert_campaign(
+            conn,
+            account_email=email,
+            email=request.email,
+            name=request.name,
+            raw_prompt=request.prompt or "",
+            prompt=prompt,
+            destinations=destinations,
+            dial_interval_seconds=interval,
+        )
+
+    try:
+        reserved, campaign = await run_in_threadpool(
+            user_repo.reserve_credits, email, len(destinations), insert_campaign
+        )
+    except BetterCallException as e:
+        return JSONResponse(content={"ok": False, "error": e.message, "details": e.details}, status_code=500)
+    if not reserved:
+        credits = await run_in_threadpool(user_repo.get_credits, email)
+        return JSONResponse(
+            content={
+                "ok": False,
+                "error": "Insufficient credits",
+                "details": {"reason": "insufficient_credits", "credits": credits, "required": len(destinations)},
+            },
+            status_code=402,
+        )
+
+    if worker is not None:
+        worker.notify()
+    queued = [
+        CampaignDestinationResult(
+            destination=job["destination"], status="queued", job_id=job["job_id"], call_request_id=job["call_request_id"]
+        )
+        for job in campaign["jobs"]
+    ]
+    results = queued + skipped
+    return CampaignResponse(
+        ok=True,
+        campaign_id=campaign["campaign_id"],
+        total=len(queued),
+        counts=dict(Counter(result.status for result in results)),
+        results=results,
+    )
+
+
+@router.get("/calls/batch/{campaign_id}", response_model=CampaignResponse)
+async def get_batch_call(
+    campaign_id: int,
+    campaign_repository: Optional[CallCampaignRepository] = Depends(get_campaign_repository),
+    email: Optional[str] = Depends(get_current_user_email),
+):
+    """Report the progress of every call in a campaign."""
+    if not email:
+        return JSONResponse(content={"ok": False, "error": "Unauthorized"}, status_code=401)
+    if campaign_repository is None:
+        return JSONResponse(content={"ok": False, "error": "Repository unavailable"}, status_code=500)
+    campaign = await run_in_threadpool(campaign_repository.get_campaign, campaign_id)
+    if not campaign or campaign["account_email"] != email:
+        return JSONResponse(content={"ok": False, "error": "Campaign not found"}, status_code=404)
+    jobs = await run_in_threadpool(campaign_repository.get_campaign_jobs, campaign_id)
+    results = [
+        CampaignDestinationResult(
+            destination=job["destination"],
+            status=job["status"],
+            job_id=job["id"],
+            call_request_id=job["call_request_id"],
+            call_sid=job["call_sid"],
+            error=job["last_error"],
+        )
+        for job in jobs
+    ]
+    return CampaignResponse(
+        ok=True,
+        campaign_id=campaign_id,
+        total=campaign["total"],
+        counts=dict(Counter(result.status for result in results)),
+        results=results,
+    )
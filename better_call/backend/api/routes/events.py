@@ -0,0 +1,134 @@
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from ...core.config import settings
+from ...repositories.job_repository import CallJobRepository
+from ...repositories.payment_repository import PaymentRepository
+from ...services.event_bus import EventBus, job_topic, payment_topic
+from ...services.registry import ServiceRegistry
+from ..dependencies import get_event_bus, get_job_repository, get_services, get_stream_user_email
+
+router = APIRouter()
+
+_TERMINAL = {"paid", "completed", "failed"}
+
+
+def _job_state(job: Dict[str, Any]) -> Dict[str, Any]:
+    status = job["status"]
+    if status == "running" and job["stage"] in ("dial", "dialing"):
+        status = "dialing"
+    event: Dict[str, Any] = {"type": status, "job_id": job["id"]}
+    if job["call_sid"]:
+        event["call_sid"] = job["call_sid"]
+    if status == "failed":
+        event["error"] = job["last_error"]
+    return event
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def _stream(
+    request: Request,
+    bus: EventBus,
+    topics: List[str],
+    snapshot: Callable[[], Awaitable[Dict[str, Dict[str, Any]]]],
+) -> AsyncIterator[str]:
+    """Current state of each topic, then its transitions, until every topic is final."""
+    # Subscribe before reading the database so no transition falls in between
+    with bus.subscribe(*topics) as subscription:
+        sent: Dict[str, str] = {}
+
+        def fresh(event: Dict[str, Any]) -> bool:
+            if sent.get(event["topic"]) == event["type"] or sent.get(event["topic"]) in _TERMINAL:
+                return False
+            sent[event["topic"]] = event["type"]
+            return True
+
+        yield f"retry: {int(settings.sse_keepalive_seconds * 1000)}\n\n"
+        for event in (await snapshot()).values():
+            if fresh(event):
+                yield _sse(event)
+
+        while not all(sent.get(topic) in _TERMINAL for topic in subscription.topics):
+            event = await subscription.get(timeout=settings.sse_keepalive_seconds)
+            if await request.is_disconnected():
+                return
+            if event is not None:
+                if fresh(event):
+                    yield _sse(event)
+                continue
+            # Idle: keep proxies from closing the stream, and catch transitions
+            # published by another worker process
+            yield ": keepalive\n\n"
+            for event in (await snapshot()).values():
+                if fresh(event):
+                    yield _sse(event)
+
+
+@router.get("/events")
+async def status_events(
+    request: Request,
+    payment_id: Optional[int] = Query(default=None),
+    job_id: Optional[int] = Query(default=None),
+    services: Optional[ServiceRegistry] = Depends(get_services),
+    bus: Optional[EventBus] = Depends(get_event_bus),
+    job_repository: Optional[CallJobRepository] = Depends(get_job_repository),
+    email: Optional[str] = Depends(get_stream_user_email),
+):
+    """
+    Server-sent events for a payment and/or a queued call.
+
+    Sends the current state first, then ``paid`` for the payment and
+    ``dialing``/``retrying``/``completed``/``failed`` for the call as they
+    happen; the stream ends once every requested item reached a final state.
+    Call streams need the owner's token (bearer header or ``access_token``
+    cookie); payment streams are as open as ``/api/payments/status``.
+    """
+    if payment_id is None and job_id is None:
+        return JSONResponse(content={"ok": False, "error": "payment_id or job_id is required"}, status_code=400)
+    if services is None or bus is None or job_repository is None:
+        return JSONResponse(content={"ok": False, "error": "Event stream unavailable"}, status_code=500)
+    payment_repository: PaymentRepository = services.payment_repository
+
+    if job_id is not None:
+        if not email:
+            return JSONResponse(content={"ok": False, "error": "Unauthorized"}, status_code=401)
+        job = await run_in_threadpool(job_repository.get_job, job_id)
+        if not job or job["account_email"] != email:
+            return JSONResponse(content={"ok": False, "error": "Job not found"}, status_code=404)
+    if payment_id is not None:
+        if not await run_in_threadpool(payment_repository.get_payment_by_id, payment_id):
+            return JSONResponse(content={"ok": False, "error": "Payment not found"}, status_code=404)
+
+    topics = []
+    if payment_id is not None:
+        topics.append(payment_topic(payment_id))
+    if job_id is not None:
+        topics.append(job_topic(job_id))
+
+    async def snapshot() -> Dict[str, Dict[str, Any]]:
+        state: Dict[str, Dict[str, Any]] = {}
+        if payment_id is not None:
+            payment = await run_in_threadpool(payment_repository.get_payment_by_id, payment_id)
+            paid = bool(payment) and payment["status"] == "paid"
+            state[payment_topic(payment_id)] = {
+                "topic": payment_topic(payment_id),
+                "type": "paid" if paid else "pending",
+                "payment_id": payment_id,
+            }
+        if job_id is not None:
+            job = await run_in_threadpool(job_repository.get_job, job_id)
+            state[job_topic(job_id)] = {"topic": job_topic(job_id), **_job_state(job)}
+        return state
+
+    return StreamingResponse(
+        _stream(request, bus, topics, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
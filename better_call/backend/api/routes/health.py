@@ -1,6 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
+from ...core.passwords import get_password_hasher
+from ...core.security import token_cache
 from ...models.responses import HealthResponse
+from ...services.enrichment_cache import get_enrichment_cache
+from ...services.enrichment_guard import get_enrichment_guard
+from ...services.local_enrichment import get_enrichment_router
+from ...services.semantic_cache import get_semantic_cache
 
 router = APIRouter()
 
@@ -9,3 +15,25 @@ router = APIRouter()
 def health_check():
     """Health check endpoint."""
     return HealthResponse(ok=True)
+
+
+@router.get("/api/metrics")
+def metrics(request: Request):
+    """In-process counters for caches and pipeline stages."""
+    services = getattr(request.app.state, "services", None)
+    user_repository = services.user_repository if services is not None else None
+    semantic_cache = get_semantic_cache()
+    return {
+        "enrichment_cache": get_enrichment_cache().stats(),
+        "enrichment": get_enrichment_guard().stats(),
+        "enrichment_routing": get_enrichment_router().stats(),
+        "semantic_cache": semantic_cache.stats() if semantic_cache is not None else None,
+        "user_cache": user_repository.cache.stats() if user_repository is not None else None,
+        "password_hasher": get_password_hasher().stats(),
+        "token_cache": token_cache.stats(),
+        "stripe_events": services.stripe_event_consumer.stats() if services is not None else None,
+        "event_bus": services.event_bus.stats() if services is not None else None,
+        "speculative_enrichment": services.speculative_enricher.stats() if services is not None else None,
+        "upstream": services.upstream_clients.stats() if services is not None else None,
+        "schema": getattr(request.app.state, "schema", None),
+    }
@@ -1,40 +1,28 @@
 from fastapi import APIRouter, HTTPException, Request, Header, Depends
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from typing import Optional
 import json
+import logging
 
 from ...models.responses import PaymentResponse
 from ...models.user import User
 from ...services.payment_service import PaymentService
-from ...repositories.user_repository import UserRepository
-from ..dependencies import get_user_repository, get_current_user_email
+from ...services.stripe_event_consumer import StripeEventConsumer
+from ..dependencies import get_current_user, get_payment_service, get_stripe_event_consumer
 
 router = APIRouter(prefix="/payments", tags=["payments"])
-
-
-def get_current_user(
-    user_repo: UserRepository = Depends(get_user_repository),
-    email: Optional[str] = Depends(get_current_user_email)
-) -> User:
-    """Get the current authenticated user."""
-    if not user_repo:
-        raise HTTPException(status_code=500, detail="User repository unavailable")
-    if not email:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    
-    user_dict = user_repo.get_user_by_email(email)
-    if not user_dict:
-        raise HTTPException(status_code=401, detail="User not found")
-    
-    return User(**user_dict)
+logger = logging.getLogger(__name__)
 
 
 @router.post("/create", response_model=PaymentResponse)
 async def create_payment(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    payment_service: Optional[PaymentService] = Depends(get_payment_service),
 ):
-    payment_service = PaymentService()
-    
+    if payment_service is None:
+        raise HTTPException(status_code=500, detail="Payment service unavailable")
+
     try:
         result = await payment_service.create_payment_link(
             user=current_user
@@ -52,53 +40,55 @@ async def create_payment(
 @router.post("/webhook")
 async def stripe_webhook(
     request: Request,
-    stripe_signature: Optional[str] = Header(None, alias="stripe-signature")
+    stripe_signature: Optional[str] = Header(None, alias="stripe-signature"),
+    payment_service: Optional[PaymentService] = Depends(get_payment_service),
+    consumer: Optional[StripeEventConsumer] = Depends(get_stripe_event_consumer),
 ):
-    payment_service = PaymentService()
-    
+    """
+    Acknowledge a Stripe event as soon as it is verified and stored.
+
+    Redeliveries of an event id already stored are acknowledged without being
+    processed again; the payment updates themselves happen in the background
+    :class:`StripeEventConsumer`.
+    """
+    if payment_service is None or consumer is None:
+        raise HTTPException(status_code=500, detail="Payment service unavailable")
+
+    payload = await request.body()
+
+    if not stripe_signature:
+        raise HTTPException(status_code=400, detail="Missing Stripe signature")
+
+    if not payment_service.verify_webhook_signature(payload, stripe_signature):
+        raise HTTPException(status_code=400, detail="Invalid webhook signature")
+
     try:
-        payload = await request.body()
-        
-        if not stripe_signature:
-            raise HTTPException(status_code=400, detail="Missing Stripe signature")
-        
-        if not payment_service.verify_webhook_signature(payload, stripe_signature):
-            raise HTTPException(status_code=400, detail="Invalid webhook signature")
-        
-        try:
-            event = json.loads(payload.decode('utf-8'))
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-        
-        event_type = event.get('type')
-        
-        if event_type == 'checkout.session.completed':
-            session = event['data']['object']
-            
-            payment_link_id = session.get('payment_link')
-            
-            if payment_link_id:
-                success = await payment_service.handle_payment_success(payment_link_id)
-                if not success:
-                    print(f"Failed to process payment success for {payment_link_id}")
-            else:
-                print("No payment link ID found in checkout session")
-        
-        else:
-            print(f"Unhandled webhook event type: {event_type}")
-        
-        return JSONResponse(content={"status": "success"}, status_code=200)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error processing webhook: {str(e)}")
+        event = json.loads(payload.decode('utf-8'))
+        event_id = event['id']
+        event_type = event.get('type') or ''
+    except (UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+
+    try:
+        is_new = await consumer.submit(event_id, event_type, payload.decode('utf-8'))
+    except Exception:
+        # Not stored: a 5xx makes Stripe deliver the event again
+        logger.exception("Error recording webhook event", extra={"event_id": event_id})
         raise HTTPException(status_code=500, detail="Webhook processing failed")
 
+    if not is_new:
+        logger.info("Duplicate webhook event", extra={"event_id": event_id, "event_type": event_type})
+    return JSONResponse(content={"status": "received" if is_new else "duplicate"}, status_code=200)
+
 
 @router.get("/status")
-async def get_payment_status(payment_id: str | None = None, stripe_payment_link_id: str | None = None):
-    payment_service = PaymentService()
+async def get_payment_status(
+    payment_id: str | None = None,
+    stripe_payment_link_id: str | None = None,
+    payment_service: Optional[PaymentService] = Depends(get_payment_service),
+):
+    if payment_service is None:
+        raise HTTPException(status_code=500, detail="Payment service unavailable")
     try:
         result = await payment_service.get_payment_status(
             payment_id=payment_id,
@@ -106,6 +96,6 @@ async def get_payment_status(payment_id: str | None = None, stripe_payment_link_
         )
         if not result:
             return JSONResponse(content={"exists": False}, status_code=404)
-        return JSONResponse(content={"exists": True, "status": result.status, "data": result.dict()}, status_code=200)
+        return JSONResponse(content={"exists": True, "status": result.status, "data": jsonable_encoder(result)}, status_code=200)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get payment status: {str(e)}")
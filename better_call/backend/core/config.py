@@ -11,14 +11,64 @@ class Settings:
         self.twilio_auth_token = os.getenv("TWILIO_AUTH_TOKEN", "")
         self.twilio_from_number = os.getenv("TWILIO_FROM_NUMBER", "+18576637141")
         self.twiml_url = os.getenv("TWIML_URL")
+        # SIP headers the OpenAI gateway uses to match an incoming call to its request
+        self.call_route_request_id_header = os.getenv("CALL_ROUTE_REQUEST_ID_HEADER", "X-Call-Request-Id")
+        self.call_route_sid_headers = [
+            h.strip()
+            for h in os.getenv(
+                "CALL_ROUTE_SID_HEADERS", "X-Twilio-ParentCallSid,X-Parent-Call-Sid,X-Twilio-CallSid"
+            ).split(",")
+            if h.strip()
+        ]
         
         # OpenAI Configuration
         self.openai_api_key = os.getenv("OPENAI_API_KEY", "")
+
+        # Upstream clients: one keep-alive pool per provider for the app's lifetime,
+        # pre-connected at startup (0 warm-up connections disables the warm-up)
+        self.openai_timeout_seconds = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "30"))
+        self.openai_connect_timeout_seconds = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "5"))
+        self.openai_max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+        self.openai_max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "64"))
+        self.twilio_timeout_seconds = float(os.getenv("TWILIO_TIMEOUT_SECONDS", "15"))
+        self.twilio_max_connections = int(os.getenv("TWILIO_MAX_CONNECTIONS", "32"))
+        self.upstream_keepalive_seconds = float(os.getenv("UPSTREAM_KEEPALIVE_SECONDS", "90"))
+        self.upstream_warmup_connections = int(os.getenv("UPSTREAM_WARMUP_CONNECTIONS", "2"))
+        self.upstream_warmup_timeout_seconds = float(os.getenv("UPSTREAM_WARMUP_TIMEOUT_SECONDS", "10"))
+
+        # Prompt enrichment cache
+        self.enrichment_cache_max_entries = int(os.getenv("ENRICHMENT_CACHE_MAX_ENTRIES", "1024"))
+        self.enrichment_cache_ttl_seconds = float(os.getenv("ENRICHMENT_CACHE_TTL_SECONDS", "86400"))
+        # Enrichment latency budget: past the deadline, or while the breaker is open,
+        # calls go out with the raw prompt. Hedging sends a second request at the
+        # recent p95 latency (doubles OpenAI spend on slow requests, so off by default)
+        self.enrichment_deadline_seconds = float(os.getenv("ENRICHMENT_DEADLINE_SECONDS", "8"))
+        self.enrichment_breaker_failures = int(os.getenv("ENRICHMENT_BREAKER_FAILURES", "5"))
+        self.enrichment_breaker_reset_seconds = float(os.getenv("ENRICHMENT_BREAKER_RESET_SECONDS", "30"))
+        self.enrichment_hedge = os.getenv("ENRICHMENT_HEDGE", "false").lower() in ("1", "true", "yes")
+        self.enrichment_hedge_percentile = float(os.getenv("ENRICHMENT_HEDGE_PERCENTILE", "0.95"))
+        self.enrichment_hedge_min_samples = int(os.getenv("ENRICHMENT_HEDGE_MIN_SAMPLES", "20"))
+        # Enrichment routing: "llm" (always OpenAI), "local" (persona templates only)
+        # or "auto" (opt-in: templates for short, formulaic requests, OpenAI for the rest)
+        self.enrichment_route = os.getenv("ENRICHMENT_ROUTE", "llm").lower()
+        self.local_enrichment_max_words = int(os.getenv("LOCAL_ENRICHMENT_MAX_WORDS", "30"))
+        # Near-duplicate requests reuse a similar request's enrichment, names swapped in
+        # (needs NumPy; memory is max entries x dimensions x 4 bytes per worker)
+        self.semantic_cache_enabled = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.semantic_cache_max_entries = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))
+        self.semantic_cache_dimensions = int(os.getenv("SEMANTIC_CACHE_DIMENSIONS", "512"))
+        self.semantic_cache_threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+        # Requests waiting for payment are enriched in the background (0 disables)
+        self.speculative_enrichment_max_inflight = int(os.getenv("SPECULATIVE_ENRICHMENT_MAX_INFLIGHT", "64"))
         
         # Stripe Configuration
         self.stripe_secret_key = os.getenv("STRIPE_SECRET_KEY", "")
         self.stripe_publishable_key = os.getenv("STRIPE_PUBLISHABLE_KEY", "")
         self.stripe_webhook_secret = os.getenv("STRIPE_WEBHOOK_SECRET", "")
+        # Webhook events are acknowledged on receipt and applied in batches in the background
+        self.stripe_event_batch_size = int(os.getenv("STRIPE_EVENT_BATCH_SIZE", "100"))
+        self.stripe_event_poll_interval_seconds = float(os.getenv("STRIPE_EVENT_POLL_INTERVAL_SECONDS", "1"))
+        self.stripe_event_retention_days = float(os.getenv("STRIPE_EVENT_RETENTION_DAYS", "30"))
         
         # Payment Configuration
         self.payment_amount = float(os.getenv("PAYMENT_AMOUNT", "2.00"))
@@ -34,13 +84,51 @@ class Settings:
                 "banco.db"
             )
         )
+        self.db_max_readers = int(os.getenv("DB_MAX_READERS", "8"))
+        self.db_busy_timeout_ms = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+        self.db_mmap_size = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+        
+        # User row cache (per worker process)
+        self.user_cache_max_entries = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+        self.user_cache_ttl_seconds = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+        self.user_cache_sync_interval_seconds = float(os.getenv("USER_CACHE_SYNC_INTERVAL_SECONDS", "1"))
         
         # Backend Configuration
         self.backend_base_url = os.getenv("BACKEND_BASE_URL", "http://127.0.0.1:9001")
 
+        # Async call pipeline: max concurrent operations per stage
+        self.call_enrich_concurrency = int(os.getenv("CALL_ENRICH_CONCURRENCY", "32"))
+        self.call_persist_concurrency = int(os.getenv("CALL_PERSIST_CONCURRENCY", "8"))
+        self.call_dial_concurrency = int(os.getenv("CALL_DIAL_CONCURRENCY", "16"))
+
+        # Call job queue
+        self.call_job_workers = int(os.getenv("CALL_JOB_WORKERS", "4"))
+        self.call_job_max_attempts = int(os.getenv("CALL_JOB_MAX_ATTEMPTS", "5"))
+        self.call_job_backoff_base_seconds = float(os.getenv("CALL_JOB_BACKOFF_BASE_SECONDS", "2"))
+        self.call_job_backoff_max_seconds = float(os.getenv("CALL_JOB_BACKOFF_MAX_SECONDS", "60"))
+        self.call_job_poll_interval_seconds = float(os.getenv("CALL_JOB_POLL_INTERVAL_SECONDS", "1"))
+        self.call_job_lease_seconds = float(os.getenv("CALL_JOB_LEASE_SECONDS", "60"))
+
+        # Batch call campaigns: size cap and how fast their calls are dialed
+        self.campaign_max_destinations = int(os.getenv("CAMPAIGN_MAX_DESTINATIONS", "500"))
+        self.campaign_dial_rate_per_second = float(os.getenv("CAMPAIGN_DIAL_RATE_PER_SECOND", "1"))
+
+        # Server-sent status events: idle streams send a keepalive and re-check the database this often
+        self.sse_keepalive_seconds = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
         # Stripe (placeholder for frontend redirect)
         self.stripe_checkout_url = os.getenv("STRIPE_CHECKOUT_URL", "")
 
+        # Logging
+        self.log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+        self.log_levels = os.getenv("LOG_LEVELS", "")  # e.g. "better_call.backend.openai_gateway=DEBUG"
+        self.log_payload_sample_rate = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+
+        # Password hashing (bcrypt runs in a dedicated process pool)
+        self.bcrypt_rounds = int(os.getenv("BCRYPT_ROUNDS", "12"))
+        self.password_hash_workers = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.password_hash_max_queue = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
         # JWT Auth
         self.jwt_secret_key = os.getenv("JWT_SECRET_KEY", "change-me-in-prod")
         self.jwt_algorithm = os.getenv("JWT_ALGORITHM", "HS256")
@@ -48,6 +136,17 @@ class Settings:
             self.jwt_access_token_exp_minutes = int(os.getenv("JWT_ACCESS_TOKEN_EXP_MINUTES", "1440"))
         except Exception:
             self.jwt_access_token_exp_minutes = 1440
+        # Key rotation: the file's first line signs new tokens, later lines are still
+        # accepted; it is re-read when it changes, so workers pick up a new key live
+        self.jwt_secret_file = os.getenv("JWT_SECRET_FILE", "")
+        self.jwt_previous_secret_keys = [
+            k.strip() for k in os.getenv("JWT_PREVIOUS_SECRET_KEYS", "").split(",") if k.strip()
+        ]
+        self.jwt_secret_reload_seconds = float(os.getenv("JWT_SECRET_RELOAD_SECONDS", "5"))
+        self.jwt_token_cache_max_entries = int(os.getenv("JWT_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+        # Browser sessions: the JWT in an HttpOnly cookie, so the web form skips the password
+        self.session_cookie_name = os.getenv("SESSION_COOKIE_NAME", "access_token")
+        self.session_cookie_secure = os.getenv("SESSION_COOKIE_SECURE", "false").lower() in ("1", "true", "yes")
 
 
 # Global settings instance
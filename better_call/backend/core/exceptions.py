@@ -28,3 +28,8 @@ class DatabaseError(BetterCallException):
 class CallServiceError(BetterCallException):
     """Raised when call service operations fail."""
     pass
+
+
+class PasswordHasherBusyError(BetterCallException):
+    """Raised when the password hashing queue is full."""
+    pass
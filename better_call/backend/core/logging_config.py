@@ -0,0 +1,191 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from .config import settings
+from .security import signing_keys
+
+
+# Keys whose values are never written to the logs, at any nesting depth
+SENSITIVE_KEYS = (
+    "authorization",
+    "api_key",
+    "apikey",
+    "password",
+    "password_hash",
+    "secret",
+    "token",
+    "cookie",
+    "signature",
+)
+REDACTED = "[REDACTED]"
+
+# Attributes every LogRecord has; anything else was passed through ``extra=``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+def _is_sensitive(key: str) -> bool:
+    key = key.lower()
+    return any(marker in key for marker in SENSITIVE_KEYS)
+
+
+def redact(value: Any) -> Any:
+    """Return a copy of ``value`` with sensitive keys masked, recursively."""
+    if isinstance(value, dict):
+        # Header lists such as [{"name": "Authorization", "value": "..."}]
+        name = value.get("name")
+        if isinstance(name, str) and _is_sensitive(name) and "value" in value:
+            return {**value, "value": REDACTED}
+        return {
+            k: REDACTED if isinstance(k, str) and _is_sensitive(k) else redact(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    return value
+
+
+def _secret_values() -> list:
+    secrets = [
+        settings.openai_api_key,
+        settings.twilio_auth_token,
+        settings.stripe_secret_key,
+        settings.stripe_webhook_secret,
+        *signing_keys.loaded(),
+    ]
+    # Short values would mask unrelated text; real secrets are long
+    return [s for s in secrets if s and len(s) >= 8]
+
+
+def scrub(text: str) -> str:
+    """Mask configured secret values that appear verbatim in ``text``."""
+    for secret in _secret_values():
+        if secret in text:
+            text = text.replace(secret, REDACTED)
+    return text
+
+
+class SecretFilter(logging.Filter):
+    """Redacts secrets from the message and from structured ``extra`` fields."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.msg = scrub(record.getMessage())
+        record.args = None
+        for key, value in list(vars(record).items()):
+            if key in _RECORD_ATTRIBUTES:
+                continue
+            if _is_sensitive(key):
+                setattr(record, key, REDACTED)
+            elif isinstance(value, (dict, list, tuple)):
+                setattr(record, key, redact(value))
+            elif isinstance(value, str):
+                setattr(record, key, scrub(value))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _StructuredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps extra fields intact for the JSON formatter.
+
+    The stock handler pre-formats the record into a plain string; here only the
+    message and traceback are rendered, so the listener thread does the JSON work.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = scrub(logging.Formatter().formatException(record.exc_info))
+            record.exc_info = None
+        return record
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            if name.strip() and level.strip():
+                levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging() -> None:
+    """Install the non-blocking JSON logging pipeline (idempotent).
+
+    Records go through a queue to a background listener that does the
+    formatting and the stdout writes. Levels come from ``LOG_LEVEL`` and the
+    per-module overrides in ``LOG_LEVELS`` (``module=LEVEL,module=LEVEL``).
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    _queue_handler = _StructuredQueueHandler(log_queue)
+    _queue_handler.addFilter(SecretFilter())
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.log_level)
+    for name, level in _parse_levels(settings.log_levels).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    _listener = None
+    _queue_handler = None
+
+
+def log_payload(logger: logging.Logger, message: str, payload: Any, **fields: Any) -> None:
+    """Log a redacted payload dump for a sample of calls.
+
+    Only a ``LOG_PAYLOAD_SAMPLE_RATE`` fraction of dumps are written, at DEBUG.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if random.random() >= settings.log_payload_sample_rate:
+        return
+    logger.debug(message, extra={**fields, "payload": redact(payload)})
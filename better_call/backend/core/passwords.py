@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+import bcrypt
+
+from .config import settings
+from .exceptions import PasswordHasherBusyError
+
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_password(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _check_password(password: str, password_hash: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+    except Exception:
+        return False
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool with admission control.
+
+    Hashing is deliberately slow, so it stays off the request threadpool and
+    the event loop. At most ``workers + max_queue`` operations are accepted at
+    once; beyond that :class:`PasswordHasherBusyError` is raised immediately
+    so a login burst is shed instead of slowing down every other endpoint.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 32, rounds: int = 12):
+        self.workers = max(1, workers)
+        self.max_pending = self.workers + max(0, max_queue)
+        self.rounds = rounds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._counters = {"hashed": 0, "verified": 0, "rejected": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers don't inherit the server's threads and locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _submit(self, counter: str, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters["rejected"] += 1
+                raise PasswordHasherBusyError(
+                    "Password hashing queue is full", {"pending": self._pending}
+                )
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool for this and later calls
+                logger.warning("Password hashing pool broken, restarting it")
+                self._executor = None
+                future = self._get_executor().submit(fn, *args)
+            self._pending += 1
+            self._counters[counter] += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def hash(self, password: str) -> str:
+        """Hash a password, blocking the calling thread until a worker is done."""
+        return self._submit("hashed", _hash_password, password, self.rounds).result()
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        """Check a password against its bcrypt hash, blocking the calling thread."""
+        return self._submit("verified", _check_password, password, password_hash).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit("hashed", _hash_password, password, self.rounds))
+
+    async def verify_async(self, password: str, password_hash: str) -> bool:
+        return await asyncio.wrap_future(
+            self._submit("verified", _check_password, password, password_hash)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["pending"] = self._pending
+        counters["capacity"] = self.max_pending
+        return counters
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; a later call starts a new pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the process-wide password hasher."""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher(
+                workers=settings.password_hash_workers,
+                max_queue=settings.password_hash_max_queue,
+                rounds=settings.bcrypt_rounds,
+            )
+        return _hasher
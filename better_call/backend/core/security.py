@@ -1,22 +1,179 @@
 import datetime as dt
-from typing import Optional, Tuple
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 import jwt
+from starlette.responses import Response
 
 from .config import settings
 
 
+logger = logging.getLogger(__name__)
+
+
+class SigningKeys:
+    """JWT secrets: the first key signs new tokens, every key verifies.
+
+    Keys come from ``JWT_SECRET_FILE`` (one per line) when it is set, falling
+    back to ``JWT_SECRET_KEY`` plus ``JWT_PREVIOUS_SECRET_KEYS``. The file is
+    re-checked at most every ``JWT_SECRET_RELOAD_SECONDS`` and reloaded when
+    its mtime changes, so keys rotate without restarting workers: put the new
+    key first, keep the old one below it until its tokens have expired.
+    """
+
+    def __init__(self, path: str = "", reload_seconds: float = 5.0):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        # Bumped whenever the key set changes; cached verifications are tied to it
+        self.generation = 0
+        self._keys: List[str] = [settings.jwt_secret_key, *settings.jwt_previous_secret_keys]
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def keys(self) -> List[str]:
+        if self.path and time.monotonic() - self._checked_at >= self.reload_seconds:
+            self._reload()
+        return self._keys
+
+    def current(self) -> str:
+        return self.keys()[0]
+
+    def loaded(self) -> List[str]:
+        """Keys as last loaded, without touching the file (safe from log filters)."""
+        return list(self._keys)
+
+    def _reload(self) -> None:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime
+                if mtime == self._mtime:
+                    return
+                with open(self.path, "r", encoding="utf-8") as f:
+                    keys = [line.strip() for line in f if line.strip()]
+            except OSError as e:
+                logger.warning("JWT secret file unreadable, keeping current keys: %s", e)
+                return
+            if not keys:
+                logger.warning("JWT secret file is empty, keeping current keys")
+                return
+            self._mtime = mtime
+            if keys != self._keys:
+                self._keys = keys
+                self.generation += 1
+                logger.info("JWT signing keys reloaded", extra={"key_count": len(keys)})
+
+
+class VerifiedTokenCache:
+    """Bounded cache of verified token payloads, each evicted at its ``exp``.
+
+    A hit skips the HMAC check and JSON decode. Entries are dropped lazily on
+    lookup once expired, proactively (via a heap ordered by ``exp``) on every
+    insert, and LRU-first when the cache is full.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._expiry: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+
+    def get(self, token: str, generation: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and (entry[0] <= time.time() or entry[1] != generation):
+                del self._entries[token]
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(token)
+            self._counters["hits"] += 1
+            return entry[2]
+
+    def put(self, token: str, payload: Dict[str, Any], generation: int) -> None:
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        now = time.time()
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                expired_at, expired = heapq.heappop(self._expiry)
+                entry = self._entries.get(expired)
+                if entry is not None and entry[0] == expired_at:
+                    del self._entries[expired]
+            self._entries[token] = (float(exp), generation, payload)
+            self._entries.move_to_end(token)
+            heapq.heappush(self._expiry, (float(exp), token))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if len(self._expiry) > 2 * self.max_entries:
+                # Drop heap records for tokens that were evicted LRU-first
+                self._expiry = [(e, t) for e, t in self._expiry if t in self._entries]
+                heapq.heapify(self._expiry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._expiry = []
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["entries"] = len(self._entries)
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        return counters
+
+
+signing_keys = SigningKeys(settings.jwt_secret_file, settings.jwt_secret_reload_seconds)
+token_cache = VerifiedTokenCache(settings.jwt_token_cache_max_entries)
+
+
 def create_access_token(email: str) -> str:
     now = dt.datetime.utcnow()
     exp = now + dt.timedelta(minutes=settings.jwt_access_token_exp_minutes)
     payload = {"sub": email, "exp": exp, "iat": now}
-    return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return jwt.encode(payload, signing_keys.current(), algorithm=settings.jwt_algorithm)
 
 
 def decode_access_token(token: str) -> Optional[dict]:
-    try:
-        return jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-    except Exception:
-        return None
+    keys = signing_keys.keys()
+    generation = signing_keys.generation
+    payload = token_cache.get(token, generation)
+    if payload is not None:
+        return payload
+    for key in keys:
+        try:
+            payload = jwt.decode(token, key, algorithms=[settings.jwt_algorithm])
+        except jwt.InvalidSignatureError:
+            continue
+        except Exception:
+            return None
+        token_cache.put(token, payload, generation)
+        return payload
+    return None
+
+
+def set_session_cookie(response: Response, token: str) -> None:
+    """Store ``token`` in the HttpOnly session cookie; it lives as long as the token."""
+    response.set_cookie(
+        settings.session_cookie_name,
+        token,
+        max_age=settings.jwt_access_token_exp_minutes * 60,
+        path="/",
+        httponly=True,
+        secure=settings.session_cookie_secure,
+        samesite="lax",
+    )
 
 
+def clear_session_cookie(response: Response) -> None:
+    response.delete_cookie(settings.session_cookie_name, path="/")
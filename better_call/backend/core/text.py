@@ -0,0 +1,7 @@
+import unicodedata
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents, so words match however the user typed them."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 
 
@@ -17,6 +17,20 @@ class CallRequest(BaseModel):
         description="Optional prompt to customize the call behavior"
     )
 
+class CallBatchRequest(BaseModel):
+    """Request model for calling many destinations with one prompt."""
+    
+    name: str = Field(min_length=1, description="Name of the person making the request")
+    email: str = Field(description="Email address of the requester")
+    destinations: List[str] = Field(
+        min_length=1,
+        description="Destination phone numbers in international format; invalid and repeated entries are skipped"
+    )
+    prompt: Optional[str] = Field(
+        default="", 
+        description="Optional prompt to customize the calls, enriched once for the whole batch"
+    )
+
 class PaymentRequest(BaseModel):
     """Request model for creating a payment."""
     
@@ -32,3 +46,8 @@ class RegisterRequest(BaseModel):
 class LoginRequest(BaseModel):
     email: str
     password: str
+
+
+class SessionRequest(BaseModel):
+    email: str
+    password: str = Field(min_length=6)
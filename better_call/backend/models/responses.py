@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, List
 from datetime import datetime
 from decimal import Decimal
 
@@ -23,6 +23,46 @@ class CallResponse(BaseResponse):
     details: Optional[Dict[str, Any]] = None
 
 
+class CallJobResponse(BaseResponse):
+    """Response model for queued call jobs."""
+    
+    job_id: Optional[int] = None
+    status: Optional[str] = None
+    stage: Optional[str] = None
+    attempts: Optional[int] = None
+    call_sid: Optional[str] = None
+    to: Optional[str] = None
+    error: Optional[str] = None
+
+
+class CallHistoryResponse(BaseResponse):
+    """One page of the caller's call requests, newest first."""
+    
+    items: List[Dict[str, Any]] = []
+    next_cursor: Optional[int] = None
+
+
+class CampaignDestinationResult(BaseModel):
+    """Outcome for one destination of a batch call."""
+    
+    destination: str
+    status: str
+    job_id: Optional[int] = None
+    call_request_id: Optional[int] = None
+    call_sid: Optional[str] = None
+    error: Optional[str] = None
+
+
+class CampaignResponse(BaseResponse):
+    """A batch call campaign and the state of each of its destinations."""
+    
+    campaign_id: Optional[int] = None
+    total: int = 0
+    counts: Dict[str, int] = {}
+    results: List[CampaignDestinationResult] = []
+    error: Optional[str] = None
+
+
 class PaymentResponse(BaseResponse):
     """Response model for payment operations."""
     
@@ -53,6 +93,11 @@ class TokenResponse(BaseModel):
     token_type: str = "bearer"
 
 
+class SessionResponse(TokenResponse):
+    """Token for a login-or-register; ``created`` tells which of the two happened."""
+    created: bool = False
+
+
 class CreditsResponse(BaseModel):
     email: str
     credits: int
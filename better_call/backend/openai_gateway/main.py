@@ -1,15 +1,44 @@
 from fastapi import APIRouter, Request, Response
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, Optional, Tuple
 import os
-import requests
+import httpx
 import json
-import traceback
-import datetime
+import logging
+
+from ..core.config import settings
+from ..core.logging_config import log_payload
 
 router = APIRouter(prefix="/openai-gateway")
+logger = logging.getLogger(__name__)
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+OPENAI_API_BASE_URL = "https://api.openai.com/v1"
 AUTH_HEADER = {"Authorization": f"Bearer {OPENAI_API_KEY}"}
 
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build the shared keep-alive client used to accept incoming calls.
+
+    Created once in the app lifespan so every webhook reuses warm TLS
+    connections; HTTP/2 is enabled when the optional ``h2`` package is installed.
+    """
+    return httpx.AsyncClient(
+        base_url=OPENAI_API_BASE_URL,
+        headers={**AUTH_HEADER, "Content-Type": "application/json"},
+        http2=_http2_available(),
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0),
+    )
+
 CALL_ACCEPT_CONFIG = {
     "type": "realtime",
     "instructions": (
@@ -27,6 +56,51 @@ CALL_ACCEPT_CONFIG = {
     "model": "gpt-realtime",
 }
 
+def _route_keys(data: Dict[str, Any]) -> Tuple[Optional[str], Optional[int]]:
+    """Extract the (Twilio call SID, call request ID) carried in the SIP headers."""
+    headers = {}
+    for header in data.get("sip_headers") or []:
+        if isinstance(header, dict) and header.get("name"):
+            headers[str(header["name"]).lower()] = header.get("value")
+
+    call_request_id = None
+    raw_request_id = headers.get(settings.call_route_request_id_header.lower())
+    if raw_request_id is not None and str(raw_request_id).strip().isdigit():
+        call_request_id = int(str(raw_request_id).strip())
+
+    call_sid = None
+    for name in settings.call_route_sid_headers:
+        if headers.get(name.lower()):
+            call_sid = str(headers[name.lower()])
+            break
+    return call_sid, call_request_id
+
+
+async def _resolve_prompt(request: Request, data: Dict[str, Any]) -> Optional[str]:
+    """Prompt for an incoming call: its routed request first, the last prompt as a fallback."""
+    call_sid, call_request_id = _route_keys(data)
+    services = getattr(request.app.state, "services", None)
+    call_routes = services.call_routes if services is not None else None
+    if call_routes is not None and (call_sid or call_request_id is not None):
+        # O(1) in-memory hit on the accept path; SQLite only for calls dialed elsewhere
+        prompt = call_routes.lookup_cached(call_sid, call_request_id)
+        if prompt is None:
+            try:
+                prompt = await run_in_threadpool(call_routes.resolve_prompt, call_sid, call_request_id)
+            except Exception:
+                prompt = None
+        if prompt:
+            return prompt
+
+    try:
+        db = services.prompt_db if services is not None else None
+        if db is not None:
+            return await run_in_threadpool(db.get_last_prompt)
+    except Exception:
+        pass
+    return None
+
+
 @router.post("/")
 async def handle_webhook(request: Request):
     try:
@@ -35,63 +109,42 @@ async def handle_webhook(request: Request):
 
         try:
             event = json.loads(raw_body)
-            print("JSON PARSED BODY:")
-            print(json.dumps(event, indent=2))
         except Exception as e:
-            print("Erro ao parsear JSON:", e)
+            logger.warning("Invalid JSON in gateway webhook: %s", e)
             event = {}
 
         event_type = event.get("type")
         call_id = event.get("data", {}).get("call_id")
 
-        print(f"Tipo do evento: {event_type}")
-        print(f"Call ID: {call_id}")
+        logger.info("Gateway event received", extra={"event_type": event_type, "call_id": call_id})
+        log_payload(logger, "Gateway event payload", event, call_id=call_id)
 
         if event_type == "realtime.call.incoming" and call_id:
-            print(f"==> Chamada recebida! call_id={call_id}")
-            # Get last prompt from shared DB
-            last_prompt = None
-            try:
-                db = request.app.state.db
-                if db is not None:
-                    last_prompt = db.get_last_prompt()
-            except Exception:
-                pass
+            # Get the prompt routed to this call (or the last prompt) from shared DB
+            call_prompt = await _resolve_prompt(request, event.get("data", {}))
 
-            # Merge last prompt into instructions if present
+            # Merge the prompt into instructions if present
             payload = dict(CALL_ACCEPT_CONFIG)
-            if last_prompt:
+            if call_prompt:
                 payload = dict(payload)
-                payload["instructions"] = last_prompt
-
-            url = f"https://api.openai.com/v1/realtime/calls/{call_id}/accept"
-
-            print("==> Enviando POST para /accept...")
-            print("URL:", url)
-            print("HEADERS:", AUTH_HEADER)
-            print("PAYLOAD:", json.dumps(payload, indent=2))
-
-            resp = requests.post(
-                url,
-                headers={**AUTH_HEADER, "Content-Type": "application/json"},
-                json=payload,
-                timeout=10
-            )
-
-            print("==> Resposta do /accept:")
-            print("Status code:", resp.status_code)
-            print("Headers:", dict(resp.headers))
-            print("Body:")
-            try:
-                print(json.dumps(resp.json(), indent=2))
-            except Exception:
-                print(resp.text)
+                payload["instructions"] = call_prompt
+
+            url = f"{OPENAI_API_BASE_URL}/realtime/calls/{call_id}/accept"
+
+            client = getattr(request.app.state, "openai_gateway_client", None)
+            if client is not None:
+                resp = await client.post(url, json=payload)
+            else:
+                async with create_http_client() as client:
+                    resp = await client.post(url, json=payload)
+
+            level = logging.INFO if resp.is_success else logging.WARNING
+            logger.log(level, "Call accept answered", extra={"call_id": call_id, "status_code": resp.status_code})
+            if not resp.is_success:
+                log_payload(logger, "Call accept error body", resp.text[:2000], call_id=call_id)
 
-        print("--- FIM DA REQUISIÇÃO ---\n\n")
         return Response(status_code=200)
 
-    except Exception as e:
-        print("!!!! ERRO NO PROCESSAMENTO !!!!")
-        print("Erro:", e)
-        print(traceback.format_exc())
+    except Exception:
+        logger.exception("Gateway webhook processing failed")
         return Response(status_code=500)
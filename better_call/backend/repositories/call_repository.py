@@ -1,8 +1,8 @@
 import sqlite3
-import threading
-from typing import Optional, List, Dict, Any
-from contextlib import contextmanager
+import time
+from typing import Optional, List, Dict, Any, Iterator
 
+from ...database.connection import get_connection_manager
 from ..core.exceptions import DatabaseError
 
 
@@ -11,63 +11,54 @@ class CallRepository:
     
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.lock = threading.Lock()
-        self._initialize_database()
+        self.db = get_connection_manager(db_path)
     
-    def _initialize_database(self):
-        """Initialize the database with required tables."""
+    def insert_call_request(self, email: str, phone_to: str, prompt: str, user_id: Optional[int] = None, status: str = 'pending') -> int:
+        """
+        Insert a new call request.
+        
+        Args:
+            email: Email of the requester
+            phone_to: Destination phone number
+            prompt: The enriched prompt
+            
+        Returns:
+            The ID of the inserted record
+            
+        Raises:
+            DatabaseError: If the insertion fails
+        """
         try:
-            with self._get_connection() as conn:
-                conn.execute('''
-                    CREATE TABLE IF NOT EXISTS call_requests (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        email TEXT NOT NULL,
-                        phone_to TEXT NOT NULL,
-                        prompt TEXT NOT NULL,
-                        user_id INTEGER,
-                        status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending','fulfilled')),
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            with self.db.write() as conn:
+                if user_id is not None:
+                    cursor = conn.execute(
+                        "INSERT INTO call_requests (email, phone_to, prompt, user_id, status) VALUES (?, ?, ?, ?, ?)",
+                        (email, phone_to, prompt, user_id, status)
                     )
-                ''')
-                # Backward-compatible migration: add user_id column if missing
-                try:
-                    cursor = conn.execute("PRAGMA table_info(call_requests)")
-                    columns = [row[1] for row in cursor.fetchall()]
-                    if 'user_id' not in columns:
-                        conn.execute("ALTER TABLE call_requests ADD COLUMN user_id INTEGER")
-                    if 'status' not in columns:
-                        conn.execute("ALTER TABLE call_requests ADD COLUMN status TEXT NOT NULL DEFAULT 'pending'")
-                except Exception:
-                    # Do not fail app startup if pragma/alter fails; table may already be correct
-                    pass
-                conn.commit()
-        except Exception as e:
-            raise DatabaseError(f"Failed to initialize database: {e}")
-    
-    @contextmanager
-    def _get_connection(self):
-        """Get a database connection with proper error handling."""
-        conn = None
-        try:
-            conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            conn.row_factory = sqlite3.Row  # Enable dict-like access
-            yield conn
+                else:
+                    cursor = conn.execute(
+                        "INSERT INTO call_requests (email, phone_to, prompt, status) VALUES (?, ?, ?, ?)",
+                        (email, phone_to, prompt, status)
+                    )
+                return cursor.lastrowid
         except Exception as e:
-            if conn:
-                conn.rollback()
-            raise DatabaseError(f"Database operation failed: {e}")
-        finally:
-            if conn:
-                conn.close()
+            raise DatabaseError(f"Failed to insert call request: {e}")
     
-    def insert_call_request(self, email: str, phone_to: str, prompt: str, user_id: Optional[int] = None, status: str = 'pending') -> int:
+    def insert_deferred_call_request(
+        self, email: str, phone_to: str, name: str, raw_prompt: str, user_id: Optional[int] = None
+    ) -> int:
         """
-        Insert a new call request.
+        Save a call request that waits for payment before it is dialed.
+
+        The raw prompt is stored as the prompt until an enriched one is written
+        back with :meth:`set_enriched_prompt`.
         
         Args:
             email: Email of the requester
             phone_to: Destination phone number
-            prompt: The enriched prompt
+            name: Name of the person making the request, needed to enrich the prompt
+            raw_prompt: Prompt as submitted
+            user_id: Optional ID of the account that will pay for it
             
         Returns:
             The ID of the inserted record
@@ -75,23 +66,54 @@ class CallRepository:
         Raises:
             DatabaseError: If the insertion fails
         """
-        with self.lock:
-            try:
-                with self._get_connection() as conn:
-                    if user_id is not None:
-                        cursor = conn.execute(
-                            "INSERT INTO call_requests (email, phone_to, prompt, user_id, status) VALUES (?, ?, ?, ?, ?)",
-                            (email, phone_to, prompt, user_id, status)
-                        )
-                    else:
-                        cursor = conn.execute(
-                            "INSERT INTO call_requests (email, phone_to, prompt, status) VALUES (?, ?, ?, ?)",
-                            (email, phone_to, prompt, status)
-                        )
-                    conn.commit()
-                    return cursor.lastrowid
-            except Exception as e:
-                raise DatabaseError(f"Failed to insert call request: {e}")
+        try:
+            with self.db.write() as conn:
+                cursor = conn.execute(
+                    """INSERT INTO call_requests (email, phone_to, prompt, user_id, name, raw_prompt, awaiting_payment)
+                       VALUES (?, ?, ?, ?, ?, ?, 1)""",
+                    (email, phone_to, raw_prompt, user_id, name, raw_prompt)
+                )
+                return cursor.lastrowid
+        except Exception as e:
+            raise DatabaseError(f"Failed to insert deferred call request: {e}")
+
+    def set_enriched_prompt(self, request_id: int, prompt: str) -> bool:
+        """
+        Write the enriched prompt back to a call request.
+        
+        Returns:
+            True if the row exists
+            
+        Raises:
+            DatabaseError: If the update fails
+        """
+        try:
+            with self.db.write() as conn:
+                cursor = conn.execute(
+                    "UPDATE call_requests SET prompt = ?, enriched_at = ? WHERE id = ?",
+                    (prompt, time.time(), request_id)
+                )
+                return cursor.rowcount > 0
+        except Exception as e:
+            raise DatabaseError(f"Failed to store enriched prompt: {e}")
+
+    @staticmethod
+    def claim_deferred_call_request(conn: sqlite3.Connection, request_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Take a call request off hold, in the caller's transaction.
+        
+        Args:
+            conn: Connection of an open write transaction
+            request_id: The ID of the call request
+            
+        Returns:
+            The request, or None if it is not waiting for payment (anymore)
+        """
+        row = conn.execute(
+            "UPDATE call_requests SET awaiting_payment = 0 WHERE id = ? AND awaiting_payment = 1 RETURNING *",
+            (request_id,)
+        ).fetchone()
+        return dict(row) if row else None
     
     def get_last_prompt(self) -> Optional[str]:
         """
@@ -103,24 +125,29 @@ class CallRepository:
         Raises:
             DatabaseError: If the query fails
         """
-        with self.lock:
-            try:
-                with self._get_connection() as conn:
-                    cursor = conn.execute(
-                        "SELECT prompt FROM call_requests ORDER BY id DESC LIMIT 1"
-                    )
-                    row = cursor.fetchone()
-                    return row["prompt"] if row else None
-            except Exception as e:
-                raise DatabaseError(f"Failed to get last prompt: {e}")
+        try:
+            with self.db.read() as conn:
+                cursor = conn.execute(
+                    "SELECT prompt FROM call_requests ORDER BY id DESC LIMIT 1"
+                )
+                row = cursor.fetchone()
+                return row["prompt"] if row else None
+        except Exception as e:
+            raise DatabaseError(f"Failed to get last prompt: {e}")
     
-    def get_call_requests(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+    def get_call_requests(
+        self, email: str, limit: int = 100, before_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Get call requests with pagination.
+        Get a page of call requests for an email, newest first.
+        
+        Keyset pagination: pass the last ``id`` of a page as ``before_id`` to get
+        the next one. Every page is an index seek, however deep it is.
         
         Args:
+            email: Email the requests were made with
             limit: Maximum number of records to return
-            offset: Number of records to skip
+            before_id: Only return requests with a smaller ID
             
         Returns:
             List of call request dictionaries
@@ -128,16 +155,40 @@ class CallRepository:
         Raises:
             DatabaseError: If the query fails
         """
-        with self.lock:
-            try:
-                with self._get_connection() as conn:
+        try:
+            with self.db.read() as conn:
+                if before_id is None:
+                    cursor = conn.execute(
+                        "SELECT * FROM call_requests WHERE email = ? ORDER BY id DESC LIMIT ?",
+                        (email, limit)
+                    )
+                else:
                     cursor = conn.execute(
-                        "SELECT * FROM call_requests ORDER BY id DESC LIMIT ? OFFSET ?",
-                        (limit, offset)
+                        "SELECT * FROM call_requests WHERE email = ? AND id < ? ORDER BY id DESC LIMIT ?",
+                        (email, before_id, limit)
                     )
-                    return [dict(row) for row in cursor.fetchall()]
-            except Exception as e:
-                raise DatabaseError(f"Failed to get call requests: {e}")
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            raise DatabaseError(f"Failed to get call requests: {e}")
+
+    def iter_call_requests(self, email: str, before_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every call request for an email, newest first, without loading them all.
+        
+        Raises:
+            DatabaseError: If the query fails
+        """
+        if before_id is None:
+            sql = "SELECT * FROM call_requests WHERE email = ? ORDER BY id DESC"
+            params: tuple = (email,)
+        else:
+            sql = "SELECT * FROM call_requests WHERE email = ? AND id < ? ORDER BY id DESC"
+            params = (email, before_id)
+        try:
+            for row in self.db.iterate(sql, params):
+                yield dict(row)
+        except Exception as e:
+            raise DatabaseError(f"Failed to stream call requests: {e}")
     
     def get_call_request_by_id(self, request_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -152,34 +203,32 @@ class CallRepository:
         Raises:
             DatabaseError: If the query fails
         """
-        with self.lock:
-            try:
-                with self._get_connection() as conn:
-                    cursor = conn.execute(
-                        "SELECT * FROM call_requests WHERE id = ?",
-                        (request_id,)
-                    )
-                    row = cursor.fetchone()
-                    return dict(row) if row else None
-            except Exception as e:
-                raise DatabaseError(f"Failed to get call request by ID: {e}")
+        try:
+            with self.db.read() as conn:
+                cursor = conn.execute(
+                    "SELECT * FROM call_requests WHERE id = ?",
+                    (request_id,)
+                )
+                row = cursor.fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            raise DatabaseError(f"Failed to get call request by ID: {e}")
 
     def get_last_call_request_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """
         Get the most recent call request for a given email.
         """
-        with self.lock:
-            try:
-                with self._get_connection() as conn:
-                    cursor = conn.execute(
-                        "SELECT * FROM call_requests WHERE email = ? ORDER BY id DESC LIMIT 1",
-                        (email,)
-                    )
-                    row = cursor.fetchone()
-                    return dict(row) if row else None
-            except Exception as e:
-                raise DatabaseError(f"Failed to get last call request by email: {e}")
+        try:
+            with self.db.read() as conn:
+                cursor = conn.execute(
+                    "SELECT * FROM call_requests WHERE email = ? ORDER BY id DESC LIMIT 1",
+                    (email,)
+                )
+                row = cursor.fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            raise DatabaseError(f"Failed to get last call request by email: {e}")
     
     def close(self):
-        """Close any remaining connections. This is a no-op since we use context managers."""
+        """Release repository resources. Connections are owned by the shared connection manager."""
         pass
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ...database.connection import get_connection_manager
+from ..core.exceptions import DatabaseError
+
+
+class CallRouteRepository:
+    """Maps dialed calls to the call request whose prompt they should use.
+
+    Routes are written when a call is dialed and looked up when OpenAI reports
+    the incoming SIP call. An in-memory index answers lookups in O(1) without
+    touching the database on the accept path; the SQLite table backs it up for
+    other workers and for entries evicted from memory.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 10000):
+        self.db_path = db_path
+        self.db = get_connection_manager(db_path)
+        self.max_entries = max(1, max_entries)
+        self._index: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _request_key(call_request_id: int) -> str:
+        return f"request:{call_request_id}"
+
+    def _remember(self, key: str, prompt: str) -> None:
+        with self._lock:
+            self._index[key] = prompt
+            self._index.move_to_end(key)
+            while len(self._index) > self.max_entries:
+                self._index.popitem(last=False)
+
+    def register(self, call_sid: str, call_request_id: int, prompt: Optional[str] = None) -> None:
+        """
+        Record which call request a dialed call belongs to.
+
+        Args:
+            call_sid: Twilio SID of the dialed call
+            call_request_id: ID of the ``call_requests`` row holding the prompt
+            prompt: The prompt itself, indexed in memory for the accept path
+
+        Raises:
+            DatabaseError: If the route cannot be stored
+        """
+        if prompt:
+            self._remember(call_sid, prompt)
+            self._remember(self._request_key(call_request_id), prompt)
+        try:
+            with self.db.write() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO call_routes (call_sid, call_request_id, created_at) VALUES (?, ?, ?)",
+                    (call_sid, call_request_id, time.time())
+                )
+        except Exception as e:
+            raise DatabaseError(f"Failed to store call route: {e}")
+
+    def lookup_cached(self, call_sid: Optional[str] = None, call_request_id: Optional[int] = None) -> Optional[str]:
+        """Memory-only lookup; never touches the database."""
+        with self._lock:
+            if call_request_id is not None:
+                prompt = self._index.get(self._request_key(call_request_id))
+                if prompt is not None:
+                    return prompt
+            if call_sid:
+                return self._index.get(call_sid)
+            return None
+
+    def resolve_prompt(self, call_sid: Optional[str] = None, call_request_id: Optional[int] = None) -> Optional[str]:
+        """
+        Resolve the prompt for a call, from memory first and SQLite second.
+
+        Returns:
+            The routed prompt, or None when the call is unknown
+
+        Raises:
+            DatabaseError: If the query fails
+        """
+        prompt = self.lookup_cached(call_sid, call_request_id)
+        if prompt is not None:
+            return prompt
+        try:
+            with self.db.read() as conn:
+                row = None
+                if call_request_id is not None:
+                    row = conn.execute(
+                        "SELECT prompt FROM call_requests WHERE id = ?", (call_request_id,)
+                    ).fetchone()
+                if row is None and call_sid:
+                    row = conn.execute(
+                        """SELECT r.prompt FROM call_routes cr
+                           JOIN call_requests r ON r.id = cr.call_request_id
+                           WHERE cr.call_sid = ?""",
+                        (call_sid,)
+                    ).fetchone()
+        except Exception as e:
+            raise DatabaseError(f"Failed to resolve call route: {e}")
+        if row is None:
+            return None
+        if call_sid:
+            self._remember(call_sid, row["prompt"])
+        return row["prompt"]
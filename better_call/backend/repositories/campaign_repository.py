@@ -0,0 +1,113 @@
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+from ...database.connection import get_connection_manager
+from ..core.exceptions import DatabaseError
+
+
+class CallCampaignRepository:
+    """Repository for batch call campaigns: one prompt sent to many destinations."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.db = get_connection_manager(db_path)
+
+    def insert_campaign(
+        self,
+        conn: sqlite3.Connection,
+        account_email: str,
+        email: str,
+        name: str,
+        raw_prompt: str,
+        prompt: str,
+        destinations: List[str],
+        dial_interval_seconds: float,
+    ) -> Dict[str, Any]:
+        """
+        Write a campaign, its call requests and its call jobs in the caller's transaction.
+
+        The call requests and jobs are each inserted with a single
+        ``executemany``. Jobs start at the ``dial`` stage (the prompt is already
+        enriched) and become due ``dial_interval_seconds`` apart, which paces
+        the dialing done by the call job workers.
+
+        Args:
+            conn: Connection of an open write transaction
+            account_email: Account the credits were taken from
+            email: Requester email as submitted
+            name: Name of the person making the request
+            raw_prompt: Prompt as submitted
+            prompt: Enriched prompt shared by every call
+            destinations: Validated, de-duplicated destination numbers
+            dial_interval_seconds: Delay between consecutive calls
+
+        Returns:
+            ``campaign_id`` and the ``jobs`` created, each with ``destination``,
+            ``job_id`` and ``call_request_id``
+        """
+        now = time.time()
+        campaign_id = conn.execute(
+            """INSERT INTO call_campaigns (account_email, email, name, raw_prompt, prompt, total, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (account_email, email, name, raw_prompt, prompt, len(destinations), now)
+        ).lastrowid
+
+        # The write lock is held, so every row above the current maximum is ours
+        last_request_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM call_requests").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO call_requests (email, phone_to, prompt) VALUES (?, ?, ?)",
+            ((email, destination, prompt) for destination in destinations)
+        )
+        request_ids = [
+            row[0] for row in conn.execute(
+                "SELECT id FROM call_requests WHERE id > ? ORDER BY id", (last_request_id,)
+            )
+        ]
+
+        last_job_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM call_jobs").fetchone()[0]
+        conn.executemany(
+            """INSERT INTO call_jobs
+               (account_email, email, name, destination, raw_prompt, prompt, call_request_id,
+                campaign_id, stage, next_attempt_at, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'dial', ?, ?, ?)""",
+            (
+                (account_email, email, name, destination, raw_prompt, prompt, request_id,
+                 campaign_id, now + i * dial_interval_seconds, now, now)
+                for i, (destination, request_id) in enumerate(zip(destinations, request_ids))
+            )
+        )
+        job_ids = [
+            row[0] for row in conn.execute(
+                "SELECT id FROM call_jobs WHERE id > ? ORDER BY id", (last_job_id,)
+            )
+        ]
+        return {
+            "campaign_id": campaign_id,
+            "jobs": [
+                {"destination": destination, "job_id": job_id, "call_request_id": request_id}
+                for destination, job_id, request_id in zip(destinations, job_ids, request_ids)
+            ],
+        }
+
+    def get_campaign(self, campaign_id: int) -> Optional[Dict[str, Any]]:
+        """Get a campaign by ID."""
+        try:
+            with self.db.read() as conn:
+                row = conn.execute("SELECT * FROM call_campaigns WHERE id = ?", (campaign_id,)).fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            raise DatabaseError(f"Failed to get campaign: {e}")
+
+    def get_campaign_jobs(self, campaign_id: int) -> List[Dict[str, Any]]:
+        """Get the call jobs of a campaign, in dialing order."""
+        try:
+            with self.db.read() as conn:
+                rows = conn.execute(
+                    """SELECT id, destination, status, stage, attempts, call_sid, call_request_id, last_error
+                       FROM call_jobs WHERE campaign_id = ? ORDER BY id""",
+                    (campaign_id,)
+                ).fetchall()
+                return [dict(row) for row in rows]
+        except Exception as e:
+            raise DatabaseError(f"Failed to get campaign jobs: {e}")
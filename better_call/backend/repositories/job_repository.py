@@ -0,0 +1,216 @@
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+from ...database.connection import get_connection_manager
+from ..core.exceptions import DatabaseError
+
+
+# Pipeline stages, in execution order. A job's ``stage`` is the next stage to run;
+# ``dialing`` means a dial was started and its outcome is not recorded yet.
+JOB_STAGES = ("enrich", "persist", "dial", "dialing", "done")
+
+_UPDATABLE_COLUMNS = {
+    "status",
+    "stage",
+    "prompt",
+    "call_request_id",
+    "call_sid",
+    "last_error",
+    "next_attempt_at",
+    "locked_by",
+    "locked_at",
+}
+
+
+class CallJobRepository:
+    """Repository for the durable call job queue."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.db = get_connection_manager(db_path)
+
+    def enqueue(
+        self,
+        account_email: str,
+        email: str,
+        name: str,
+        destination: str,
+        raw_prompt: str,
+        user_id: Optional[int] = None,
+    ) -> int:
+        """
+        Add a call job to the queue.
+
+        Args:
+            account_email: Email of the authenticated account that paid the credit
+            email: Requester email as submitted with the call
+            name: Name of the person making the request
+            destination: Destination phone number
+            raw_prompt: Prompt as submitted, before enrichment
+            user_id: Optional ID of the user the job belongs to
+
+        Returns:
+            The ID of the new job
+
+        Raises:
+            DatabaseError: If the insertion fails
+        """
+        try:
+            with self.db.write() as conn:
+                return self.enqueue_in(conn, account_email, email, name, destination, raw_prompt, user_id)
+        except Exception as e:
+            raise DatabaseError(f"Failed to enqueue call job: {e}")
+
+    @staticmethod
+    def enqueue_in(
+        conn: sqlite3.Connection,
+        account_email: str,
+        email: str,
+        name: str,
+        destination: str,
+        raw_prompt: str,
+        user_id: Optional[int] = None,
+    ) -> int:
+        """
+        Add a call job to the queue in the caller's transaction (see :meth:`enqueue`).
+
+        Lets the job commit together with the credit that pays for it.
+
+        Returns:
+            The ID of the new job
+        """
+        now = time.time()
+        return conn.execute(
+            """INSERT INTO call_jobs
+               (account_email, email, name, destination, raw_prompt, user_id,
+                next_attempt_at, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (account_email, email, name, destination, raw_prompt, user_id, now, now, now)
+        ).lastrowid
+
+    @staticmethod
+    def enqueue_call_request(conn: sqlite3.Connection, account_email: str, call_request: Dict[str, Any]) -> int:
+        """
+        Queue the call for an existing call request, in the caller's transaction.
+
+        The job points at the request instead of inserting another one. It
+        starts at ``dial`` when the request was enriched already, else at
+        ``enrich``.
+
+        Args:
+            conn: Connection of an open write transaction
+            account_email: Email of the authenticated account that paid the credit
+            call_request: The ``call_requests`` row
+
+        Returns:
+            The ID of the new job
+        """
+        now = time.time()
+        enriched = call_request.get("enriched_at") is not None
+        raw_prompt = call_request.get("raw_prompt")
+        if raw_prompt is None:
+            raw_prompt = call_request["prompt"]
+        return conn.execute(
+            """INSERT INTO call_jobs
+               (account_email, email, name, destination, raw_prompt, prompt, user_id, call_request_id,
+                stage, next_attempt_at, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                account_email,
+                call_request["email"],
+                call_request.get("name") or "",
+                call_request["phone_to"],
+                raw_prompt,
+                call_request["prompt"] if enriched else None,
+                call_request.get("user_id"),
+                call_request["id"],
+                "dial" if enriched else "enrich",
+                now,
+                now,
+                now,
+            )
+        ).lastrowid
+
+    def claim_next(self, worker_id: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the next due job.
+
+        Queued jobs whose ``next_attempt_at`` has passed are eligible, as are
+        running jobs whose lease expired (their worker died mid-job).
+
+        Returns:
+            The claimed job, or None when nothing is due
+        """
+        now = time.time()
+        try:
+            with self.db.write() as conn:
+                # Two single-index lookups rather than one OR, which would sort every due job
+                job_id = conn.execute(
+                    """SELECT id FROM call_jobs
+                       WHERE status = 'running' AND locked_at < ?
+                       ORDER BY locked_at LIMIT 1""",
+                    (now - lease_seconds,)
+                ).fetchone()
+                if job_id is None:
+                    job_id = conn.execute(
+                        """SELECT id FROM call_jobs
+                           WHERE status = 'queued' AND next_attempt_at <= ?
+                           ORDER BY next_attempt_at, id LIMIT 1""",
+                        (now,)
+                    ).fetchone()
+                if job_id is None:
+                    return None
+                row = conn.execute(
+                    """UPDATE call_jobs
+                       SET status = 'running', locked_by = ?, locked_at = ?,
+                           attempts = attempts + 1, updated_at = ?
+                       WHERE id = ?
+                       RETURNING *""",
+                    (worker_id, now, now, job_id["id"])
+                ).fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            raise DatabaseError(f"Failed to claim call job: {e}")
+
+    def update_job(self, job_id: int, **fields: Any) -> None:
+        """
+        Update job columns and refresh its lease.
+
+        Raises:
+            DatabaseError: If the update fails
+        """
+        unknown = set(fields) - _UPDATABLE_COLUMNS
+        if unknown:
+            raise DatabaseError(f"Unknown call job columns: {sorted(unknown)}")
+        now = time.time()
+        fields.setdefault("locked_at", now)
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        try:
+            with self.db.write() as conn:
+                conn.execute(
+                    f"UPDATE call_jobs SET {assignments}, updated_at = ? WHERE id = ?",
+                    (*fields.values(), now, job_id)
+                )
+        except Exception as e:
+            raise DatabaseError(f"Failed to update call job: {e}")
+
+    def schedule_retry(self, job_id: int, error: str, delay_seconds: float) -> None:
+        """Release a job back to the queue to be retried after ``delay_seconds``."""
+        self.update_job(
+            job_id,
+            status="queued",
+            last_error=error,
+            next_attempt_at=time.time() + delay_seconds,
+            locked_by=None,
+            locked_at=None,
+        )
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get a job by ID."""
+        try:
+            with self.db.read() as conn:
+                row = conn.execute("SELECT * FROM call_jobs WHERE id = ?", (job_id,)).fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            raise DatabaseError(f"Failed to get call job: {e}")
@@ -8,8 +8,9 @@ from ..core.config import settings
 class PaymentRepository:
     """Repository for payment data operations."""
     
-    def __init__(self):
-        self.db = PromptDB(settings.db_path)
+    def __init__(self, db: Optional[PromptDB] = None):
+        # Reuse the application's PromptDB when given one; building a new one runs its DDL
+        self.db = db or PromptDB(settings.db_path)
     
     def create_payment(self, user_id: int, stripe_payment_link_id: Optional[str], amount: Decimal, currency: str = "usd", 
                       description: Optional[str] = None, customer_email: Optional[str] = None,
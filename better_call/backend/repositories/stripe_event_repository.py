@@ -0,0 +1,121 @@
+import sqlite3
+import time
+from typing import Any, Dict, List, Tuple
+
+from ...database.connection import get_connection_manager
+from ..core.exceptions import DatabaseError
+
+
+class StripeEventRepository:
+    """Idempotency store and inbox for Stripe webhook events, keyed by event id."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.db = get_connection_manager(db_path)
+
+    def record(self, event_id: str, event_type: str, payload: str) -> bool:
+        """
+        Store a verified event for background processing.
+
+        Args:
+            event_id: Stripe event id (``evt_...``)
+            event_type: Stripe event type
+            payload: Raw event JSON
+
+        Returns:
+            True if the event is new, False if it was already received
+
+        Raises:
+            DatabaseError: If the insert fails
+        """
+        try:
+            with self.db.write() as conn:
+                cursor = conn.execute(
+                    """INSERT OR IGNORE INTO stripe_events (event_id, event_type, payload, received_at)
+                       VALUES (?, ?, ?, ?)""",
+                    (event_id, event_type, payload, time.time())
+                )
+                return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to record Stripe event: {e}")
+
+    def pending(self, limit: int) -> List[Dict[str, Any]]:
+        """Oldest events not yet processed."""
+        try:
+            with self.db.read() as conn:
+                rows = conn.execute(
+                    """SELECT event_id, event_type, payload FROM stripe_events
+                       WHERE status = 'pending' ORDER BY received_at LIMIT ?""",
+                    (limit,)
+                ).fetchall()
+                return [dict(row) for row in rows]
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to read pending Stripe events: {e}")
+
+    def apply_batch(self, paid_link_ids: List[str], outcomes: List[Tuple[str, str, Any]]) -> List[int]:
+        """
+        Mark payments paid, credit their payers and close out their events in one transaction.
+
+        Each payer gets one credit when their payment changes to paid, so a
+        replayed event never credits twice.
+
+        Args:
+            paid_link_ids: Stripe payment link ids whose payment completed
+            outcomes: ``(event_id, status, last_error)`` for every event in the batch
+
+        Returns:
+            IDs of the payments that changed to paid
+
+        Raises:
+            DatabaseError: If the transaction fails
+        """
+        now = time.time()
+        try:
+            with self.db.write() as conn:
+                paid_ids = []
+                for link_id in paid_link_ids:
+                    row = conn.execute(
+                        """UPDATE payments SET status = 'paid', updated_at = CURRENT_TIMESTAMP
+                           WHERE stripe_payment_link_id = ? AND status != 'paid' RETURNING id""",
+                        (link_id,)
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    paid_ids.append(row[0])
+                    payer = conn.execute(
+                        """UPDATE users SET credits = credits + 1
+                           WHERE id = (SELECT user_id FROM payments WHERE id = ?) RETURNING email""",
+                        (row[0],)
+                    ).fetchone()
+                    if payer is not None:
+                        # Picked up by every worker's user cache on its next sync
+                        conn.execute(
+                            "INSERT INTO user_cache_invalidations (email, created_at) VALUES (?, ?)",
+                            (payer[0], now)
+                        )
+                conn.executemany(
+                    """UPDATE stripe_events SET status = ?, last_error = ?, processed_at = ?
+                       WHERE event_id = ? AND status = 'pending'""",
+                    ((status, error, now, event_id) for event_id, status, error in outcomes)
+                )
+                return paid_ids
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to apply Stripe events: {e}")
+
+    def prune(self, older_than_seconds: float) -> int:
+        """Forget handled events older than the retention window; returns rows deleted."""
+        cutoff = time.time() - older_than_seconds
+        try:
+            with self.db.write() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM stripe_events WHERE status IN ('processed', 'ignored') AND received_at < ?",
+                    (cutoff,)
+                )
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to prune Stripe events: {e}")
+
+    def pending_count(self) -> int:
+        """Number of events still waiting for the consumer."""
+        with self.db.read() as conn:
+            return conn.execute("SELECT COUNT(*) FROM stripe_events WHERE status = 'pending'").fetchone()[0]
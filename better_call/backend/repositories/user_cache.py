@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ...database.connection import ConnectionManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """Bounded in-process cache of user rows keyed by email, with TTL.
+
+    Writes in this process invalidate entries synchronously. Writes in other
+    worker processes are picked up through the ``user_cache_invalidations``
+    log: every credit or user change appends a row in the same transaction,
+    and the cache compares the newest version it has seen with the log at
+    most once per ``sync_interval_seconds``, evicting the emails that changed.
+    """
+
+    def __init__(
+        self,
+        db: ConnectionManager,
+        max_entries: int = 10000,
+        ttl_seconds: float = 30.0,
+        sync_interval_seconds: float = 1.0,
+    ):
+        self.db = db
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.sync_interval_seconds = sync_interval_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        # Bumped on every invalidation; a fill that raced one is dropped
+        self._generation = 0
+        self._version = 0
+        self._last_sync = 0.0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "remote_invalidations": 0,
+        }
+
+    def start(self) -> None:
+        """Start from the current end of the invalidation log."""
+        with self.db.read() as conn:
+            row = conn.execute("SELECT COALESCE(MAX(seq), 0) AS version FROM user_cache_invalidations").fetchone()
+        self._version = row["version"]
+        self._last_sync = time.monotonic()
+
+    def generation(self) -> int:
+        """Token to pass to :meth:`put` for a row read after this call."""
+        with self._lock:
+            return self._generation
+
+    def get(self, email: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached row, or None on a miss."""
+        self._sync()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[email]
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(email)
+            self._counters["hits"] += 1
+            return dict(entry[1])
+
+    def put(self, email: str, row: Dict[str, Any], generation: int) -> None:
+        """Cache ``row`` unless an invalidation happened since ``generation``."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[email] = (time.monotonic(), dict(row))
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, email: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(email, None)
+            self._counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def _sync(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sync < self.sync_interval_seconds:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            # Another thread is already syncing
+            return
+        try:
+            if now - self._last_sync > self.ttl_seconds:
+                # Every entry predates the log window we could replay; start over
+                self.clear()
+                self.start()
+                return
+            with self.db.read() as conn:
+                rows = conn.execute(
+                    "SELECT seq, email FROM user_cache_invalidations WHERE seq > ? ORDER BY seq",
+                    (self._version,)
+                ).fetchall()
+            with self._lock:
+                if rows:
+                    self._generation += 1
+                for row in rows:
+                    if self._entries.pop(row["email"], None) is not None:
+                        self._counters["remote_invalidations"] += 1
+                    self._version = row["seq"]
+            self._last_sync = now
+        except Exception as e:
+            logger.warning("User cache sync failed, clearing cache: %s", e)
+            self.clear()
+        finally:
+            self._sync_lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy."""
+        with self._lock:
+            counters = dict(self._counters)
+            counters["entries"] = len(self._entries)
+            counters["version"] = self._version
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        return counters
@@ -1,104 +1,199 @@
 import sqlite3
-import threading
-from typing import Optional
+import time
+from typing import Callable, Optional, Tuple, TypeVar
 
-import bcrypt
+from ...database.connection import get_connection_manager
+from ..core.config import settings
+from ..core.exceptions import BetterCallException, DatabaseError, PasswordHasherBusyError
+from ..core.passwords import get_password_hasher
+from .user_cache import UserCache
 
-from ..core.exceptions import DatabaseError
+T = TypeVar("T")
 
 
 class UserRepository:
-    """Repository for managing users and credits."""
+    """Repository for managing users and credits.
+
+    Credit mutations are single conditional UPDATEs inside ``BEGIN IMMEDIATE``
+    transactions (retried while the database is busy), so they stay correct
+    across threads and across uvicorn worker processes without a Python lock.
+
+    User rows are read through a :class:`UserCache`; every write invalidates
+    the changed email here and logs it for the other workers.
+    """
 
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.lock = threading.Lock()
-        self._initialize_database()
+        self.db = get_connection_manager(db_path)
+        self.cache = UserCache(
+            self.db,
+            max_entries=settings.user_cache_max_entries,
+            ttl_seconds=settings.user_cache_ttl_seconds,
+            sync_interval_seconds=settings.user_cache_sync_interval_seconds,
+        )
+        self.cache.start()
+        self._last_prune = time.time()
 
-    def _get_connection(self):
-        return sqlite3.connect(self.db_path, check_same_thread=False)
+    def _log_change(self, conn: sqlite3.Connection, email: str) -> None:
+        """Record a user change for other workers' caches, in the caller's transaction."""
+        now = time.time()
+        conn.execute(
+            "INSERT INTO user_cache_invalidations (email, created_at) VALUES (?, ?)",
+            (email, now)
+        )
+        # Caches replay at most one TTL of history; keep twice that
+        retention = max(self.cache.ttl_seconds, 60.0) * 2
+        if now - self._last_prune > retention:
+            self._last_prune = now
+            conn.execute("DELETE FROM user_cache_invalidations WHERE created_at < ?", (now - retention,))
 
-    def _initialize_database(self) -> None:
+    def create_user(self, email: str, password: str) -> int:
         try:
-            with self._get_connection() as conn:
-                conn.execute(
-                    '''
-                    CREATE TABLE IF NOT EXISTS users (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        email TEXT NOT NULL UNIQUE,
-                        password_hash TEXT NOT NULL,
-                        credits INTEGER NOT NULL DEFAULT 0,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                    '''
-                )
-                conn.commit()
+            password_hash = get_password_hasher().hash(password)
+        except PasswordHasherBusyError:
+            raise
         except Exception as e:
-            raise DatabaseError(f"Failed to initialize users table: {e}")
+            raise DatabaseError(f"Failed to create user: {e}")
+        return self.insert_user(email, password_hash)
 
-    def create_user(self, email: str, password: str) -> int:
-        with self.lock:
-            try:
-                password_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
-                with self._get_connection() as conn:
-                    cursor = conn.execute(
-                        "INSERT INTO users (email, password_hash, credits) VALUES (?, ?, ?)",
-                        (email, password_hash, 0)
-                    )
-                    conn.commit()
-                    return cursor.lastrowid
-            except sqlite3.IntegrityError as e:
-                raise DatabaseError(f"User already exists: {e}")
-            except Exception as e:
-                raise DatabaseError(f"Failed to create user: {e}")
+    def insert_user(self, email: str, password_hash: str) -> int:
+        """
+        Insert a user whose password was already hashed.
+
+        Args:
+            email: User email
+            password_hash: bcrypt hash of the password
+
+        Returns:
+            The ID of the new user
+
+        Raises:
+            DatabaseError: If the user exists or the insertion fails
+        """
+        def insert(conn: sqlite3.Connection) -> int:
+            cursor = conn.execute(
+                "INSERT INTO users (email, password_hash, credits) VALUES (?, ?, ?)",
+                (email, password_hash, 0)
+            )
+            self._log_change(conn, email)
+            return cursor.lastrowid
+
+        try:
+            return self.db.run_in_transaction(insert)
+        except sqlite3.IntegrityError as e:
+            raise DatabaseError(f"User already exists: {e}")
+        except Exception as e:
+            raise DatabaseError(f"Failed to create user: {e}")
+        finally:
+            self.cache.invalidate(email)
 
     def get_user_by_email(self, email: str) -> Optional[dict]:
+        user = self.cache.get(email)
+        if user is not None:
+            return user
+        generation = self.cache.generation()
         try:
-            with self._get_connection() as conn:
-                conn.row_factory = sqlite3.Row
+            with self.db.read() as conn:
                 cursor = conn.execute("SELECT * FROM users WHERE email = ?", (email,))
                 row = cursor.fetchone()
-                return dict(row) if row else None
         except Exception as e:
             raise DatabaseError(f"Failed to fetch user: {e}")
+        if row is None:
+            return None
+        user = dict(row)
+        self.cache.put(email, user, generation)
+        return user
 
     def verify_user(self, email: str, password: str) -> bool:
         user = self.get_user_by_email(email)
         if not user:
             return False
-        try:
-            return bcrypt.checkpw(password.encode("utf-8"), user["password_hash"].encode("utf-8"))
-        except Exception:
-            return False
+        return get_password_hasher().verify(password, user["password_hash"])
 
     def get_credits(self, email: str) -> int:
         user = self.get_user_by_email(email)
         return int(user["credits"]) if user else 0
 
     def increment_credit(self, email: str, amount: int = 1) -> None:
-        with self.lock:
-            try:
-                with self._get_connection() as conn:
-                    conn.execute(
-                        "UPDATE users SET credits = credits + ? WHERE email = ?",
-                        (amount, email)
-                    )
-                    conn.commit()
-            except Exception as e:
-                raise DatabaseError(f"Failed to increment credits: {e}")
+        def increment(conn: sqlite3.Connection) -> None:
+            cursor = conn.execute(
+                "UPDATE users SET credits = credits + ? WHERE email = ?",
+                (amount, email)
+            )
+            if cursor.rowcount > 0:
+                self._log_change(conn, email)
+
+        try:
+            self.db.run_in_transaction(increment)
+        except Exception as e:
+            raise DatabaseError(f"Failed to increment credits: {e}")
+        finally:
+            self.cache.invalidate(email)
 
     def decrement_credit(self, email: str) -> bool:
         """Atomically decrement a single credit if available. Returns True if decremented."""
-        with self.lock:
-            try:
-                with self._get_connection() as conn:
-                    cursor = conn.execute(
-                        "UPDATE users SET credits = credits - 1 WHERE email = ? AND credits > 0",
-                        (email,)
-                    )
-                    conn.commit()
-                    return cursor.rowcount > 0
-            except Exception as e:
-                raise DatabaseError(f"Failed to decrement credits: {e}")
+        def decrement(conn: sqlite3.Connection) -> bool:
+            cursor = conn.execute(
+                "UPDATE users SET credits = credits - 1 WHERE email = ? AND credits > 0",
+                (email,)
+            )
+            if cursor.rowcount == 0:
+                return False
+            self._log_change(conn, email)
+            return True
+
+        try:
+            decremented = self.db.run_in_transaction(decrement)
+        except Exception as e:
+            raise DatabaseError(f"Failed to decrement credits: {e}")
+        if decremented:
+            self.cache.invalidate(email)
+        return decremented
 
+    def reserve_credits(
+        self,
+        email: str,
+        count: int,
+        work: Optional[Callable[[sqlite3.Connection], T]] = None,
+    ) -> Tuple[bool, Optional[T]]:
+        """
+        Atomically take ``count`` credits, all or none, and run ``work`` in the same transaction.
 
+        ``work(conn)`` lets the caller write the rows the credits pay for in the
+        same commit: if it raises, the credits are given back by the rollback.
+        ``work`` can abort the reservation on purpose by raising a
+        :class:`BetterCallException`, which reaches the caller unchanged; nothing
+        is debited, so there is never a refund to make afterwards.
+
+        Args:
+            email: Account to charge
+            count: Number of credits to take
+            work: Optional follow-up writes, run only when the credits were taken
+
+        Returns:
+            ``(True, work result)`` when reserved, ``(False, None)`` when the
+            balance is too low
+
+        Raises:
+            BetterCallException: Raised by ``work``, after the rollback
+            DatabaseError: If the transaction fails
+        """
+        def reserve(conn: sqlite3.Connection) -> Tuple[bool, Optional[T]]:
+            cursor = conn.execute(
+                "UPDATE users SET credits = credits - ? WHERE email = ? AND credits >= ?",
+                (count, email, count)
+            )
+            if cursor.rowcount == 0:
+                return False, None
+            self._log_change(conn, email)
+            return True, work(conn) if work is not None else None
+
+        try:
+            result = self.db.run_in_transaction(reserve)
+        except BetterCallException:
+            raise
+        except Exception as e:
+            raise DatabaseError(f"Failed to reserve credits: {e}")
+        if result[0]:
+            self.cache.invalidate(email)
+        return result
@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..core.exceptions import CallServiceError, OpenAIServiceError, TwilioConfigurationError
+from ..repositories.call_repository import CallRepository
+from ..repositories.call_route_repository import CallRouteRepository
+from ..repositories.job_repository import CallJobRepository
+from ..repositories.user_repository import UserRepository
+from .call_service import CallService
+from .event_bus import EventBus, job_topic
+
+
+logger = logging.getLogger(__name__)
+
+# Writes recording a placed call are retried on their own, never by dialing again
+_RECORD_ATTEMPTS = 3
+_RECORD_BACKOFF_SECONDS = 0.5
+
+
+class CallJobWorker:
+    """In-process async worker pool draining the durable call job queue.
+
+    Each job runs the CallService stages (enrich -> persist -> dial). Progress is
+    checkpointed after every stage, so a retried or recovered job resumes where
+    it stopped instead of enriching or inserting again. Failed stages are
+    retried with exponential backoff; when a job runs out of attempts its
+    reserved credit is refunded.
+
+    Dialing is never retried: the job is marked ``dialing`` before Twilio is
+    called, and a job found in that stage again (its outcome unknown) fails
+    for manual review rather than calling the same person twice.
+    """
+
+    def __init__(
+        self,
+        job_repository: CallJobRepository,
+        call_repository: Optional[CallRepository],
+        user_repository: Optional[UserRepository],
+        call_routes: Optional[CallRouteRepository] = None,
+        concurrency: Optional[int] = None,
+        call_service_factory: Optional[Callable[[], CallService]] = None,
+        event_bus: Optional[EventBus] = None,
+    ):
+        self.job_repository = job_repository
+        self.call_repository = call_repository
+        self.user_repository = user_repository
+        self.call_routes = call_routes
+        self.concurrency = concurrency or settings.call_job_workers
+        self.worker_id = f"{os.uname().nodename}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # A service from the factory belongs to the caller, which also closes it
+        self._call_service_factory = call_service_factory
+        self._call_service: Optional[CallService] = None
+        # Receives dialing/completed/failed/retrying transitions for each job
+        self.event_bus = event_bus
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        """Spawn the worker tasks on the running event loop."""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"call-job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks; jobs they held are recovered once their lease expires."""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._call_service_factory is None and self._call_service is not None:
+            await self._call_service.aclose()
+        self._call_service = None
+
+    def notify(self) -> None:
+        """Wake idle workers after a job was enqueued."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _publish(self, job: Dict[str, Any], event_type: str, **fields: Any) -> None:
+        if self.event_bus is not None:
+            self.event_bus.publish(job_topic(job["id"]), {"type": event_type, "job_id": job["id"], **fields})
+
+    def _get_call_service(self) -> CallService:
+        if self._call_service is None:
+            if self._call_service_factory is not None:
+                self._call_service = self._call_service_factory()
+            else:
+                self._call_service = CallService(call_routes=self.call_routes)
+        return self._call_service
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                job = await run_in_threadpool(
+                    self.job_repository.claim_next, self.worker_id, settings.call_job_lease_seconds
+                )
+            except Exception as e:
+                logger.exception("Call job claim failed")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.call_job_poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._process(job)
+            except Exception:
+                # Keep the worker alive; the job is recovered when its lease expires
+                logger.exception("Call job processing failed", extra={"job_id": job["id"]})
+
+    async def _process(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        try:
+            await self._run_stages(job)
+        except asyncio.CancelledError:
+            raise
+        except (TwilioConfigurationError, OpenAIServiceError) as e:
+            # Configuration problems won't fix themselves on retry
+            await self._fail(job, e.message)
+        except Exception as e:
+            error = str(e)
+            if job["attempts"] >= settings.call_job_max_attempts:
+                await self._fail(job, error)
+                return
+            delay = min(
+                settings.call_job_backoff_base_seconds * (2 ** (job["attempts"] - 1)),
+                settings.call_job_backoff_max_seconds,
+            )
+            logger.warning(
+                "Call job attempt failed, retrying",
+                extra={"job_id": job_id, "attempt": job["attempts"], "retry_in_s": delay, "error": error},
+            )
+            await run_in_threadpool(self.job_repository.schedule_retry, job_id, error, delay)
+            self._publish(job, "retrying", error=error, retry_in_s=delay)
+
+    async def _run_stages(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        service = self._get_call_service()
+
+        if job["stage"] == "enrich":
+            job["prompt"] = await service.enrich_async(job["name"], job["raw_prompt"] or "")
+            job["stage"] = "persist"
+            await run_in_threadpool(
+                self.job_repository.update_job, job_id, stage="persist", prompt=job["prompt"]
+            )
+
+        if job["stage"] == "persist":
+            call_request_id = job["call_request_id"]
+            if call_request_id is not None:
+                # Dispatched from a request saved earlier: fill in its prompt, don't insert another
+                if self.call_repository is not None:
+                    await run_in_threadpool(self.call_repository.set_enriched_prompt, call_request_id, job["prompt"])
+            elif self.call_repository is not None:
+                call_request_id = await service.persist_async(
+                    self.call_repository,
+                    email=job["email"],
+                    phone_to=job["destination"],
+                    prompt=job["prompt"],
+                    user_id=job["user_id"],
+                )
+            job["stage"] = "dial"
+            job["call_request_id"] = call_request_id
+            await run_in_threadpool(
+                self.job_repository.update_job, job_id, stage="dial", call_request_id=call_request_id
+            )
+
+        if job["stage"] == "dialing":
+            # A previous attempt got as far as dialing; the call may have been placed
+            if job["call_sid"]:
+                await self._complete(job, job["call_sid"])
+            else:
+                await self._fail(job, "Dial outcome unknown, needs manual review", refund=False)
+            return
+
+        if job["stage"] == "dial":
+            # Checkpointed before dialing: if this write fails, nobody is called
+            job["stage"] = "dialing"
+            await run_in_threadpool(self.job_repository.update_job, job_id, stage="dialing")
+            self._publish(job, "dialing", to=job["destination"])
+            try:
+                call_result = await service.dial_async(
+                    job["destination"],
+                    call_request_id=job["call_request_id"],
+                    prompt=job["prompt"],
+                )
+            except CallServiceError as e:
+                if "twilio_error" not in e.details:
+                    await self._fail(job, f"{e.message}; dial outcome unknown, needs manual review", refund=False)
+                    return
+                # Twilio answered with an error, so no call was created: safe to retry
+                job["stage"] = "dial"
+                await run_in_threadpool(self.job_repository.update_job, job_id, stage="dial")
+                raise
+            await self._complete(job, call_result["call_sid"])
+
+    async def _complete(self, job: Dict[str, Any], call_sid: str) -> None:
+        """Record a placed call, retrying only this write; the call itself is never repeated."""
+        for attempt in range(1, _RECORD_ATTEMPTS + 1):
+            try:
+                await run_in_threadpool(
+                    self.job_repository.update_job,
+                    job["id"],
+                    status="completed",
+                    stage="done",
+                    call_sid=call_sid,
+                    last_error=None,
+                    locked_by=None,
+                )
+                break
+            except Exception:
+                if attempt == _RECORD_ATTEMPTS:
+                    # Left in ``dialing``: once its lease expires it fails for manual review
+                    logger.exception("Failed to record placed call", extra={"job_id": job["id"], "call_sid": call_sid})
+                    return
+                await asyncio.sleep(_RECORD_BACKOFF_SECONDS * attempt)
+        self._publish(job, "completed", call_sid=call_sid)
+
+    async def _fail(self, job: Dict[str, Any], error: str, refund: bool = True) -> None:
+        logger.error("Call job failed permanently", extra={"job_id": job["id"], "error": error})
+        await run_in_threadpool(
+            self.job_repository.update_job, job["id"], status="failed", last_error=error, locked_by=None
+        )
+        self._publish(job, "failed", error=error)
+        if refund and self.user_repository is not None:
+            try:
+                await run_in_threadpool(self.user_repository.increment_credit, job["account_email"], 1)
+            except Exception as e:
+                logger.exception("Credit refund failed", extra={"job_id": job["id"]})
@@ -1,18 +1,53 @@
+import asyncio
+import logging
+import weakref
 from typing import Optional, Dict, Any
 
+from starlette.concurrency import run_in_threadpool
+
 from ..models.requests import CallRequest
 from ..models.responses import CallResponse
+from ..core.config import settings
 from ..core.exceptions import CallServiceError, DatabaseError
+from ..repositories.call_route_repository import CallRouteRepository
 from .openai_service import OpenAIService
 from .twilio_service import TwilioService
+from .upstream_clients import UpstreamClients
+
+
+logger = logging.getLogger(__name__)
+
+# Concurrency limits are shared by every CallService in the event loop, so
+# they hold even though a service instance is built per request.
+_stage_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _stage_limit(stage: str) -> asyncio.Semaphore:
+    """Return the semaphore bounding concurrent work for a pipeline stage."""
+    loop = asyncio.get_running_loop()
+    limits = _stage_limits.get(loop)
+    if limits is None:
+        limits = {
+            "enrich": asyncio.Semaphore(settings.call_enrich_concurrency),
+            "persist": asyncio.Semaphore(settings.call_persist_concurrency),
+            "dial": asyncio.Semaphore(settings.call_dial_concurrency),
+        }
+        _stage_limits[loop] = limits
+    return limits[stage]
 
 
 class CallService:
     """Main service for handling call operations."""
     
-    def __init__(self):
-        self.openai_service = OpenAIService()
-        self.twilio_service = TwilioService()
+    def __init__(
+        self,
+        call_routes: Optional[CallRouteRepository] = None,
+        clients: Optional[UpstreamClients] = None,
+    ):
+        self.openai_service = OpenAIService(clients=clients)
+        self.twilio_service = TwilioService(call_routes=call_routes, clients=clients)
     
     def process_call_request(
         self, 
@@ -41,9 +76,10 @@ class CallService:
             )
             
             # Step 2: Store in database (optional, don't fail if this fails)
+            call_request_id = None
             if db_instance:
                 try:
-                    db_instance.insert_call_request(
+                    call_request_id = db_instance.insert_call_request(
                         email=request.email,
                         phone_to=request.destination,
                         prompt=enriched_prompt,
@@ -51,10 +87,14 @@ class CallService:
                     )
                 except Exception as e:
                     # Log but don't fail the call
-                    print(f"Database storage failed: {e}")
+                    logger.warning("Database storage failed: %s", e)
             
             # Step 3: Make the call
-            call_result = self.twilio_service.make_call(request.destination)
+            call_result = self.twilio_service.make_call(
+                request.destination,
+                call_request_id=call_request_id,
+                prompt=enriched_prompt,
+            )
             
             return CallResponse(
                 ok=True,
@@ -71,3 +111,107 @@ class CallService:
                 error=error_message,
                 details=details
             )
+
+    async def process_call_request_async(
+        self,
+        request: CallRequest,
+        db_instance: Optional[Any] = None,
+        user_id: Optional[int] = None,
+    ) -> CallResponse:
+        """
+        Async variant of :meth:`process_call_request`.
+
+        Runs the same enrich -> persist -> dial pipeline without holding a worker
+        thread: enrichment and dialing use the async OpenAI and Twilio clients and
+        the repository insert runs in the threadpool. Each stage is bounded by its
+        own concurrency limit (see ``CALL_*_CONCURRENCY`` settings).
+        
+        Args:
+            request: The call request data
+            db_instance: Optional database instance for storing the request
+            user_id: Optional ID of the user the request belongs to
+            
+        Returns:
+            CallResponse with the result of the operation
+        """
+        try:
+            # Step 1: Enrich the prompt
+            enriched_prompt = await self.enrich_async(request.name, request.prompt or "")
+
+            # Step 2: Store in database (optional, don't fail if this fails)
+            call_request_id = None
+            if db_instance:
+                try:
+                    call_request_id = await self.persist_async(
+                        db_instance,
+                        email=request.email,
+                        phone_to=request.destination,
+                        prompt=enriched_prompt,
+                        user_id=user_id,
+                    )
+                except Exception as e:
+                    # Log but don't fail the call
+                    logger.warning("Database storage failed: %s", e)
+
+            # Step 3: Make the call
+            call_result = await self.dial_async(
+                request.destination,
+                call_request_id=call_request_id,
+                prompt=enriched_prompt,
+            )
+
+            return CallResponse(
+                ok=True,
+                call_sid=call_result["call_sid"],
+                to=call_result["to"]
+            )
+
+        except Exception as e:
+            error_message = str(e)
+            details = getattr(e, 'details', None)
+
+            return CallResponse(
+                ok=False,
+                error=error_message,
+                details=details
+            )
+
+    async def enrich_async(self, name: str, raw_prompt: str) -> str:
+        """Pipeline stage 1: enrich the raw prompt (falls back to it on failure)."""
+        async with _stage_limit("enrich"):
+            return await self.openai_service.enrich_prompt_async(name, raw_prompt)
+
+    async def persist_async(
+        self,
+        db_instance: Any,
+        email: str,
+        phone_to: str,
+        prompt: str,
+        user_id: Optional[int] = None,
+    ) -> int:
+        """Pipeline stage 2: store the call request; returns the new row ID."""
+        async with _stage_limit("persist"):
+            return await run_in_threadpool(
+                db_instance.insert_call_request,
+                email=email,
+                phone_to=phone_to,
+                prompt=prompt,
+                user_id=user_id,
+            )
+
+    async def dial_async(
+        self,
+        destination: str,
+        call_request_id: Optional[int] = None,
+        prompt: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Pipeline stage 3: place the call through Twilio and route it to its request."""
+        async with _stage_limit("dial"):
+            return await self.twilio_service.make_call_async(
+                destination, call_request_id=call_request_id, prompt=prompt
+            )
+
+    async def aclose(self) -> None:
+        """Release the async upstream clients this service opened itself."""
+        await self.openai_service.aclose()
+        await self.twilio_service.aclose()
@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from ...database.connection import get_connection_manager
+from ..core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class EnrichmentCache:
+    """Two-tier cache for enriched prompts.
+
+    An in-memory LRU with TTL sits in front of a persistent SQLite table.
+    Entries are content-addressed by a hash of the instructions version, the
+    user name and the raw prompt, and concurrent lookups for the same key are
+    coalesced so only one upstream enrichment runs at a time.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 1024, ttl_seconds: float = 86400.0):
+        self.db_path = db_path
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_async: Dict[str, asyncio.Future] = {}
+        self._counters = {
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+        }
+
+    @property
+    def db(self):
+        # Resolved on every use: the cache outlives app lifespans, managers don't.
+        return get_connection_manager(self.db_path)
+
+    @staticmethod
+    def make_key(instructions_version: str, name: str, raw_prompt: str) -> str:
+        """Content address for an enrichment request."""
+        material = "\x00".join((instructions_version, name.strip(), raw_prompt.strip()))
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set_memory(self, key: str, value: str, stored_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Look a key up in memory, then in SQLite (promoting hits to memory)."""
+        value = self._get_memory(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        return self._get_persistent(key)
+
+    def _get_persistent(self, key: str) -> Optional[str]:
+        try:
+            with self.db.read() as conn:
+                row = conn.execute(
+                    "SELECT enriched_prompt, created_at FROM enrichment_cache WHERE cache_key = ?",
+                    (key,),
+                ).fetchone()
+        except Exception as e:
+            logger.warning("Enrichment cache lookup failed: %s", e)
+            row = None
+        if row is not None and time.time() - row["created_at"] <= self.ttl_seconds:
+            self._set_memory(key, row["enriched_prompt"], row["created_at"])
+            self._count("db_hits")
+            return row["enriched_prompt"]
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store an enriched prompt in both tiers."""
+        now = time.time()
+        self._set_memory(key, value, now)
+        try:
+            with self.db.write() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO enrichment_cache (cache_key, enriched_prompt, created_at) VALUES (?, ?, ?)",
+                    (key, value, now),
+                )
+        except Exception as e:
+            logger.warning("Enrichment cache store failed: %s", e)
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> str:
+        """Return the cached value or run ``compute`` once for all concurrent callers.
+
+        Empty results are returned but not cached; exceptions propagate to every
+        waiting caller.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self._counters["coalesced"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            value = compute()
+            if value:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def get_or_compute_async(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Async counterpart of :meth:`get_or_compute`; SQLite access runs in the threadpool.
+
+        A leader that is cancelled doesn't cancel its followers: the next one
+        in line computes the value instead.
+        """
+        value = self._get_memory(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        value = await run_in_threadpool(self._get_persistent, key)
+        if value is not None:
+            return value
+
+        while True:
+            future = self._inflight_async.get(key)
+            if future is None:
+                break
+            self._count("coalesced")
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # Only the leader was cancelled (client gone, deadline, hedge loser):
+                # take over or follow whoever did, rather than failing this caller too
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_async[key] = future
+        try:
+            value = await compute()
+            if value:
+                await run_in_threadpool(self.set, key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self._inflight_async.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current memory occupancy."""
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        hits = counters["memory_hits"] + counters["db_hits"]
+        lookups = hits + counters["misses"]
+        counters["memory_entries"] = size
+        counters["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return counters
+
+
+_cache: Optional[EnrichmentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_enrichment_cache() -> EnrichmentCache:
+    """Return the process-wide enrichment cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EnrichmentCache(
+                settings.db_path,
+                max_entries=settings.enrichment_cache_max_entries,
+                ttl_seconds=settings.enrichment_cache_ttl_seconds,
+            )
+        return _cache
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from openai import APITimeoutError
+
+from ..core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    ``closed`` lets every request through. ``failure_threshold`` failures in a
+    row open it, and it rejects requests for ``reset_seconds``. After that it is
+    ``half_open`` and lets one probe through: success closes it, failure opens
+    it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._opened_count = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half_open"
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may go upstream now."""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    return False
+                self._state = "half_open"
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != "closed":
+                logger.info("Circuit closed")
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def release(self) -> None:
+        """Give back a half-open probe that ended without an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == "half_open" or (
+                self._state == "closed" and self._failures >= self.failure_threshold
+            ):
+                if self._state == "closed":
+                    logger.warning("Circuit opened after %d failures", self._failures)
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._opened_count += 1
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "times_opened": self._opened_count,
+            }
+
+
+class EnrichmentGuard:
+    """Latency budget, circuit breaker and optional hedging for upstream enrichment.
+
+    Wraps only the OpenAI request (the cache in front of it is untouched) and
+    returns ``""`` instead of raising, so callers fall back to the raw prompt:
+    when the breaker is open, when the deadline passes, or on any error.
+    Hedging starts a second identical request once the first has taken longer
+    than the recent ``hedge_percentile`` latency, and keeps whichever answers first.
+    """
+
+    _FALLBACK_REASONS = ("breaker_open", "timeout", "error")
+
+    def __init__(
+        self,
+        deadline_seconds: float = 8.0,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_min_samples: int = 20,
+        latency_window: int = 200,
+    ):
+        self.deadline_seconds = deadline_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = max(1, hedge_min_samples)
+        self._latencies: Deque[float] = deque(maxlen=max(1, latency_window))
+        self._lock = threading.Lock()
+        self._counters = {
+            "requests": 0,
+            "enriched": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            **{f"fallback_{reason}": 0 for reason in self._FALLBACK_REASONS},
+        }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _latency_percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            if not self._latencies:
+                return None
+            values = sorted(self._latencies)
+        return values[min(len(values) - 1, math.ceil(len(values) * fraction) - 1)]
+
+    def hedge_delay(self) -> Optional[float]:
+        """How long to wait before hedging, or ``None`` when hedging is off or unwarmed."""
+        if not self.hedge:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+        return self._latency_percentile(self.hedge_percentile)
+
+    def _succeeded(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+            self._counters["enriched"] += 1
+        self.breaker.record_success()
+
+    def _failed(self, error: BaseException) -> str:
+        reason = "timeout" if isinstance(error, (asyncio.TimeoutError, APITimeoutError)) else "error"
+        self._count(f"fallback_{reason}")
+        self.breaker.record_failure()
+        logger.warning("OpenAI enrichment %s, using raw prompt: %s", reason, str(error) or type(error).__name__)
+        return ""
+
+    def run(self, request: Callable[[], str]) -> str:
+        """Run a blocking enrichment request under the breaker.
+
+        The deadline cannot be enforced from outside a blocking call; ``request``
+        must apply :attr:`deadline_seconds` as its own timeout. Not hedged.
+        """
+        self._count("requests")
+        if not self.breaker.allow():
+            self._count("fallback_breaker_open")
+            return ""
+        started = time.perf_counter()
+        try:
+            value = request()
+        except Exception as e:
+            return self._failed(e)
+        self._succeeded(time.perf_counter() - started)
+        return value
+
+    async def run_async(self, request: Callable[[], Awaitable[str]]) -> str:
+        """Run an async enrichment request under the breaker, deadline and hedging policy."""
+        self._count("requests")
+        if not self.breaker.allow():
+            self._count("fallback_breaker_open")
+            return ""
+        try:
+            value, latency = await asyncio.wait_for(self._hedged(request), self.deadline_seconds)
+        except asyncio.CancelledError:
+            # The caller went away; that says nothing about upstream health
+            self.breaker.release()
+            raise
+        except Exception as e:
+            return self._failed(e)
+        self._succeeded(latency)
+        return value
+
+    @staticmethod
+    async def _timed(request: Callable[[], Awaitable[str]]) -> Tuple[str, float]:
+        started = time.perf_counter()
+        value = await request()
+        return value, time.perf_counter() - started
+
+    async def _hedged(self, request: Callable[[], Awaitable[str]]) -> Tuple[str, float]:
+        """The first successful attempt's result and its own latency.
+
+        Recording the winning attempt's latency (not the time since the first
+        attempt started) keeps hedging from inflating the percentile it hedges at.
+        """
+        delay = self.hedge_delay()
+        primary = asyncio.ensure_future(self._timed(request))
+        if delay is None:
+            return await primary
+
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self._count("hedged")
+                pending.add(asyncio.ensure_future(self._timed(request)))
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            samples = len(self._latencies)
+        fallbacks = sum(counters[f"fallback_{reason}"] for reason in self._FALLBACK_REASONS)
+        p50 = self._latency_percentile(0.5)
+        p95 = self._latency_percentile(0.95)
+        hedge_delay = self.hedge_delay()
+        counters["fallback_rate"] = round(fallbacks / counters["requests"], 4) if counters["requests"] else 0.0
+        counters["latency_samples"] = samples
+        counters["latency_p50_ms"] = round(p50 * 1000, 1) if p50 is not None else None
+        counters["latency_p95_ms"] = round(p95 * 1000, 1) if p95 is not None else None
+        counters["deadline_seconds"] = self.deadline_seconds
+        counters["hedge_delay_ms"] = round(hedge_delay * 1000, 1) if hedge_delay is not None else None
+        counters["breaker"] = self.breaker.stats()
+        return counters
+
+
+_guard: Optional[EnrichmentGuard] = None
+_guard_lock = threading.Lock()
+
+
+def get_enrichment_guard() -> EnrichmentGuard:
+    """Return the process-wide enrichment guard."""
+    global _guard
+    with _guard_lock:
+        if _guard is None:
+            _guard = EnrichmentGuard(
+                deadline_seconds=settings.enrichment_deadline_seconds,
+                breaker=CircuitBreaker(
+                    failure_threshold=settings.enrichment_breaker_failures,
+                    reset_seconds=settings.enrichment_breaker_reset_seconds,
+                ),
+                hedge=settings.enrichment_hedge,
+                hedge_percentile=settings.enrichment_hedge_percentile,
+                hedge_min_samples=settings.enrichment_hedge_min_samples,
+            )
+        return _guard
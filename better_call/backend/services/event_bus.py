@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+
+logger = logging.getLogger(__name__)
+
+
+def payment_topic(payment_id: Any) -> str:
+    return f"payment:{payment_id}"
+
+
+def job_topic(job_id: Any) -> str:
+    return f"job:{job_id}"
+
+
+class Subscription:
+    """Events published to a set of topics, queued for one consumer (e.g. an SSE stream)."""
+
+    def __init__(self, bus: "EventBus", topics: Set[str], max_queued: int):
+        self.bus = bus
+        self.topics = topics
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_queued)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        if self.queue.full():
+            # A slow reader loses its oldest events, never the latest state
+            self.queue.get_nowait()
+            self.bus._counters["dropped"] += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None after ``timeout`` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.bus._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class EventBus:
+    """In-process publish/subscribe for status transitions.
+
+    The Stripe event consumer publishes ``paid`` to ``payment:<id>`` and the
+    call job workers publish ``dialing``/``completed``/``failed`` to
+    ``job:<id>``; SSE streams subscribe to the topics they report on. Nothing
+    is stored: a subscriber reads the current state from the database first
+    and then only needs the transitions. Events only reach subscribers in the
+    same process, so streams still re-check the database now and then.
+    """
+
+    def __init__(self, max_queued: int = 32):
+        self.max_queued = max_queued
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._counters = {"published": 0, "delivered": 0, "dropped": 0}
+
+    def subscribe(self, *topics: str) -> Subscription:
+        """Subscribe the running event loop to ``topics``; close the subscription when done."""
+        subscription = Subscription(self, set(topics), self.max_queued)
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers[topic].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> int:
+        """Deliver ``event`` to every subscriber of ``topic``; safe to call from any thread."""
+        event = {"topic": topic, **event}
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+            self._counters["published"] += 1
+            self._counters["delivered"] += len(subscribers)
+        if not subscribers:
+            return 0
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for subscription in subscribers:
+            if subscription.loop is running:
+                subscription._deliver(event)
+            else:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+                except RuntimeError:
+                    # Its loop is closed; the subscriber is gone
+                    pass
+        return len(subscribers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters: Dict[str, Any] = dict(self._counters)
+            counters["topics"] = len(self._subscribers)
+            counters["subscriptions"] = len({s for subs in self._subscribers.values() for s in subs})
+        return counters
@@ -9,25 +9,32 @@ from ..core.config import settings
 class MockPaymentsService:
     """Mocked payments service that returns a static payment URL."""
 
-    def __init__(self, hardcoded_url: Optional[str] = None):
+    def __init__(
+        self,
+        hardcoded_url: Optional[str] = None,
+        payment_repository: Optional[PaymentRepository] = None,
+    ):
         # Default hardcoded Stripe checkout URL-like string for development
         self.hardcoded_url = hardcoded_url or "https://buy.stripe.com/test_cNi9ASfCz3Xm9gy2ug0Ba00"
+        self.payment_repo = payment_repository or PaymentRepository()
 
     def create_payment_link_for_user(self, user: User) -> PaymentResponse:
         # Persist a mock payment record so we can track status via /payments/status
-        repo = PaymentRepository()
+        repo = self.payment_repo
         # Build success URL back to our frontend confirmation page with payment_id
         frontend_base = settings.backend_base_url.replace(":9001", ":9001")  # keep same for now
         # Create record first with placeholder; we'll need the returned id for success_url
         payment_id = repo.create_payment(
-            stripe_payment_link_id=f"pl_mock_{user.id or 'anon'}",
+            user_id=user.id,
+            stripe_payment_link_id=None,
             amount=1,
             currency="usd",
             description="Credit top-up",
             customer_email=user.email,
             success_url=None,
-            cancel_url=None,
         )
+        # Link IDs are unique; derive the mock one from the payment row
+        repo.update_payment_stripe_id(payment_id, f"pl_mock_{payment_id}")
         success_url = f"{settings.backend_base_url}/payments/confirmation?payment_id={payment_id}"
         try:
             # Update success_url in DB (simple approach: reinsert not supported; skip or add update if needed)
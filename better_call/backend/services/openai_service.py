@@ -1,34 +1,24 @@
+import hashlib
+import logging
+import time
 from typing import Optional
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from starlette.concurrency import run_in_threadpool
 
 from ..core.config import settings
 from ..core.exceptions import OpenAIServiceError
+from .enrichment_cache import EnrichmentCache, get_enrichment_cache
+from .enrichment_guard import EnrichmentGuard, get_enrichment_guard
+from .local_enrichment import EnrichmentRouter, get_enrichment_router
+from .semantic_cache import SemanticEnrichmentCache, get_semantic_cache
+from .upstream_clients import UpstreamClients
 
 
-class OpenAIService:
-    """Service for handling OpenAI API interactions."""
-    
-    def __init__(self):
-        if not settings.openai_api_key:
-            raise OpenAIServiceError("OpenAI API key is not configured")
-        self.client = OpenAI(api_key=settings.openai_api_key)
-    
-    def enrich_prompt(self, name: str, raw_prompt: str) -> str:
-        """
-        Enrich a raw prompt using OpenAI to create a structured prompt for voice calls.
-        
-        Args:
-            name: Name of the user making the request
-            raw_prompt: Original prompt from the user
-            
-        Returns:
-            Enriched prompt ready for voice API
-            
-        Raises:
-            OpenAIServiceError: If the API call fails
-        """
-        try:
-            instructions = """
+logger = logging.getLogger(__name__)
+
+ENRICHMENT_MODEL = 'gpt-4o-mini'
+
+ENRICHMENT_INSTRUCTIONS = """
             You are a voice prompt writer for the Better Call voice agent.
 
             Your job is to take a short and often incomplete user request (e.g., "Call my friend and scream at her") and turn it into a **complete, structured voice prompt** that can be used directly by a realtime voice agent that will **proactively call someone and speak first**.
@@ -90,7 +80,16 @@ class OpenAIService:
 
             """
 
-            input_text = f"""
+
+# Part of every cache key, so editing the instructions or model invalidates cached prompts
+ENRICHMENT_INSTRUCTIONS_VERSION = hashlib.sha256(
+    f"{ENRICHMENT_MODEL}\n{ENRICHMENT_INSTRUCTIONS}".encode("utf-8")
+).hexdigest()[:16]
+
+
+def build_enrichment_input(name: str, raw_prompt: str) -> str:
+    """Build the user input sent alongside the enrichment instructions."""
+    return f"""
             User name: {name}
 
             Original request:
@@ -99,15 +98,134 @@ class OpenAIService:
             Generate the final prompt following the exact format and guidelines above.
             """
 
-            response = self.client.responses.create(
-                model='gpt-4o-mini',
-                instructions=instructions,
-                input=input_text,
-            )
+
+class OpenAIService:
+    """Service for handling OpenAI API interactions."""
+    
+    def __init__(self, clients: Optional[UpstreamClients] = None):
+        self.router: EnrichmentRouter = get_enrichment_router()
+        # Shared keep-alive clients are owned (and closed) by the registry
+        self._owns_clients = clients is None
+        if not settings.openai_api_key:
+            if self.router.route != "local":
+                raise OpenAIServiceError("OpenAI API key is not configured")
+            # Local-only enrichment never reaches OpenAI
+            self.client = self.async_client = None
+        elif clients is not None:
+            self.client = clients.openai_sync()
+            self.async_client = clients.openai_async()
+        else:
+            self.client = OpenAI(api_key=settings.openai_api_key)
+            self.async_client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.cache: EnrichmentCache = get_enrichment_cache()
+        self.guard: EnrichmentGuard = get_enrichment_guard()
+        self.semantic: Optional[SemanticEnrichmentCache] = get_semantic_cache()
+    
+    def enrich_prompt(self, name: str, raw_prompt: str) -> str:
+        """
+        Enrich a raw prompt using OpenAI to create a structured prompt for voice calls.
+
+        Results are served from the enrichment cache when the same (name, prompt)
+        pair was enriched before, and identical in-flight requests share one call.
+        Upstream requests are bounded by the enrichment deadline and skipped while
+        the circuit breaker is open; either way the raw prompt is used instead.
+        Depending on ``ENRICHMENT_ROUTE``, formulaic requests are rendered from
+        local persona templates without calling OpenAI at all, and on an exact
+        cache miss a near-identical earlier request's enrichment is reused with
+        this request's names filled in (see :class:`SemanticEnrichmentCache`).
+        
+        Args:
+            name: Name of the user making the request
+            raw_prompt: Original prompt from the user
+            
+        Returns:
+            Enriched prompt ready for voice API
             
-            enriched = (response.output_text or "").strip()
+        Raises:
+            OpenAIServiceError: If the API call fails
+        """
+        started = time.perf_counter()
+        local = self.router.local(name, raw_prompt)
+        if local is not None:
+            self.router.record("local", started)
+            return local
+        try:
+            key = EnrichmentCache.make_key(ENRICHMENT_INSTRUCTIONS_VERSION, name, raw_prompt)
+            enriched = self.cache.get_or_compute(key, lambda: self._enrich_upstream(name, raw_prompt))
             return enriched if enriched else raw_prompt
             
         except Exception as e:
-            print(f"OpenAI enrichment failed: {e}")
+            logger.warning("OpenAI enrichment failed, using raw prompt: %s", e)
+            return raw_prompt
+        finally:
+            self.router.record("llm", started)
+
+    async def enrich_prompt_async(self, name: str, raw_prompt: str) -> str:
+        """
+        Async variant of :meth:`enrich_prompt` backed by ``AsyncOpenAI``.
+
+        Falls back to the raw prompt on failure, exactly like the sync version;
+        slow requests may also be hedged (see :class:`EnrichmentGuard`).
+        """
+        started = time.perf_counter()
+        local = self.router.local(name, raw_prompt)
+        if local is not None:
+            self.router.record("local", started)
+            return local
+        try:
+            key = EnrichmentCache.make_key(ENRICHMENT_INSTRUCTIONS_VERSION, name, raw_prompt)
+            enriched = await self.cache.get_or_compute_async(
+                key, lambda: self._enrich_upstream_async(name, raw_prompt)
+            )
+            return enriched if enriched else raw_prompt
+
+        except Exception as e:
+            logger.warning("OpenAI enrichment failed, using raw prompt: %s", e)
             return raw_prompt
+        finally:
+            self.router.record("llm", started)
+
+    def _enrich_upstream(self, name: str, raw_prompt: str) -> str:
+        if self.semantic is not None:
+            similar = self.semantic.lookup(name, raw_prompt)
+            if similar is not None:
+                return similar
+        enriched = self.guard.run(lambda: self._request_enrichment(name, raw_prompt))
+        if enriched and self.semantic is not None:
+            self.semantic.store(name, raw_prompt, enriched)
+        return enriched
+
+    async def _enrich_upstream_async(self, name: str, raw_prompt: str) -> str:
+        # Lookups scan the whole matrix, so they stay off the event loop
+        if self.semantic is not None:
+            similar = await run_in_threadpool(self.semantic.lookup, name, raw_prompt)
+            if similar is not None:
+                return similar
+        enriched = await self.guard.run_async(lambda: self._request_enrichment_async(name, raw_prompt))
+        if enriched and self.semantic is not None:
+            await run_in_threadpool(self.semantic.store, name, raw_prompt, enriched)
+        return enriched
+
+    def _request_enrichment(self, name: str, raw_prompt: str) -> str:
+        # A blocking call can't be cancelled at the deadline, so it is its timeout,
+        # with no SDK retries past it
+        response = self.client.with_options(timeout=self.guard.deadline_seconds, max_retries=0).responses.create(
+            model=ENRICHMENT_MODEL,
+            instructions=ENRICHMENT_INSTRUCTIONS,
+            input=build_enrichment_input(name, raw_prompt),
+        )
+        return (response.output_text or "").strip()
+
+    async def _request_enrichment_async(self, name: str, raw_prompt: str) -> str:
+        response = await self.async_client.responses.create(
+            model=ENRICHMENT_MODEL,
+            instructions=ENRICHMENT_INSTRUCTIONS,
+            input=build_enrichment_input(name, raw_prompt),
+            timeout=self.guard.deadline_seconds,
+        )
+        return (response.output_text or "").strip()
+
+    async def aclose(self) -> None:
+        """Close the async HTTP client, unless it is shared."""
+        if self._owns_clients and self.async_client is not None:
+            await self.async_client.close()
@@ -1,3 +1,5 @@
+import logging
+
 import stripe
 from typing import Optional, Dict, Any
 from decimal import Decimal
@@ -9,12 +11,15 @@ from ..models.user import User
 from ..repositories.payment_repository import PaymentRepository
 
 
+logger = logging.getLogger(__name__)
+
+
 class PaymentService:
     """Service for handling Stripe payments."""
     
-    def __init__(self):
+    def __init__(self, payment_repository: Optional[PaymentRepository] = None):
         stripe.api_key = settings.stripe_secret_key
-        self.payment_repo = PaymentRepository()
+        self.payment_repo = payment_repository or PaymentRepository()
     
     async def create_payment_link(
         self, 
@@ -102,14 +107,14 @@ class PaymentService:
             success = self.payment_repo.update_payment_status(stripe_payment_link_id, 'paid')
             
             if success:
-                print(f"Payment {stripe_payment_link_id} marked as paid successfully")
+                logger.info("Payment marked as paid", extra={"stripe_payment_link_id": stripe_payment_link_id})
                 return True
             else:
-                print(f"Failed to update payment status for {stripe_payment_link_id}")
+                logger.warning("Payment not found for status update", extra={"stripe_payment_link_id": stripe_payment_link_id})
                 return False
                 
         except Exception as e:
-            print(f"Error handling payment success for {stripe_payment_link_id}: {str(e)}")
+            logger.exception("Error handling payment success", extra={"stripe_payment_link_id": stripe_payment_link_id})
             return False
     
     async def get_payment_status(self, payment_id: Optional[str] = None, 
@@ -138,7 +143,7 @@ class PaymentService:
             )
             
         except Exception as e:
-            print(f"Error getting payment status: {str(e)}")
+            logger.exception("Error getting payment status")
             return None
     
     def verify_webhook_signature(self, payload: bytes, signature: str) -> bool:
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+from ...database.db import PromptDB
+from ..repositories.call_repository import CallRepository
+from ..repositories.campaign_repository import CallCampaignRepository
+from ..repositories.call_route_repository import CallRouteRepository
+from ..repositories.job_repository import CallJobRepository
+from ..repositories.payment_repository import PaymentRepository
+from ..repositories.stripe_event_repository import StripeEventRepository
+from ..repositories.user_repository import UserRepository
+from .call_job_worker import CallJobWorker
+from .call_service import CallService
+from .event_bus import EventBus
+from .mock_payments_service import MockPaymentsService
+from .payment_service import PaymentService
+from .speculative_enrichment import SpeculativeEnricher
+from .stripe_event_consumer import StripeEventConsumer
+from .upstream_clients import UpstreamClients
+
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """Long-lived repositories and services shared by every request.
+
+    Built once in the application lifespan and stored on ``app.state.services``;
+    routes reach its members through the dependencies in ``api/dependencies.py``
+    so no connection setup or schema work ever happens on the request path.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+        # Legacy prompt store, still used by the OpenAI gateway fallback
+        self.prompt_db = PromptDB(db_path=db_path)
+
+        self.call_repository = CallRepository(db_path=db_path)
+        self.user_repository = UserRepository(db_path=db_path)
+        self.payment_repository = PaymentRepository(db=self.prompt_db)
+
+        # Call SID -> call request routes, used by the gateway to pick each call's prompt
+        self.call_routes = CallRouteRepository(db_path=db_path)
+
+        self.payment_service = PaymentService(payment_repository=self.payment_repository)
+        self.payments_service = MockPaymentsService(payment_repository=self.payment_repository)
+        # Payment and call status transitions, pushed to SSE streams
+        self.event_bus = EventBus()
+        # Stripe webhooks are recorded on receipt and applied in the background
+        self.stripe_events = StripeEventRepository(db_path=db_path)
+        self.stripe_event_consumer = StripeEventConsumer(self.stripe_events, event_bus=self.event_bus)
+        # Keep-alive OpenAI/Twilio clients, pre-connected at startup
+        self.upstream_clients = UpstreamClients()
+        self._warmup_task: Optional[asyncio.Task] = None
+        self._call_service: Optional[CallService] = None
+        self._call_service_lock = threading.Lock()
+
+        # Requests saved on the 402 path are enriched while their owner pays
+        self.speculative_enricher = SpeculativeEnricher(self.call_repository, self.get_call_service)
+
+        # Durable call queue; jobs left over from a previous run are picked up again
+        self.job_repository = CallJobRepository(db_path=db_path)
+        self.campaign_repository = CallCampaignRepository(db_path=db_path)
+        self.call_job_worker = CallJobWorker(
+            self.job_repository,
+            self.call_repository,
+            self.user_repository,
+            call_routes=self.call_routes,
+            call_service_factory=self.get_call_service,
+            event_bus=self.event_bus,
+        )
+
+    def get_call_service(self) -> CallService:
+        """Shared CallService, built on first use.
+
+        Construction fails while OpenAI/Twilio are unconfigured, so it must not
+        happen at startup; the error surfaces to the job or request that needed it.
+        """
+        with self._call_service_lock:
+            if self._call_service is None:
+                self._call_service = CallService(call_routes=self.call_routes, clients=self.upstream_clients)
+            return self._call_service
+
+    async def start(self) -> None:
+        await self.call_job_worker.start()
+        await self.stripe_event_consumer.start()
+        # In the background: startup does not wait on the providers
+        self._warmup_task = asyncio.create_task(self.upstream_clients.warm_up())
+
+    async def aclose(self) -> None:
+        """Stop the workers and release upstream clients."""
+        await self.call_job_worker.stop()
+        await self.stripe_event_consumer.stop()
+        await self.speculative_enricher.stop()
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+            self._warmup_task = None
+        if self._call_service is not None:
+            await self._call_service.aclose()
+            self._call_service = None
+        await self.upstream_clients.aclose()
+        try:
+            self.prompt_db.close()
+            self.call_repository.close()
+        except Exception as e:
+            logger.warning("Error closing repositories: %s", e)
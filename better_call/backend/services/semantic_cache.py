@@ -0,0 +1,255 @@
+import logging
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Any, Deque, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional: without NumPy the semantic cache is disabled
+    np = None
+
+from ..core.config import settings
+from ..core.text import fold
+
+
+logger = logging.getLogger(__name__)
+
+# Private-use code points mark where names and numbers go in a cached prompt;
+# they are not word characters, so they never match an entity pattern
+_CALLER_SLOT = "\ue000"
+_FIRST_ENTITY_SLOT = 0xE001
+MAX_ENTITIES = 64
+
+_TOKEN = re.compile(r"\w+")
+# Shared or stopword-sized words are not facts worth guarding against leaks
+_MIN_FACT_LENGTH = 3
+
+
+class RequestShape(NamedTuple):
+    """A request with its names and numbers lifted out.
+
+    ``skeleton`` is the folded token sequence with entities replaced by ``<e>``
+    and the caller's name by ``<c>``; ``entities`` are the distinct entities in
+    order of appearance and ``pattern`` maps each occurrence to one of them, so
+    "Pedro ... Pedro" and "Pedro ... Ana" are different shapes.
+    """
+    skeleton: Tuple[str, ...]
+    entities: Tuple[str, ...]
+    pattern: Tuple[int, ...]
+
+
+class _Entry(NamedTuple):
+    template: str
+    pattern: Tuple[int, ...]
+    # Words of the cached request that its cached prompt repeats
+    facts: FrozenSet[str]
+    skeleton: Tuple[str, ...]
+
+
+def request_shape(name: str, raw_prompt: str) -> RequestShape:
+    """Split a request into its wording and its names, numbers and caller.
+
+    Entities are capitalized words not starting a sentence and anything with a
+    digit in it.
+    """
+    caller = {fold(part) for part in name.split()}
+    skeleton: List[str] = []
+    occurrences: List[str] = []
+    previous_end = 0
+    for found in _TOKEN.finditer(raw_prompt):
+        token = found.group(0)
+        gap = raw_prompt[previous_end:found.start()]
+        sentence_start = previous_end == 0 or any(c in ".!?\n" for c in gap)
+        previous_end = found.end()
+        folded = fold(token)
+        if folded in caller:
+            skeleton.append("<c>")
+        elif any(c.isdigit() for c in token) or (
+            not sentence_start and len(token) > 1 and token[0].isupper()
+        ):
+            skeleton.append("<e>")
+            occurrences.append(token)
+        else:
+            skeleton.append(folded)
+    entities = tuple(dict.fromkeys(occurrences))
+    return RequestShape(tuple(skeleton), entities, tuple(entities.index(e) for e in occurrences))
+
+
+class SemanticEnrichmentCache:
+    """Approximate cache for enriched prompts of near-identical requests.
+
+    Requests are reduced to their wording (see :func:`request_shape`) and
+    embedded with a signed hashing vectorizer over word unigrams and bigrams,
+    into one preallocated ``dimensions x max_entries`` float32 matrix. A lookup
+    is a single vector-matrix product over the rows of the request's features
+    (a few dozen), so it reads a fraction of the matrix rather than all of it.
+    The best entry is used when its cosine similarity reaches ``threshold``,
+    the entity pattern is the same, and none of the cached request's own words
+    that the new request lacks appear in the cached prompt (so one user's
+    details never reach another user's call).
+    Cached prompts are stored with their names and numbers as slots, filled
+    from the new request on a hit. When full, the least recently used entry is
+    overwritten. Per process and in memory only.
+    """
+
+    def __init__(self, max_entries: int = 10000, dimensions: int = 512, threshold: float = 0.9, window: int = 1000):
+        if np is None:
+            raise RuntimeError("The semantic enrichment cache requires NumPy")
+        self.max_entries = max(1, max_entries)
+        self.dimensions = max(16, dimensions)
+        self.threshold = threshold
+        # Feature-major, so a lookup touches only the rows of the query's features
+        self._matrix = np.zeros((self.dimensions, self.max_entries), dtype=np.float32)
+        self._last_used = np.zeros(self.max_entries, dtype=np.int64)
+        self._entries: List[Optional[_Entry]] = [None] * self.max_entries
+        self._slots: Dict[Tuple[str, ...], int] = {}
+        self._size = 0
+        self._tick = 0
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=max(1, window))
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "rejected": 0,
+            "stored": 0,
+            "unstorable": 0,
+            "evictions": 0,
+        }
+
+    def embed(self, skeleton: Tuple[str, ...]) -> Optional["np.ndarray"]:
+        """Unit-length hashed feature vector for a skeleton, or None when it is empty."""
+        features = list(skeleton) + [f"{a} {b}" for a, b in zip(skeleton, skeleton[1:])]
+        if not features:
+            return None
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32, count=len(features))
+        signs = np.where(hashes & 0x80000000, 1.0, -1.0).astype(np.float32)
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        np.add.at(vector, (hashes & 0x7FFFFFFF) % self.dimensions, signs)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def lookup(self, name: str, raw_prompt: str) -> Optional[str]:
+        """The cached prompt of a similar request, adapted to this one, or None."""
+        started = time.perf_counter()
+        try:
+            shape = request_shape(name, raw_prompt)
+            vector = self.embed(shape.skeleton)
+            if vector is None or len(shape.entities) > MAX_ENTITIES:
+                self._count("misses")
+                return None
+            with self._lock:
+                if not self._size:
+                    self._counters["misses"] += 1
+                    return None
+                features = np.flatnonzero(vector)
+                scores = vector[features] @ self._matrix[features, :self._size]
+                best = int(np.argmax(scores))
+                if float(scores[best]) < self.threshold:
+                    self._counters["misses"] += 1
+                    return None
+                entry = self._entries[best]
+                if entry.pattern != shape.pattern or entry.facts - set(shape.skeleton):
+                    self._counters["rejected"] += 1
+                    return None
+                self._tick += 1
+                self._last_used[best] = self._tick
+                self._counters["hits"] += 1
+            return self._fill(entry.template, name, shape.entities)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._latencies.append(elapsed)
+
+    def store(self, name: str, raw_prompt: str, enriched: str) -> bool:
+        """Remember an upstream enrichment; False when it can't be reused safely."""
+        shape = request_shape(name, raw_prompt)
+        vector = self.embed(shape.skeleton)
+        template = self._template(enriched, name, shape.entities) if vector is not None else None
+        if template is None or len(shape.entities) > MAX_ENTITIES:
+            self._count("unstorable")
+            return False
+        repeated = set(_TOKEN.findall(fold(template)))
+        facts = frozenset(w for w in shape.skeleton if len(w) >= _MIN_FACT_LENGTH and w in repeated)
+        entry = _Entry(template, shape.pattern, facts, shape.skeleton)
+        with self._lock:
+            slot = self._slots.get(shape.skeleton)
+            if slot is None:
+                if self._size < self.max_entries:
+                    slot = self._size
+                    self._size += 1
+                else:
+                    slot = int(np.argmin(self._last_used))
+                    del self._slots[self._entries[slot].skeleton]
+                    self._counters["evictions"] += 1
+                self._slots[shape.skeleton] = slot
+            self._matrix[:, slot] = vector
+            self._entries[slot] = entry
+            self._tick += 1
+            self._last_used[slot] = self._tick
+            self._counters["stored"] += 1
+        return True
+
+    @staticmethod
+    def _template(enriched: str, name: str, entities: Tuple[str, ...]) -> Optional[str]:
+        """``enriched`` with the caller and entities as slots, or None if any survive unslotted."""
+        template = enriched
+        caller = name.strip()
+        if caller:
+            template = re.sub(rf"\b{re.escape(caller)}\b", _CALLER_SLOT, template)
+        for index in sorted(range(len(entities)), key=lambda i: len(entities[i]), reverse=True):
+            template = re.sub(rf"\b{re.escape(entities[index])}\b", chr(_FIRST_ENTITY_SLOT + index), template)
+        # A name the model inflected or capitalized differently would leak on reuse
+        remaining = set(_TOKEN.findall(fold(template)))
+        originals = {fold(part) for part in caller.split()} | {fold(e) for e in entities}
+        return None if remaining & originals else template
+
+    @staticmethod
+    def _fill(template: str, name: str, entities: Tuple[str, ...]) -> str:
+        filled = template.replace(_CALLER_SLOT, name.strip())
+        for index, entity in enumerate(entities):
+            filled = filled.replace(chr(_FIRST_ENTITY_SLOT + index), entity)
+        return filled
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters: Dict[str, Any] = dict(self._counters)
+            values = sorted(self._latencies)
+            counters["entries"] = self._size
+        lookups = counters["hits"] + counters["misses"] + counters["rejected"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        counters["max_entries"] = self.max_entries
+        counters["dimensions"] = self.dimensions
+        counters["threshold"] = self.threshold
+        if values:
+            counters["lookup_p50_ms"] = round(values[len(values) // 2] * 1000, 3)
+            counters["lookup_p95_ms"] = round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 3)
+        return counters
+
+
+_semantic_cache: Optional[SemanticEnrichmentCache] = None
+_semantic_cache_lock = threading.Lock()
+_semantic_cache_resolved = False
+
+
+def get_semantic_cache() -> Optional[SemanticEnrichmentCache]:
+    """Return the process-wide semantic cache, or None when it is disabled."""
+    global _semantic_cache, _semantic_cache_resolved
+    with _semantic_cache_lock:
+        if not _semantic_cache_resolved:
+            _semantic_cache_resolved = True
+            if settings.semantic_cache_enabled and np is None:
+                logger.warning("NumPy is not installed, semantic enrichment cache disabled")
+            elif settings.semantic_cache_enabled:
+                _semantic_cache = SemanticEnrichmentCache(
+                    max_entries=settings.semantic_cache_max_entries,
+                    dimensions=settings.semantic_cache_dimensions,
+                    threshold=settings.semantic_cache_threshold,
+                )
+        return _semantic_cache
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..repositories.call_repository import CallRepository
+from .call_service import CallService
+
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeEnricher:
+    """Enriches call requests that wait for payment, while the user is paying.
+
+    The enriched prompt is written back to the request row, so dispatching it
+    after payment goes straight to dialing. Work is best-effort: it is capped at
+    ``SPECULATIVE_ENRICHMENT_MAX_INFLIGHT`` concurrent requests, dropped at
+    shutdown, and a request that was not enriched in time is simply enriched
+    when it is dispatched (through the same cache, so an enrichment still in
+    flight is shared rather than repeated).
+    """
+
+    def __init__(
+        self,
+        call_repository: CallRepository,
+        call_service_factory: Callable[[], CallService],
+        max_inflight: Optional[int] = None,
+    ):
+        self.call_repository = call_repository
+        self._call_service_factory = call_service_factory
+        self.max_inflight = settings.speculative_enrichment_max_inflight if max_inflight is None else max_inflight
+        self._tasks: Set[asyncio.Task] = set()
+        self._counters = {"submitted": 0, "enriched": 0, "fallback": 0, "failed": 0, "dropped": 0}
+
+    def submit(self, call_request_id: int, name: str, raw_prompt: str) -> bool:
+        """Start enriching a saved request in the background; False when skipped."""
+        if not raw_prompt.strip() or self.max_inflight <= 0:
+            return False
+        if len(self._tasks) >= self.max_inflight:
+            self._counters["dropped"] += 1
+            return False
+        self._counters["submitted"] += 1
+        task = asyncio.create_task(self._enrich(call_request_id, name, raw_prompt))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _enrich(self, call_request_id: int, name: str, raw_prompt: str) -> None:
+        try:
+            prompt = await self._call_service_factory().enrich_async(name, raw_prompt)
+            if prompt == raw_prompt:
+                # Enrichment fell back to the raw prompt; leave it to the dispatch
+                self._counters["fallback"] += 1
+                return
+            await run_in_threadpool(self.call_repository.set_enriched_prompt, call_request_id, prompt)
+            self._counters["enriched"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._counters["failed"] += 1
+            logger.warning(
+                "Speculative enrichment failed", extra={"call_request_id": call_request_id, "error": str(e)}
+            )
+
+    async def stop(self) -> None:
+        """Cancel enrichments still running; their requests are enriched on dispatch."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "inflight": len(self._tasks)}
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..repositories.stripe_event_repository import StripeEventRepository
+from .event_bus import EventBus, payment_topic
+
+
+logger = logging.getLogger(__name__)
+
+_PRUNE_INTERVAL_SECONDS = 3600.0
+
+
+class StripeEventConsumer:
+    """Background consumer applying recorded Stripe webhook events in batches.
+
+    The webhook only verifies the signature and records the event (a duplicate
+    event id is a no-op), so Stripe gets its 2xx in milliseconds. This task then
+    drains pending events ``STRIPE_EVENT_BATCH_SIZE`` at a time and writes
+    every resulting payment status change, with the payer's credit, in a
+    single transaction. Events are durable, so anything left pending at
+    shutdown is applied after a restart.
+    """
+
+    def __init__(
+        self,
+        event_repository: StripeEventRepository,
+        batch_size: Optional[int] = None,
+        event_bus: Optional[EventBus] = None,
+    ):
+        self.event_repository = event_repository
+        self.event_bus = event_bus
+        self.batch_size = max(1, batch_size or settings.stripe_event_batch_size)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._pruned_at = 0.0
+        self._counters = {"received": 0, "duplicates": 0, "processed": 0, "ignored": 0, "batches": 0, "payments_paid": 0}
+
+    async def start(self) -> None:
+        """Start the consumer task on the running event loop."""
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="stripe-event-consumer")
+
+    async def stop(self) -> None:
+        """Cancel the consumer task; pending events stay in the store."""
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def submit(self, event_id: str, event_type: str, payload: str) -> bool:
+        """Record a verified event and wake the consumer; False for a duplicate delivery."""
+        is_new = await run_in_threadpool(self.event_repository.record, event_id, event_type, payload)
+        if is_new:
+            self._counters["received"] += 1
+            if self._wakeup is not None:
+                self._wakeup.set()
+        else:
+            self._counters["duplicates"] += 1
+        return is_new
+
+    async def drain(self) -> int:
+        """Apply pending events until none are left; returns how many were handled."""
+        handled = 0
+        while True:
+            count = await self._process_batch()
+            if count == 0:
+                return handled
+            handled += count
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                count = await self._process_batch()
+                if time.monotonic() - self._pruned_at >= _PRUNE_INTERVAL_SECONDS:
+                    self._pruned_at = time.monotonic()
+                    await run_in_threadpool(
+                        self.event_repository.prune, settings.stripe_event_retention_days * 86400
+                    )
+            except Exception:
+                logger.exception("Stripe event batch failed")
+                count = 0
+
+            if count < self.batch_size:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=settings.stripe_event_poll_interval_seconds
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _process_batch(self) -> int:
+        events = await run_in_threadpool(self.event_repository.pending, self.batch_size)
+        if not events:
+            return 0
+
+        paid_link_ids: List[str] = []
+        outcomes: List[Tuple[str, str, Any]] = []
+        for event in events:
+            status, link_id, error = self._classify(event)
+            if link_id:
+                paid_link_ids.append(link_id)
+            outcomes.append((event["event_id"], status, error))
+
+        paid_ids = await run_in_threadpool(self.event_repository.apply_batch, paid_link_ids, outcomes)
+        self._counters["batches"] += 1
+        self._counters["payments_paid"] += len(paid_ids)
+        if self.event_bus is not None:
+            for payment_id in paid_ids:
+                self.event_bus.publish(payment_topic(payment_id), {"type": "paid", "payment_id": payment_id})
+        for _, status, _ in outcomes:
+            self._counters[status] += 1
+        logger.info(
+            "Stripe events applied",
+            extra={"events": len(events), "payment_links": len(paid_link_ids), "payments_paid": len(paid_ids)},
+        )
+        return len(events)
+
+    @staticmethod
+    def _classify(event: Dict[str, Any]) -> Tuple[str, Optional[str], Optional[str]]:
+        """``(status, paid payment link id, error)`` for one stored event."""
+        if event["event_type"] != "checkout.session.completed":
+            return "ignored", None, None
+        try:
+            session = json.loads(event["payload"])["data"]["object"]
+        except (ValueError, KeyError, TypeError):
+            return "ignored", None, "Malformed checkout session"
+        link_id = session.get("payment_link")
+        if not link_id:
+            logger.warning("No payment link ID found in checkout session", extra={"event_id": event["event_id"]})
+            return "ignored", None, "No payment link in checkout session"
+        return "processed", link_id, None
+
+    def stats(self) -> Dict[str, Any]:
+        counters: Dict[str, Any] = dict(self._counters)
+        try:
+            counters["pending"] = self.event_repository.pending_count()
+        except Exception:
+            counters["pending"] = None
+        return counters
@@ -1,15 +1,29 @@
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, Optional
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+from starlette.concurrency import run_in_threadpool
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioException
+from twilio.http.async_http_client import AsyncTwilioHttpClient
 
 from ..core.config import settings
 from ..core.exceptions import TwilioConfigurationError, CallServiceError
+from ..repositories.call_route_repository import CallRouteRepository
+from .upstream_clients import UpstreamClients
+
+
+logger = logging.getLogger(__name__)
 
 
 class TwilioService:
     """Service for handling Twilio API interactions."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        call_routes: Optional[CallRouteRepository] = None,
+        clients: Optional[UpstreamClients] = None,
+    ):
         if not settings.twilio_account_sid or not settings.twilio_auth_token:
             raise TwilioConfigurationError(
                 "Twilio credentials are not properly configured",
@@ -19,14 +33,44 @@ class TwilioService:
                 }
             )
         
-        self.client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
+        # Shared keep-alive clients are owned (and closed) by the registry
+        self.clients = clients
+        self.client = (
+            clients.twilio_sync() if clients is not None
+            else Client(settings.twilio_account_sid, settings.twilio_auth_token)
+        )
+        self._async_client: Optional[Client] = None
+        self.call_routes = call_routes
+
+    @property
+    def async_client(self) -> Client:
+        """Twilio client backed by the aiohttp-based async HTTP client (created lazily)."""
+        if self.clients is not None:
+            return self.clients.twilio_async()
+        if self._async_client is None:
+            self._async_client = Client(
+                settings.twilio_account_sid,
+                settings.twilio_auth_token,
+                http_client=AsyncTwilioHttpClient(),
+            )
+        return self._async_client
     
-    def make_call(self, destination: str) -> Dict[str, Any]:
+    def make_call(
+        self,
+        destination: str,
+        call_request_id: Optional[int] = None,
+        prompt: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Make a call using Twilio API.
+
+        When ``call_request_id`` is given, the call SID is routed to that request
+        so the OpenAI gateway answers this call with its own prompt.
         
         Args:
             destination: Phone number to call in international format
+            call_request_id: Optional ``call_requests`` row this call belongs to
+            prompt: Optional prompt of that row, indexed for the accept path
             
         Returns:
             Dictionary containing call information (sid, to, etc.)
@@ -38,18 +82,77 @@ class TwilioService:
             call = self.client.calls.create(
                 to=destination,
                 from_=settings.twilio_from_number,
-                url=settings.twiml_url,
+                url=self._twiml_url(call_request_id),
             )
-            
-            return {
-                "call_sid": call.sid,
-                "to": destination,
-                "status": call.status,
-                "from_": settings.twilio_from_number
-            }
-            
-        except TwilioException as e:
-            raise CallServiceError(
+        except Exception as e:
+            raise self._call_error(e, destination)
+        if call_request_id is not None and self.call_routes is not None:
+            try:
+                self.call_routes.register(call.sid, call_request_id, prompt)
+            except Exception as e:
+                # The call is already placed; the gateway falls back to the last prompt
+                logger.warning("Call route registration failed", extra={"call_sid": call.sid, "error": str(e)})
+        return self._call_result(call, destination)
+
+    async def make_call_async(
+        self,
+        destination: str,
+        call_request_id: Optional[int] = None,
+        prompt: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of :meth:`make_call` using Twilio's async HTTP client.
+
+        Raises:
+            CallServiceError: If the call fails
+        """
+        try:
+            call = await self.async_client.calls.create_async(
+                to=destination,
+                from_=settings.twilio_from_number,
+                url=self._twiml_url(call_request_id),
+            )
+        except Exception as e:
+            raise self._call_error(e, destination)
+        if call_request_id is not None and self.call_routes is not None:
+            try:
+                await run_in_threadpool(self.call_routes.register, call.sid, call_request_id, prompt)
+            except Exception as e:
+                # The call is already placed; the gateway falls back to the last prompt
+                logger.warning("Call route registration failed", extra={"call_sid": call.sid, "error": str(e)})
+        return self._call_result(call, destination)
+
+    async def aclose(self) -> None:
+        """Close the async HTTP session, if this service opened one."""
+        if self._async_client is not None:
+            await self._async_client.http_client.close()
+            self._async_client = None
+
+    @staticmethod
+    def _twiml_url(call_request_id: Optional[int]) -> Optional[str]:
+        """TwiML URL, tagged with the call request ID so the TwiML can forward it
+        to the SIP leg (e.g. as an ``X-Call-Request-Id`` header)."""
+        url = settings.twiml_url
+        if not url or call_request_id is None:
+            return url
+        parts = urlsplit(url)
+        query = urlencode({"call_request_id": call_request_id})
+        query = f"{parts.query}&{query}" if parts.query else query
+        return urlunsplit(parts._replace(query=query))
+
+    @staticmethod
+    def _call_result(call: Any, destination: str) -> Dict[str, Any]:
+        return {
+            "call_sid": call.sid,
+            "to": destination,
+            "status": call.status,
+            "from_": settings.twilio_from_number
+        }
+
+    @staticmethod
+    def _call_error(e: Exception, destination: str) -> CallServiceError:
+        if isinstance(e, TwilioException):
+            return CallServiceError(
                 f"Failed to make call to {destination}",
                 details={
                     "twilio_error": str(e),
@@ -57,8 +160,7 @@ class TwilioService:
                     "from_number": settings.twilio_from_number
                 }
             )
-        except Exception as e:
-            raise CallServiceError(
-                f"Unexpected error making call to {destination}",
-                details={"error": str(e), "destination": destination}
-            )
+        return CallServiceError(
+            f"Unexpected error making call to {destination}",
+            details={"error": str(e), "destination": destination}
+        )
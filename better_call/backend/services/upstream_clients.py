@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from aiohttp import ClientSession, TCPConnector
+from openai import AsyncOpenAI, OpenAI
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+from ..core.config import settings
+from ..core.exceptions import OpenAIServiceError, TwilioConfigurationError
+
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledTwilioHttpClient(AsyncTwilioHttpClient):
+    """Twilio's aiohttp client with a sized connection pool and keep-alive window."""
+
+    def __init__(self, timeout: float, max_connections: int, keepalive_seconds: float):
+        super().__init__(pool_connections=False, timeout=timeout)
+        self.session = ClientSession(
+            connector=TCPConnector(
+                limit=max_connections,
+                keepalive_timeout=keepalive_seconds,
+                ttl_dns_cache=300,
+            )
+        )
+
+
+class UpstreamClients:
+    """OpenAI and Twilio clients shared for the lifetime of the app.
+
+    Each client is built on first use with its own connection pool, keep-alive
+    window and timeouts, so every enrichment and dial after the first reuses a
+    warm TLS connection. :meth:`warm_up` opens those connections at startup so
+    the first call after a deploy does not pay for DNS, TCP and TLS either.
+    Services built with these clients never close them; :meth:`aclose` does.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._openai_async: Optional[AsyncOpenAI] = None
+        self._openai_sync: Optional[OpenAI] = None
+        self._twilio_async: Optional[Client] = None
+        self._twilio_sync: Optional[Client] = None
+        self._warmup: Dict[str, Any] = {}
+
+    @staticmethod
+    def openai_configured() -> bool:
+        return bool(settings.openai_api_key)
+
+    @staticmethod
+    def twilio_configured() -> bool:
+        return bool(settings.twilio_account_sid and settings.twilio_auth_token)
+
+    @staticmethod
+    def _openai_timeout() -> httpx.Timeout:
+        return httpx.Timeout(settings.openai_timeout_seconds, connect=settings.openai_connect_timeout_seconds)
+
+    @staticmethod
+    def _openai_limits() -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_connections,
+            keepalive_expiry=settings.upstream_keepalive_seconds,
+        )
+
+    @staticmethod
+    def _check_openai() -> None:
+        if not settings.openai_api_key:
+            raise OpenAIServiceError("OpenAI API key is not configured")
+
+    @staticmethod
+    def _check_twilio() -> None:
+        if not settings.twilio_account_sid or not settings.twilio_auth_token:
+            raise TwilioConfigurationError(
+                "Twilio credentials are not properly configured",
+                details={
+                    "account_sid_present": bool(settings.twilio_account_sid),
+                    "auth_token_present": bool(settings.twilio_auth_token)
+                }
+            )
+
+    def openai_async(self) -> AsyncOpenAI:
+        """Shared ``AsyncOpenAI`` client.
+
+        Raises:
+            OpenAIServiceError: If the API key is not configured
+        """
+        self._check_openai()
+        with self._lock:
+            if self._openai_async is None:
+                timeout = self._openai_timeout()
+                self._openai_async = AsyncOpenAI(
+                    api_key=settings.openai_api_key,
+                    timeout=timeout,
+                    max_retries=settings.openai_max_retries,
+                    http_client=httpx.AsyncClient(timeout=timeout, limits=self._openai_limits()),
+                )
+            return self._openai_async
+
+    def openai_sync(self) -> OpenAI:
+        """Shared ``OpenAI`` client for the synchronous code paths.
+
+        Raises:
+            OpenAIServiceError: If the API key is not configured
+        """
+        self._check_openai()
+        with self._lock:
+            if self._openai_sync is None:
+                timeout = self._openai_timeout()
+                self._openai_sync = OpenAI(
+                    api_key=settings.openai_api_key,
+                    timeout=timeout,
+                    max_retries=settings.openai_max_retries,
+                    http_client=httpx.Client(timeout=timeout, limits=self._openai_limits()),
+                )
+            return self._openai_sync
+
+    def twilio_async(self) -> Client:
+        """Shared Twilio client on the aiohttp transport; call it from the event loop.
+
+        Raises:
+            TwilioConfigurationError: If the credentials are not configured
+        """
+        self._check_twilio()
+        with self._lock:
+            if self._twilio_async is None:
+                self._twilio_async = Client(
+                    settings.twilio_account_sid,
+                    settings.twilio_auth_token,
+                    http_client=_PooledTwilioHttpClient(
+                        timeout=settings.twilio_timeout_seconds,
+                        max_connections=settings.twilio_max_connections,
+                        keepalive_seconds=settings.upstream_keepalive_seconds,
+                    ),
+                )
+            return self._twilio_async
+
+    def twilio_sync(self) -> Client:
+        """Shared Twilio client on a pooled ``requests`` session.
+
+        Raises:
+            TwilioConfigurationError: If the credentials are not configured
+        """
+        self._check_twilio()
+        with self._lock:
+            if self._twilio_sync is None:
+                self._twilio_sync = Client(
+                    settings.twilio_account_sid,
+                    settings.twilio_auth_token,
+                    http_client=TwilioHttpClient(pool_connections=True, timeout=settings.twilio_timeout_seconds),
+                )
+            return self._twilio_sync
+
+    async def warm_up(self, connections: Optional[int] = None) -> Dict[str, Any]:
+        """Open ``connections`` keep-alive connections to each configured provider.
+
+        Sends that many cheap authenticated requests in parallel (listing models,
+        fetching the Twilio account) so the pools hold warm connections. Failures
+        are logged and recorded, never raised: a cold pool is only slower.
+        """
+        connections = settings.upstream_warmup_connections if connections is None else connections
+        probes: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        if connections > 0 and self.openai_configured():
+            openai_client = self.openai_async().with_options(max_retries=0)
+
+            async def list_models() -> Any:
+                return await openai_client.models.list()
+
+            probes["openai"] = list_models
+        if connections > 0 and self.twilio_configured():
+            account = self.twilio_async().api.v2010.accounts(settings.twilio_account_sid)
+            probes["twilio"] = account.fetch_async
+
+        async def probe(provider: str, request: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+            started = time.perf_counter()
+            results: List[Any] = await asyncio.gather(
+                *(asyncio.wait_for(request(), settings.upstream_warmup_timeout_seconds) for _ in range(connections)),
+                return_exceptions=True,
+            )
+            errors = [repr(r) for r in results if isinstance(r, BaseException)]
+            report = {
+                "connections": connections - len(errors),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+            if errors:
+                report["error"] = errors[0]
+                logger.warning("Upstream warm-up failed", extra={"provider": provider, "error": errors[0]})
+            return report
+
+        reports = await asyncio.gather(*(probe(p, r) for p, r in probes.items()))
+        self._warmup = dict(zip(probes, reports))
+        if self._warmup:
+            logger.info("Upstream connections warmed up", extra={"warmup": self._warmup})
+        return self._warmup
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "openai": {
+                "configured": self.openai_configured(),
+                "async_open": self._openai_async is not None,
+                "sync_open": self._openai_sync is not None,
+            },
+            "twilio": {
+                "configured": self.twilio_configured(),
+                "async_open": self._twilio_async is not None,
+                "sync_open": self._twilio_sync is not None,
+            },
+            "warmup": self._warmup,
+        }
+
+    async def aclose(self) -> None:
+        """Close every client that was opened."""
+        with self._lock:
+            openai_async, self._openai_async = self._openai_async, None
+            openai_sync, self._openai_sync = self._openai_sync, None
+            twilio_async, self._twilio_async = self._twilio_async, None
+            twilio_sync, self._twilio_sync = self._twilio_sync, None
+        try:
+            if openai_async is not None:
+                await openai_async.close()
+            if twilio_async is not None:
+                await twilio_async.http_client.close()
+            if openai_sync is not None:
+                openai_sync.close()
+            if twilio_sync is not None and twilio_sync.http_client.session is not None:
+                twilio_sync.http_client.session.close()
+        except Exception as e:
+            logger.warning("Error closing upstream clients: %s", e)
@@ -0,0 +1,237 @@
+import queue
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, TypeVar
+
+from ..backend.core.config import settings
+
+T = TypeVar("T")
+
+
+def is_busy_error(error: BaseException) -> bool:
+    """True for SQLITE_BUSY/SQLITE_LOCKED errors raised when another process holds the lock."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+class ConnectionManager:
+    """Shared SQLite connection manager used by every repository.
+
+    Keeps one dedicated writer connection and a bounded pool of reader
+    connections. The database runs in WAL mode, so readers never wait for
+    the writer (and vice versa); only writers are serialized, which SQLite
+    requires anyway.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_readers: int = 8,
+        busy_timeout_ms: int = 5000,
+        mmap_size: int = 268435456,
+        cached_statements: int = 256,
+    ):
+        self.db_path = db_path
+        self.max_readers = max(1, max_readers)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+
+        self._write_lock = threading.RLock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._idle_readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._reader_slots = threading.BoundedSemaphore(self.max_readers)
+        self._all_connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,  # transactions are managed explicitly in write()
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        with self._connections_lock:
+            self._all_connections.append(conn)
+        return conn
+
+    def _get_writer(self) -> sqlite3.Connection:
+        if self._writer is None:
+            self._writer = self._connect()
+        return self._writer
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a reader connection for the current thread.
+
+        Nested calls from the same thread reuse the connection already held,
+        so a thread never holds more than one reader at a time.
+        """
+        held = getattr(self._local, "reader", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection manager is closed")
+
+        self._reader_slots.acquire()
+        try:
+            try:
+                conn = self._idle_readers.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            self._local.reader = conn
+            self._local.depth = 1
+            try:
+                yield conn
+            finally:
+                self._local.reader = None
+                self._local.depth = 0
+                if conn.in_transaction:
+                    conn.rollback()
+                if self._closed:
+                    conn.close()
+                else:
+                    self._idle_readers.put(conn)
+        finally:
+            self._reader_slots.release()
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Run a block inside a transaction on the dedicated writer connection.
+
+        The transaction starts with ``BEGIN IMMEDIATE`` so the database write
+        lock is taken up front (waiting up to ``busy_timeout`` for other
+        processes) instead of failing mid-transaction. It is committed when the
+        block exits normally and rolled back if it raises. Nested calls join the
+        outer transaction.
+        """
+        with self._write_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection manager is closed")
+            conn = self._get_writer()
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            else:
+                if conn.in_transaction:
+                    conn.commit()
+
+    def run_in_transaction(
+        self,
+        work: Callable[[sqlite3.Connection], T],
+        max_retries: int = 5,
+        base_delay: float = 0.01,
+    ) -> T:
+        """Run ``work(conn)`` in a write transaction, retrying when the database is busy.
+
+        ``busy_timeout`` already waits for the lock; this adds jittered backoff on
+        top for bursts where another process holds it longer than that. ``work``
+        must be safe to re-run: a failed attempt is rolled back entirely.
+        """
+        attempt = 0
+        while True:
+            try:
+                with self.write() as conn:
+                    return work(conn)
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e) or attempt >= max_retries:
+                    raise
+                attempt += 1
+                time.sleep(base_delay * (2 ** attempt) * (0.5 + random.random()))
+
+    def iterate(self, sql: str, params: Sequence[Any] = (), batch_size: int = 500) -> Iterator[sqlite3.Row]:
+        """Stream the rows of a query from a server-side cursor.
+
+        Rows are fetched ``batch_size`` at a time, so memory stays flat however
+        many rows match. The generator uses its own connection rather than a
+        pooled reader: a long export must not hold a reader slot, and it may be
+        resumed from a different thread on every step. The connection is closed
+        when the generator is exhausted or closed.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection manager is closed")
+        conn = self._connect()
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            with self._connections_lock:
+                if conn in self._all_connections:
+                    self._all_connections.remove(conn)
+            conn.close()
+
+    def close(self) -> None:
+        """Close every connection opened by this manager."""
+        self._closed = True
+        with self._write_lock:
+            self._writer = None
+        with self._connections_lock:
+            connections, self._all_connections = self._all_connections, []
+        while True:
+            try:
+                self._idle_readers.get_nowait()
+            except queue.Empty:
+                break
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: str) -> ConnectionManager:
+    """Return the process-wide connection manager for ``db_path``."""
+    with _managers_lock:
+        manager = _managers.get(db_path)
+        if manager is None or manager._closed:
+            manager = ConnectionManager(
+                db_path,
+                max_readers=settings.db_max_readers,
+                busy_timeout_ms=settings.db_busy_timeout_ms,
+                mmap_size=settings.db_mmap_size,
+            )
+            _managers[db_path] = manager
+        return manager
+
+
+def close_connection_managers() -> None:
+    """Close every connection manager created in this process."""
+    with _managers_lock:
+        managers = list(_managers.values())
+        _managers.clear()
+    for manager in managers:
+        manager.close()
@@ -1,77 +1,30 @@
-import sqlite3
-import threading
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional, Dict, Any
 
+from .connection import get_connection_manager
+
 class PromptDB:
     def __init__(self, db_path="banco.db"):
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.lock = threading.Lock()
-        self._criar_tabela()
-
-    def _criar_tabela(self):
-        with self.lock:
-            self.conn.execute("PRAGMA foreign_keys = ON")
-            
-            self.conn.execute('''
-                CREATE TABLE IF NOT EXISTS call_requests (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    email TEXT NOT NULL,
-                    phone_to TEXT NOT NULL,
-                    prompt TEXT NOT NULL,
-                    user_id INTEGER,
-                    status TEXT NOT NULL DEFAULT 'pending'
-                )
-            ''')
-            # Backward-compatible migration to add user_id if missing
-            try:
-                cursor = self.conn.execute("PRAGMA table_info(call_requests)")
-                columns = [row[1] for row in cursor.fetchall()]
-                if 'user_id' not in columns:
-                    self.conn.execute("ALTER TABLE call_requests ADD COLUMN user_id INTEGER")
-                if 'status' not in columns:
-                    self.conn.execute("ALTER TABLE call_requests ADD COLUMN status TEXT NOT NULL DEFAULT 'pending'")
-            except Exception:
-                # Ignore migration failures; table may already include the column
-                pass
-            
-            self.conn.execute('''
-                CREATE TABLE IF NOT EXISTS payments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    stripe_payment_link_id TEXT UNIQUE,
-                    amount DECIMAL(10,2) NOT NULL,
-                    currency TEXT NOT NULL DEFAULT 'usd',
-                    status TEXT NOT NULL DEFAULT 'pending',
-                    description TEXT,
-                    customer_email TEXT,
-                    success_url TEXT,
-                    cancel_url TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (id)
-                )
-            ''')
-            self.conn.commit()
+        # Tables are created by database/migrations.py, run once at startup
+        self.db = get_connection_manager(db_path)
 
     def insert_call_request(self, email: str, telefone: str, prompt: str, user_id: Optional[int] = None, status: str = 'pending'):
-        with self.lock:
+        with self.db.write() as conn:
             if user_id is not None:
-                self.conn.execute(
+                conn.execute(
                     "INSERT INTO call_requests (email, phone_to, prompt, user_id, status) VALUES (?, ?, ?, ?, ?)",
                     (email, telefone, prompt, user_id, status)
                 )
             else:
-                self.conn.execute(
+                conn.execute(
                     "INSERT INTO call_requests (email, phone_to, prompt, status) VALUES (?, ?, ?, ?)",
                     (email, telefone, prompt, status)
                 )
-            self.conn.commit()
 
     def get_last_prompt(self) -> str:
-        with self.lock:
-            cursor = self.conn.execute(
+        with self.db.read() as conn:
+            cursor = conn.execute(
                 "SELECT prompt FROM call_requests ORDER BY id DESC LIMIT 1"
             )
             row = cursor.fetchone()
@@ -81,41 +34,37 @@ class PromptDB:
                       description: Optional[str] = None, customer_email: Optional[str] = None,
                       success_url: Optional[str] = None) -> int:
         """Insert a new payment record and return the payment ID."""
-        with self.lock:
-            self.conn.execute("PRAGMA foreign_keys = ON")  # Garantir que FK está ativa
-            cursor = self.conn.execute(
+        with self.db.write() as conn:
+            cursor = conn.execute(
                 """INSERT INTO payments 
                    (user_id, stripe_payment_link_id, amount, currency, description, customer_email, success_url) 
                    VALUES (?, ?, ?, ?, ?, ?, ?)""",
                 (user_id, stripe_payment_link_id, float(amount), currency, description, customer_email, success_url)
             )
-            self.conn.commit()
             return cursor.lastrowid
 
     def update_payment_status(self, stripe_payment_link_id: str, status: str) -> bool:
         """Update payment status by Stripe payment link ID."""
-        with self.lock:
-            cursor = self.conn.execute(
+        with self.db.write() as conn:
+            cursor = conn.execute(
                 "UPDATE payments SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE stripe_payment_link_id = ?",
                 (status, stripe_payment_link_id)
             )
-            self.conn.commit()
             return cursor.rowcount > 0
 
     def update_payment_stripe_id(self, payment_id: int, stripe_payment_link_id: str) -> bool:
         """Update payment with Stripe payment link ID by internal payment ID."""
-        with self.lock:
-            cursor = self.conn.execute(
+        with self.db.write() as conn:
+            cursor = conn.execute(
                 "UPDATE payments SET stripe_payment_link_id = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
                 (stripe_payment_link_id, payment_id)
             )
-            self.conn.commit()
             return cursor.rowcount > 0
 
     def get_payment_by_stripe_id(self, stripe_payment_link_id: str) -> Optional[Dict[str, Any]]:
         """Get payment by Stripe payment link ID."""
-        with self.lock:
-            cursor = self.conn.execute(
+        with self.db.read() as conn:
+            cursor = conn.execute(
                 "SELECT * FROM payments WHERE stripe_payment_link_id = ?",
                 (stripe_payment_link_id,)
             )
@@ -127,8 +76,8 @@ class PromptDB:
 
     def get_payment_by_id(self, payment_id: int) -> Optional[Dict[str, Any]]:
         """Get payment by internal payment ID."""
-        with self.lock:
-            cursor = self.conn.execute(
+        with self.db.read() as conn:
+            cursor = conn.execute(
                 "SELECT * FROM payments WHERE id = ?",
                 (payment_id,)
             )
@@ -140,8 +89,8 @@ class PromptDB:
 
     def get_payments_by_user_id(self, user_id: int) -> list[Dict[str, Any]]:
         """Get all payments for a specific user."""
-        with self.lock:
-            cursor = self.conn.execute(
+        with self.db.read() as conn:
+            cursor = conn.execute(
                 "SELECT * FROM payments WHERE user_id = ? ORDER BY created_at DESC",
                 (user_id,)
             )
@@ -152,8 +101,6 @@ class PromptDB:
             return []
 
     def close(self) -> None:
-        with self.lock:
-            try:
-                self.conn.close()
-            except Exception:
-                pass
+        # Connections belong to the shared connection manager, which is closed
+        # once at application shutdown.
+        pass
@@ -0,0 +1,313 @@
+import logging
+import sqlite3
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+from ..backend.core.exceptions import DatabaseError
+from .connection import ConnectionManager, get_connection_manager
+
+
+logger = logging.getLogger(__name__)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _v1_baseline(conn: sqlite3.Connection) -> None:
+    """Every table the application uses, as previously created by each repository."""
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            credits INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        '''
+    )
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS user_cache_invalidations (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+        '''
+    )
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS call_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            phone_to TEXT NOT NULL,
+            prompt TEXT NOT NULL,
+            user_id INTEGER,
+            status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending','fulfilled')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        '''
+    )
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            stripe_payment_link_id TEXT UNIQUE,
+            amount DECIMAL(10,2) NOT NULL,
+            currency TEXT NOT NULL DEFAULT 'usd',
+            status TEXT NOT NULL DEFAULT 'pending',
+            description TEXT,
+            customer_email TEXT,
+            success_url TEXT,
+            cancel_url TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        '''
+    )
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS call_routes (
+            call_sid TEXT PRIMARY KEY,
+            call_request_id INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        )
+        '''
+    )
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS call_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_email TEXT NOT NULL,
+            email TEXT NOT NULL,
+            name TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            raw_prompt TEXT NOT NULL DEFAULT '',
+            prompt TEXT,
+            user_id INTEGER,
+            call_request_id INTEGER,
+            status TEXT NOT NULL DEFAULT 'queued',
+            stage TEXT NOT NULL DEFAULT 'enrich',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            call_sid TEXT,
+            last_error TEXT,
+            next_attempt_at REAL NOT NULL,
+            locked_by TEXT,
+            locked_at REAL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        '''
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_call_jobs_status_due ON call_jobs (status, next_attempt_at)"
+    )
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS enrichment_cache (
+            cache_key TEXT PRIMARY KEY,
+            enriched_prompt TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+        '''
+    )
+
+
+def _v2_unify_call_requests(conn: sqlite3.Connection) -> None:
+    """Rebuild ``call_requests`` tables created by the old PromptDB definition.
+
+    That definition had no ``created_at`` and no status CHECK, and older copies
+    may also lack ``user_id``/``status``. Rows keep their IDs.
+    """
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'call_requests'"
+    ).fetchone()
+    columns = _columns(conn, "call_requests")
+    if "CHECK" in row["sql"] and {"user_id", "status", "created_at"} <= set(columns):
+        return
+
+    conn.execute(
+        '''
+        CREATE TABLE call_requests_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            phone_to TEXT NOT NULL,
+            prompt TEXT NOT NULL,
+            user_id INTEGER,
+            status TEXT NOT NULL DEFAULT 'pending' CHECK(status IN ('pending','fulfilled')),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        '''
+    )
+    user_id = "user_id" if "user_id" in columns else "NULL"
+    status = (
+        "CASE WHEN status IN ('pending','fulfilled') THEN status ELSE 'pending' END"
+        if "status" in columns else "'pending'"
+    )
+    created_at = "created_at" if "created_at" in columns else "CURRENT_TIMESTAMP"
+    conn.execute(
+        f"""INSERT INTO call_requests_new (id, email, phone_to, prompt, user_id, status, created_at)
+            SELECT id, email, phone_to, prompt, {user_id}, {status}, {created_at} FROM call_requests"""
+    )
+    conn.execute("DROP TABLE call_requests")
+    conn.execute("ALTER TABLE call_requests_new RENAME TO call_requests")
+
+
+# Indexes behind the hot lookups, by name. benchmarks/query_plans.py checks
+# that the queries they serve never fall back to a table scan or a sort.
+INDEXES: Dict[str, str] = {
+    # get_user_by_email is served by the UNIQUE constraint's sqlite_autoindex_users_1
+    # get_last_call_request_by_email / keyset listing: WHERE email = ? ORDER BY id DESC
+    "idx_call_requests_email_id": "CREATE INDEX IF NOT EXISTS idx_call_requests_email_id ON call_requests (email, id)",
+    # get_payments_by_user_id: WHERE user_id = ? ORDER BY created_at DESC
+    "idx_payments_user_created": "CREATE INDEX IF NOT EXISTS idx_payments_user_created ON payments (user_id, created_at)",
+    # CallJobRepository.claim_next: due queued jobs, then expired leases
+    "idx_call_jobs_status_due": "CREATE INDEX IF NOT EXISTS idx_call_jobs_status_due ON call_jobs (status, next_attempt_at)",
+    "idx_call_jobs_status_lease": "CREATE INDEX IF NOT EXISTS idx_call_jobs_status_lease ON call_jobs (status, locked_at)",
+    # CallCampaignRepository.get_campaign_jobs: WHERE campaign_id = ? ORDER BY id
+    "idx_call_jobs_campaign": "CREATE INDEX IF NOT EXISTS idx_call_jobs_campaign ON call_jobs (campaign_id, id)",
+    # StripeEventRepository.pending / prune: WHERE status = ? ORDER BY received_at
+    "idx_stripe_events_status_received": (
+        "CREATE INDEX IF NOT EXISTS idx_stripe_events_status_received ON stripe_events (status, received_at)"
+    ),
+}
+
+
+def _v3_lookup_indexes(conn: sqlite3.Connection) -> None:
+    # Names are pinned: an index added to INDEXES later ships in its own migration
+    for name in ("idx_call_requests_email_id", "idx_payments_user_created", "idx_call_jobs_status_lease"):
+        conn.execute(INDEXES[name])
+
+
+def _v4_call_campaigns(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS call_campaigns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_email TEXT NOT NULL,
+            email TEXT NOT NULL,
+            name TEXT NOT NULL,
+            raw_prompt TEXT NOT NULL DEFAULT '',
+            prompt TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        )
+        '''
+    )
+    if "campaign_id" not in _columns(conn, "call_jobs"):
+        conn.execute("ALTER TABLE call_jobs ADD COLUMN campaign_id INTEGER")
+    conn.execute(INDEXES["idx_call_jobs_campaign"])
+
+
+def _v5_stripe_events(conn: sqlite3.Connection) -> None:
+    """Webhook idempotency store: one row per Stripe event id, consumed in the background."""
+    conn.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS stripe_events (
+            event_id TEXT PRIMARY KEY,
+            event_type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            last_error TEXT,
+            received_at REAL NOT NULL,
+            processed_at REAL
+        )
+        '''
+    )
+    conn.execute(INDEXES["idx_stripe_events_status_received"])
+
+
+def _v6_deferred_call_requests(conn: sqlite3.Connection) -> None:
+    """Call requests saved on the 402 path: held until paid, enriched while waiting."""
+    columns = _columns(conn, "call_requests")
+    for column, definition in (
+        ("name", "TEXT"),
+        ("raw_prompt", "TEXT"),
+        ("enriched_at", "REAL"),
+        ("awaiting_payment", "INTEGER NOT NULL DEFAULT 0"),
+    ):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE call_requests ADD COLUMN {column} {definition}")
+
+
+# Ordered by version. Never edit a released migration; append a new one.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline schema", _v1_baseline),
+    Migration(2, "unify call_requests definition", _v2_unify_call_requests),
+    Migration(3, "indexes for hot lookups", _v3_lookup_indexes),
+    Migration(4, "call campaigns", _v4_call_campaigns),
+    Migration(5, "stripe webhook events", _v5_stripe_events),
+    Migration(6, "deferred call requests", _v6_deferred_call_requests),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def _user_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path: str) -> Dict[str, float]:
+    """
+    Bring the database schema up to :data:`SCHEMA_VERSION`.
+
+    The version lives in ``PRAGMA user_version``. When it is current this is a
+    single read; otherwise each pending migration runs in its own
+    ``BEGIN IMMEDIATE`` transaction together with the version bump, so a
+    failure leaves the schema at the last good version and workers starting at
+    the same time never apply a migration twice.
+
+    Args:
+        db_path: Path of the SQLite database
+
+    Returns:
+        ``from_version``, ``to_version``, ``applied`` and ``elapsed_ms``
+
+    Raises:
+        DatabaseError: If a migration fails
+    """
+    started = time.perf_counter()
+    manager: ConnectionManager = get_connection_manager(db_path)
+    with manager.read() as conn:
+        from_version = _user_version(conn)
+
+    applied = 0
+    if from_version < SCHEMA_VERSION:
+        for migration in MIGRATIONS:
+            try:
+                with manager.write() as conn:
+                    # Re-checked under the write lock: another worker may have got here first
+                    if _user_version(conn) >= migration.version:
+                        continue
+                    migration.apply(conn)
+                    conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            except Exception as e:
+                raise DatabaseError(
+                    f"Schema migration {migration.version} ({migration.description}) failed: {e}"
+                )
+            applied += 1
+    elif from_version > SCHEMA_VERSION:
+        raise DatabaseError(
+            f"Database schema version {from_version} is newer than this code ({SCHEMA_VERSION})"
+        )
+
+    result = {
+        "from_version": from_version,
+        "to_version": max(from_version, SCHEMA_VERSION),
+        "applied": applied,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    if applied:
+        logger.info("Schema migrations applied", extra=result)
+    else:
+        logger.debug("Schema is current", extra=result)
+    return result
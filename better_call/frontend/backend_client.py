@@ -0,0 +1,249 @@
+"""How the frontend reaches the backend API.
+
+``FRONTEND_BACKEND_MODE=inprocess`` (the default) calls the backend route
+functions directly when both run in the same app, with the same validation,
+status codes and bodies as over HTTP but without a loopback round trip.
+``http`` talks to ``BACKEND_BASE_URL`` through one pooled keep-alive client
+created in the lifespan, for a frontend deployed on its own.
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Dict, Optional
+
+import httpx
+from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from ..backend.api.dependencies import get_current_user_email
+from ..backend.api.routes.auth import login, register, session as open_session
+from ..backend.api.routes.calls import dispatch_call_request, get_last_call_request, make_call
+from ..backend.api.routes.payments import get_payment_status
+from ..backend.models.requests import CallRequest, LoginRequest, RegisterRequest, SessionRequest
+
+
+BACKEND_BASE_URL = os.getenv("BACKEND_BASE_URL", "http://127.0.0.1:9001")
+FRONTEND_BACKEND_MODE = os.getenv("FRONTEND_BACKEND_MODE", "inprocess").lower()
+
+
+class BackendResponse:
+    """Status and decoded JSON body of a backend call, whichever way it was made."""
+
+    def __init__(self, status_code: int, data: Any):
+        self.status_code = status_code
+        self.data = data
+
+    def json(self) -> Any:
+        return self.data
+
+    @property
+    def text(self) -> str:
+        return self.data if isinstance(self.data, str) else json.dumps(self.data, default=str)
+
+
+class BackendClient(ABC):
+    """The backend operations the frontend pages use."""
+
+    mode = ""
+
+    @abstractmethod
+    async def login(self, email: str, password: str) -> BackendResponse:
+        ...
+
+    @abstractmethod
+    async def register(self, email: str, password: str) -> BackendResponse:
+        ...
+
+    @abstractmethod
+    async def session(self, email: str, password: str) -> BackendResponse:
+        """Log in, or register a new email; one bcrypt operation either way."""
+
+    @abstractmethod
+    async def create_call(self, payload: Dict[str, Any], token: Optional[str]) -> BackendResponse:
+        ...
+
+    @abstractmethod
+    async def dispatch_call(self, call_request_id: int, token: Optional[str]) -> BackendResponse:
+        """Queue a call request saved when ``create_call`` returned 402."""
+
+    @abstractmethod
+    async def payment_status(self, payment_id: str) -> BackendResponse:
+        ...
+
+    @abstractmethod
+    async def last_call_request(self, token: Optional[str]) -> BackendResponse:
+        ...
+
+    async def aclose(self) -> None:
+        """Release connections; nothing to release by default."""
+
+
+class HttpBackendClient(BackendClient):
+    """Backend over HTTP, sharing one connection pool across requests."""
+
+    mode = "http"
+
+    def __init__(self, base_url: str = BACKEND_BASE_URL, timeout: float = 20.0, max_connections: int = 100):
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    @staticmethod
+    def _headers(token: Optional[str]) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {token}"} if token else {}
+
+    @staticmethod
+    def _wrap(response: httpx.Response) -> BackendResponse:
+        try:
+            data = response.json()
+        except ValueError:
+            data = response.text
+        return BackendResponse(response.status_code, data)
+
+    async def login(self, email: str, password: str) -> BackendResponse:
+        return self._wrap(await self.client.post("/api/auth/login", json={"email": email, "password": password}))
+
+    async def register(self, email: str, password: str) -> BackendResponse:
+        return self._wrap(await self.client.post("/api/auth/register", json={"email": email, "password": password}))
+
+    async def session(self, email: str, password: str) -> BackendResponse:
+        return self._wrap(await self.client.post("/api/auth/session", json={"email": email, "password": password}))
+
+    async def create_call(self, payload: Dict[str, Any], token: Optional[str]) -> BackendResponse:
+        return self._wrap(await self.client.post("/api/call", json=payload, headers=self._headers(token)))
+
+    async def dispatch_call(self, call_request_id: int, token: Optional[str]) -> BackendResponse:
+        return self._wrap(
+            await self.client.post(f"/api/call/requests/{call_request_id}/dispatch", headers=self._headers(token))
+        )
+
+    async def payment_status(self, payment_id: str) -> BackendResponse:
+        return self._wrap(await self.client.get("/api/payments/status", params={"payment_id": payment_id}))
+
+    async def last_call_request(self, token: Optional[str]) -> BackendResponse:
+        return self._wrap(await self.client.get("/api/call/last", headers=self._headers(token)))
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class InProcessBackendClient(BackendClient):
+    """Backend route functions called directly, with dependencies taken from the service registry."""
+
+    mode = "inprocess"
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+
+    @property
+    def services(self):
+        return self.app.state.services
+
+    @staticmethod
+    async def _invoke(result: Awaitable[Any], status_code: int = 200) -> BackendResponse:
+        """Turn a route's return value or HTTPException into what an HTTP client would see."""
+        try:
+            value = await result
+        except HTTPException as e:
+            return BackendResponse(e.status_code, {"detail": e.detail})
+        if isinstance(value, Response):
+            body = value.body.decode("utf-8") if value.body else ""
+            return BackendResponse(value.status_code, json.loads(body) if body else None)
+        if isinstance(value, BaseModel):
+            value = jsonable_encoder(value)
+        return BackendResponse(status_code, value)
+
+    @staticmethod
+    def _invalid(error: ValidationError) -> BackendResponse:
+        return BackendResponse(422, {"detail": jsonable_encoder(error.errors(include_url=False))})
+
+    @staticmethod
+    def _email(token: Optional[str]) -> Optional[str]:
+        return get_current_user_email(f"Bearer {token}" if token else None)
+
+    async def login(self, email: str, password: str) -> BackendResponse:
+        try:
+            request = LoginRequest(email=email, password=password)
+        except ValidationError as e:
+            return self._invalid(e)
+        return await self._invoke(login(request, user_repo=self.services.user_repository))
+
+    async def register(self, email: str, password: str) -> BackendResponse:
+        try:
+            request = RegisterRequest(email=email, password=password)
+        except ValidationError as e:
+            return self._invalid(e)
+        return await self._invoke(register(request, user_repo=self.services.user_repository))
+
+    async def session(self, email: str, password: str) -> BackendResponse:
+        try:
+            request = SessionRequest(email=email, password=password)
+        except ValidationError as e:
+            return self._invalid(e)
+        return await self._invoke(
+            open_session(request, response=Response(), user_repo=self.services.user_repository)
+        )
+
+    async def create_call(self, payload: Dict[str, Any], token: Optional[str]) -> BackendResponse:
+        try:
+            request = CallRequest(**payload)
+        except ValidationError as e:
+            return self._invalid(e)
+        services = self.services
+        return await self._invoke(
+            make_call(
+                request,
+                call_repository=services.call_repository,
+                user_repo=services.user_repository,
+                email=self._email(token),
+                payments_service=services.payments_service,
+                job_repository=services.job_repository,
+                worker=services.call_job_worker,
+                enricher=services.speculative_enricher,
+            ),
+            status_code=202,
+        )
+
+    async def dispatch_call(self, call_request_id: int, token: Optional[str]) -> BackendResponse:
+        services = self.services
+        return await self._invoke(
+            dispatch_call_request(
+                call_request_id,
+                call_repository=services.call_repository,
+                user_repo=services.user_repository,
+                email=self._email(token),
+                job_repository=services.job_repository,
+                worker=services.call_job_worker,
+            ),
+            status_code=202,
+        )
+
+    async def payment_status(self, payment_id: str) -> BackendResponse:
+        return await self._invoke(
+            get_payment_status(
+                payment_id=payment_id,
+                stripe_payment_link_id=None,
+                payment_service=self.services.payment_service,
+            )
+        )
+
+    async def last_call_request(self, token: Optional[str]) -> BackendResponse:
+        return await self._invoke(
+            run_in_threadpool(
+                get_last_call_request,
+                call_repository=self.services.call_repository,
+                email=self._email(token),
+            )
+        )
+
+
+def create_backend_client(app: FastAPI, mode: str = FRONTEND_BACKEND_MODE) -> BackendClient:
+    """Build the client for ``mode``; in-process needs the backend's services on ``app``."""
+    if mode == "inprocess" and getattr(app.state, "services", None) is not None:
+        return InProcessBackendClient(app)
+    return HttpBackendClient()
@@ -1,83 +1,104 @@
 import os
-from fastapi import APIRouter, Form, Request
+from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import HTMLResponse
 from starlette.templating import Jinja2Templates
-import httpx
 from dotenv import load_dotenv
 
 
 load_dotenv()  # reads frontend/.env if present
 
-router = APIRouter()
+from ..backend.core.config import settings
+from ..backend.core.security import clear_session_cookie, set_session_cookie
+from .backend_client import BackendClient, HttpBackendClient
 
-# Where to send the API request
-BACKEND_BASE_URL = os.getenv("BACKEND_BASE_URL", "http://127.0.0.1:9001")
+router = APIRouter()
 
 BASE_DIR = os.path.dirname(__file__)
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
+
+def get_backend_client(request: Request) -> BackendClient:
+    """The app's backend client, built in the lifespan; a pooled HTTP client if there is none."""
+    client = getattr(request.app.state, "backend_client", None)
+    if client is None:
+        client = request.app.state.backend_client = HttpBackendClient()
+    return client
+
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    has_session = bool(request.cookies.get(settings.session_cookie_name))
+    return templates.TemplateResponse("index.html", {"request": request, "has_session": has_session})
 
 @router.get("/payments/confirmation", response_class=HTMLResponse)
-async def payment_confirmation(request: Request):
+async def payment_confirmation(request: Request, backend: BackendClient = Depends(get_backend_client)):
     payment_id = request.query_params.get("payment_id") or request.cookies.get("payment_id")
-    token = request.cookies.get("access_token")
+    token = request.cookies.get(settings.session_cookie_name)
     if not payment_id:
         return templates.TemplateResponse(
             "error.html",
             {"request": request, "title": "Missing payment_id", "details": "Payment ID not provided."},
             status_code=400,
         )
-    # Poll payment status and trigger call when paid. Simple server-side implementation follows.
+    # Trigger the call when paid; otherwise the waiting page listens for the "paid" event and reloads
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # Poll a few times quickly, then show a waiting page otherwise (simplified)
-            headers = {"Authorization": f"Bearer {token}"} if token else {}
-            status_resp = await client.get(f"{BACKEND_BASE_URL}/payments/status", params={"payment_id": payment_id})
-            if status_resp.status_code == 200 and status_resp.json().get("status") == "paid":
-                # Fetch last call request
-                last_resp = await client.get(f"{BACKEND_BASE_URL}/api/call/last", headers=headers)
-                record = None
-                if last_resp.status_code == 200:
-                    record = last_resp.json().get("record")
-                if record:
-                    # Trigger the call automatically
-                    call_payload = {
-                        "name": request.query_params.get("name") or "",
-                        "email": record.get("email"),
+        status_resp = await backend.payment_status(payment_id)
+        if status_resp.status_code == 200 and status_resp.json().get("status") == "paid":
+            # Fetch last call request
+            last_resp = await backend.last_call_request(token)
+            record = None
+            if last_resp.status_code == 200:
+                record = last_resp.json().get("record")
+            call_request_id = request.cookies.get("call_request_id")
+            if not call_request_id and record and record.get("awaiting_payment"):
+                call_request_id = record.get("id")
+            call_resp = None
+            if call_request_id:
+                # The saved request, enriched while the user was paying: nothing to re-enrich or re-insert
+                call_resp = await backend.dispatch_call(int(call_request_id), token)
+            data = call_resp.json() if call_resp is not None and call_resp.status_code in (200, 202) else {}
+            # Only a request still awaiting payment is ever dispatched, and never re-submitted
+            # through /api/call: a 409, or a last request that is no longer awaiting payment,
+            # means it was dispatched already (e.g. this page was reloaded)
+            already_dispatched = (call_resp is not None and call_resp.status_code == 409) or (
+                call_resp is None and record is not None
+            )
+            if data.get("ok") or already_dispatched:
+                record = record or {}
+                resp = templates.TemplateResponse(
+                    "success.html",
+                    {
+                        "request": request,
+                        "sid": data.get("call_sid") or "",
+                        "job_id": data.get("job_id"),
                         "destination": record.get("phone_to"),
-                        "prompt": record.get("prompt") or "",
-                    }
-                    call_resp = await client.post(f"{BACKEND_BASE_URL}/api/call", json=call_payload, headers=headers)
-                    if call_resp.status_code == 200 and call_resp.json().get("ok"):
-                        data = call_resp.json()
-                        return templates.TemplateResponse(
-                            "success.html",
-                            {
-                                "request": request,
-                                "sid": data.get("call_sid", ""),
-                                "destination": call_payload["destination"],
-                                "name": call_payload["name"],
-                                "email": call_payload["email"],
-                                "prompt": call_payload["prompt"],
-                            },
-                        )
-            # If not paid yet, render a waiting page with simple auto-refresh
-            return HTMLResponse(
-                f"""
-                <html><head>
-                <meta http-equiv='refresh' content='3'>
-                <title>Waiting for payment...</title>
-                </head><body style='font-family: sans-serif; padding: 24px;'>
-                <h2>Waiting for Stripe confirmation...</h2>
-                <p>Payment ID: {payment_id}</p>
-                <p>This page will refresh automatically.</p>
-                </body></html>
-                """,
-                status_code=200,
+                        "name": record.get("name") or request.query_params.get("name") or "",
+                        "email": record.get("email"),
+                        "prompt": record.get("raw_prompt") or record.get("prompt") or "",
+                    },
+                )
+                resp.delete_cookie("call_request_id", path="/")
+                return resp
+            # Paid but not dispatched: the waiting page would see "paid" at once and reload forever
+            if call_resp is None:
+                details = "Payment received, but there is no call request to place. Please submit the form again."
+                status_code = 404
+            elif call_resp.status_code == 402:
+                details = "Payment received, but its credit was already used by another call. Buy another credit to place this one."
+                status_code = 402
+            else:
+                body = call_resp.json()
+                error = body.get("error") if isinstance(body, dict) else body
+                details = f"Payment received, but the call could not be placed: {error}"
+                status_code = 502
+            return templates.TemplateResponse(
+                "error.html",
+                {"request": request, "title": "Call not placed", "details": details},
+                status_code=status_code,
             )
+        # Not paid yet: the page subscribes to /api/events instead of refreshing on a timer
+        return templates.TemplateResponse(
+            "waiting.html", {"request": request, "payment_id": payment_id}
+        )
     except Exception as e:
         return templates.TemplateResponse(
             "error.html",
@@ -90,45 +111,79 @@ async def submit_form(
     request: Request,
     name: str = Form(...),
     email: str = Form(...),
-    password: str = Form(...),
+    password: str = Form(""),
     destination: str = Form(...),
-    prompt: str = Form("")
+    prompt: str = Form(""),
+    backend: BackendClient = Depends(get_backend_client),
 ):
     payload = {"name": name, "email": email, "destination": destination, "prompt": prompt}
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            # Login or register (best-effort simple flow)
-            token = None
+        # Login or register in one step. A valid session cookie skips the password (and bcrypt) entirely; a typed
+        # password always wins, so another account can sign in from the same browser
+        token = None if password else request.cookies.get(settings.session_cookie_name)
+        new_session = False
+        auth_status = None
+        if password:
             try:
-                lr = await client.post(f"{BACKEND_BASE_URL}/api/auth/login", json={"email": email, "password": password})
-                if lr.status_code == 200:
-                    token = lr.json().get("access_token")
-                else:
-                    rr = await client.post(
-                        f"{BACKEND_BASE_URL}/api/auth/register",
-                        json={"email": email, "password": password, "initial_credits": 0}
-                    )
-                    if rr.status_code == 200:
-                        token = rr.json().get("access_token")
+                sr = await backend.session(email, password)
+                auth_status = sr.status_code
+                if sr.status_code == 200:
+                    token = sr.json().get("access_token")
+                    new_session = True
             except Exception:
                 pass
+        elif not token:
+            return templates.TemplateResponse(
+                "error.html",
+                {"request": request, "title": "Unauthorized", "details": "Please enter your password."},
+                status_code=401,
+            )
 
-            headers = {"Authorization": f"Bearer {token}"} if token else {}
-            r = await client.post(f"{BACKEND_BASE_URL}/api/call", json=payload, headers=headers)
-        if r.status_code == 200:
+        if auth_status == 503:
+            return templates.TemplateResponse(
+                "error.html",
+                {
+                    "request": request,
+                    "title": "Busy",
+                    "details": "Too many sign-ins right now. Please try again in a moment.",
+                },
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+
+        r = await backend.create_call(payload, token) if token else None
+        if r is None or r.status_code == 401:
+            resp = templates.TemplateResponse(
+                "error.html",
+                {
+                    "request": request,
+                    "title": "Unauthorized",
+                    "details": "Invalid credentials." if password else "Your session expired. Please enter your password.",
+                },
+                status_code=401,
+            )
+            if not password:
+                clear_session_cookie(resp)
+            return resp
+        if r.status_code in (200, 202):
             data = r.json()
             if data.get("ok"):
-                return templates.TemplateResponse(
+                resp = templates.TemplateResponse(
                     "success.html",
                     {
                         "request": request,
-                        "sid": data.get("call_sid", ""),
+                        "sid": data.get("call_sid") or "",
+                        "job_id": data.get("job_id"),
                         "destination": destination,
                         "name": name,
                         "email": email,
                         "prompt": prompt,
                     },
                 )
+                if new_session:
+                    # Later submissions skip the password; the page's EventSource uses it too
+                    set_session_cookie(resp, token)
+                return resp
             else:
                 return templates.TemplateResponse(
                     "error.html",
@@ -136,16 +191,6 @@ async def submit_form(
                     status_code=500,
                 )
         else:
-            if r.status_code == 401:
-                return templates.TemplateResponse(
-                    "error.html",
-                    {
-                        "request": request,
-                        "title": "Unauthorized",
-                        "details": "Please sign in again.",
-                    },
-                    status_code=401,
-                )
             if r.status_code == 402:
                 try:
                     data = r.json()
@@ -155,10 +200,13 @@ async def submit_form(
                         # Auto redirect to the payment URL, persisting token so we can confirm later
                         from starlette.responses import RedirectResponse
                         resp = RedirectResponse(url=payment_url, status_code=302)
-                        if token:
-                            resp.set_cookie("access_token", token, max_age=3600, path="/")
+                        if new_session:
+                            set_session_cookie(resp, token)
                         if payment_id:
                             resp.set_cookie("payment_id", str(payment_id), max_age=3600, path="/")
+                        call_request_id = data.get("details", {}).get("call_request_id")
+                        if call_request_id:
+                            resp.set_cookie("call_request_id", str(call_request_id), max_age=3600, path="/")
                         return resp
                 except Exception:
                     pass
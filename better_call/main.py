@@ -8,38 +8,49 @@ from dotenv import load_dotenv
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
 
-# Import old database for backward compatibility (will be replaced)
-from .database.db import PromptDB
+from .database.connection import close_connection_managers
+from .database.migrations import migrate
 # Import new backend architecture
-from .backend.repositories.call_repository import CallRepository
-from .backend.repositories.user_repository import UserRepository
+from .backend.services.registry import ServiceRegistry
 from .backend.core.config import settings
+from .backend.core.logging_config import configure_logging, shutdown_logging
+from .backend.core.passwords import get_password_hasher
 from .backend.api import router as backend_router
+from .frontend.backend_client import create_backend_client
 from .frontend.main import router as frontend_router
-from .backend.openai_gateway.main import router as openai_gateway_router
+from .backend.openai_gateway.main import router as openai_gateway_router, create_http_client
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize database with new repository pattern
-    db_path = settings.db_path
-    
-    # Keep old DB for backward compatibility with OpenAI gateway
-    app.state.db = PromptDB(db_path=db_path)
-    
-    # Add new repository for improved backend
-    app.state.call_repository = CallRepository(db_path=db_path)
-    app.state.user_repository = UserRepository(db_path=db_path)
+    configure_logging()
+
+    # Schema changes happen here, once, before anything touches the database
+    app.state.schema = migrate(settings.db_path)
+
+    # Repositories and services live for the whole app; routes get them via dependencies
+    app.state.services = ServiceRegistry(db_path=settings.db_path)
+    await app.state.services.start()
+
+    # Shared keep-alive client for accepting realtime calls in the gateway
+    app.state.openai_gateway_client = create_http_client()
+
+    # Frontend pages call the backend in-process, or over one pooled client when split out
+    app.state.backend_client = create_backend_client(app)
     
     try:
         yield
     finally:
+        await app.state.services.aclose()
+        await app.state.openai_gateway_client.aclose()
+        await app.state.backend_client.aclose()
+        get_password_hasher().shutdown()
         try:
-            app.state.db.close()
-            app.state.call_repository.close()
-            # user_repository uses context managers; nothing to close explicitly
+            # Repositories share pooled connections; close them all at once
+            close_connection_managers()
         except Exception:
             pass
+        shutdown_logging()
 
 
 app = FastAPI(title="Better Call", lifespan=lifespan)